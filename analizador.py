@@ -2,349 +2,59 @@
 
 from __future__ import print_function
 import sys
-import ply.lex as lex
-
-tokens = [
-    'T_STOP',
-    'T_COMMA',
-    'T_ASSIGN',
-    'T_BLOCK_START',
-    'T_BLOCK_END',
-    'T_CONCAT',
-    'T_EXP_START',
-    'T_EXP_END',
-    'T_ARR_START',
-    'T_ARR_END',
-    'T_ID',
-    'T_FLOAT_CONST',
-    'T_INT_CONST',
-    'T_STRING_CONST',
-    'T_OPARIT',
-    'T_OPFACT',
-    'T_OPCOMP',
-    'T_OPREL',
-    'T_COLON'
-]
-
-reserved = {
-    'if': 'T_IF',
-    'else': 'T_ELSE',
-    'program': 'T_PROGRAM',
-    'int': 'T_INT',
-    'float': 'T_FLOAT',
-    'string': 'T_STRING',
-    'boolean': 'T_BOOLEAN',
-    'struct': 'T_STRUCT',
-    'print': 'T_PRINT',
-    'for': 'T_FOR',
-    'print': 'T_PRINT',
-    'load': 'T_LOAD',
-    'input': 'T_INPUT',
-    'while': 'T_WHILE',
-    'do': 'T_DO',
-    'true': 'T_TRUE',
-    'false': 'T_FALSE',
-    'main': 'T_MAIN',
-    'return': 'T_RETURN',
-    'void': 'T_VOID',
-    'line': 'T_LINE',
-    'bar': 'T_BAR',
-    'pie': 'T_PIE',
-    'var': 'T_VAR',
-    'println': 'T_PRINTLN',
-}
-
-tokens += reserved.values()
-
-t_T_STOP = r'\;'
-t_T_COMMA = r'\,'
-t_T_ASSIGN = r'\='
-t_T_BLOCK_START = r'\{'
-t_T_BLOCK_END = r'\}'
-t_T_CONCAT = r'\.'
-t_T_EXP_START = r'\('
-t_T_EXP_END = r'\)'
-t_T_ARR_START = r'\['
-t_T_ARR_END = r'\]'
-
-t_T_FLOAT_CONST = r'[+-]?[0-9]+\.[0-9]+f?'
-t_T_INT_CONST = r'[+-]?[0-9]+'
-t_T_STRING_CONST = r'\".*\"'
-t_T_OPARIT = r'[+-]'
-t_T_OPFACT = r'[*/]'
-t_T_OPCOMP = r'!=|==|<=|>=|<|>'
-t_T_OPREL = r'&&|\|\|'
-
-t_T_COLON = r'\:'
-
-t_ignore = ' \t'
-
-def t_T_ID(t):
-    r'[a-zA-Z][a-zA-Z0-9_]*'
-    if t.value in reserved:
-        t.type = reserved[t.value]
-    return t
-
-lineNumber = 1
-def t_endl(t):
-    r'\r?\n'
-    global lineNumber
-    lineNumber += 1
-
-def t_error(t):
-    print("Illegal character '%s' in line #%d." % (t.value[0], lineNumber))
-    sys.exit()
-
-lexer = lex.lex()
-
-import ply.yacc as yacc
-
-from operations import ops
-
-# Almacena las direcciones, IDs y tipos de las variables homogéneas, tanto locales como globales.
-# Utiliza una referencia recursiva para crear un árbol de instancias de esta clase, donde cada nodo corresponde a un bloque del programa.
-# Esto permite manejar distintos “scopes” de la misma manera que Java, C y C++.
-class SymbolTable:
-    def __init__(self):
-        self.symbols = dict()
-        self.children = list()
-        self.parent = None
-
-    def insert(self, id, type, memID):
-        self.symbols[id] = { 'type': type, 'memID': memID }
-
-    def insertFunction(self, id, type, memID):
-        self.symbols[id] = { 'type': 'FUNCTION', 'memID': memID, 'returnType': type }
 
-    def insertArray(self, id, type, memID, size):
-        self.symbols[id] = { 'type': type, 'memID': memID, 'size': size }
-
-    def lookup(self, id):
-        result = self.symbols.get(id)
-        if not result is None or self.parent is None:
-            return result
-        return self.parent.lookup(id)
-
-    def addChild(self, child):
-        self.children.append(child)
+from operations import ops, operandModes, binaryOperations, valueTypes
+from compilador import createFrameLayout, frameSlot
+import compilador
+
+# Las bibliotecas de gráficas y NumPy se importan hasta que el programa las usa, porque importar matplotlib es la mayor parte del tiempo de arranque de un programa corto.
+plt = None
+np = None
+
+def loadNumpy():
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+    return np
+
+# Importa matplotlib y configura el estilo de las gráficas la primera vez que se ejecuta una gráfica. Si se indica un backend (por ejemplo 'Agg' para guardar en archivos), se elige antes de importar pyplot.
+def loadGraphing(backend=None):
+    global plt
+    if plt is None:
+        import matplotlib
+        if not backend is None and not 'matplotlib.pyplot' in sys.modules:
+            matplotlib.use(backend)
+        import matplotlib.pyplot
+        from cycler import cycler
+        loadNumpy()
+        plt = matplotlib.pyplot
+        if not backend is None:
+            plt.switch_backend(backend)
+        plt.xkcd()
+        plt.rc('lines', linewidth=4)
+        plt.rc('axes', prop_cycle=(cycler('color', ['r', 'g', 'b', 'y']) +
+                           cycler('linestyle', ['-', '--', ':', '-.'])))
+    return plt
 
-    def setParent(self, parent):
-        self.parent = parent
+# Error durante la ejecución de un programa, por ejemplo un índice fuera de rango o una variable sin valor. La máquina virtual le agrega el índice del cuádruplo que falló y, si se conoce, la línea del programa fuente que lo generó.
+class ExecutionError(Exception):
+    index = None
+    line = None
 
     def __str__(self):
-        result = ''
-        tab = '| =>%9s' % (' ')
-        for key, symbol in self.symbols.iteritems():
-            result += '| %10s | %10s |\n' % (key, symbol['memID'])
-        for child in self.children:
-            childStr = str(child)
-            if childStr:
-                result += tab
-                result += tab.join(childStr.splitlines(True))
-        return result
-
-currentSymbolTable = SymbolTable()
-
-def filterNone(token):
-    if token is None:
-        return '-'
-    return token
-
-# Almacena los cuádruplos que se generan durante la compilación, exponiendo varios métodos para crear cuádruplos, manipularlos (en el caso de la generación del estatuto “for”), o actualizarlos después de haber sido creados (en el caso de la generación de saltos).
-class QuadrupleList:
-    def __init__(self):
-        self.quadruples = list()
-
-    def insertQuad(self, name, arg1, arg2=None, dest=None):
-        self.quadruples.append((ops[name], arg1, arg2, dest))
-
-    def insertOperation(self, op, arg1, arg2=None, memID=None):
-        self.quadruples.append((ops[op], arg1, arg2, memID))
-
-    def insertAssign(self, val, dest):
-        self.quadruples.append((ops['='], val, None, dest))
-
-    def insertJump(self, jump, destination=None, expression=None):
-        self.quadruples.append((ops[jump], expression, None, destination))
-        return len(self.quadruples) - 1
-
-    def updateJump(self, index, expression=None, destination=None):
-        if destination is None :
-            destination = len(self.quadruples)
-        jump = (self.quadruples[index][0], expression, None, destination)
-        self.quadruples[index] = jump
-
-    def getListSize(self):
-        return len(self.quadruples)
-
-    def getLastQuad(self):
-        return self.quadruples[-1]
-
-    def moveQuadRangeToEnd(self, begin, end):
-        rangeSize = end - begin
-        for ind in range(end, len(self.quadruples)):
-            op = self.quadruples[ind][0]
-            if op >= 1 and op <= 3:
-                oldQuad = self.quadruples[ind]
-                newQuad = (oldQuad[0], oldQuad[1], oldQuad[2], oldQuad[3] - rangeSize)
-                self.quadruples[ind] = newQuad
-        self.quadruples = self.quadruples[:begin] + self.quadruples[end:] + self.quadruples[begin:end]
-
-    def printQuadruples(self):
-        index = 0
-        for quad in self.quadruples:
-            print('| %3d| %3s | %7s | %7s | %7s |' % (index, filterNone(quad[0]), filterNone(quad[1]), filterNone(quad[2]), filterNone(quad[3])))
-            index += 1
-
-quadList = QuadrupleList()
-
-# Estructura para generar las direcciones virtuales.
-# Permite generar direcciones en diferentes rangos en base al tipo de valor.
-# Además, se puede instanciar con un diferente número base para generar distintos rangos de direcciones en cada instancia.
-# Esto permite diferenciar las direcciones globales, locales, constantes, temporales, y de funciones, en base al rango al que corresponden.
-class MemoryMap:
-    def __init__(self, range_start=0):
-        self.int_start = range_start + 10000
-        self.float_start = range_start + 20000
-        self.boolean_start = range_start + 30000
-        self.string_start = range_start + 40000
-
-        self.int_count = 0
-        self.float_count = 0
-        self.boolean_count = 0
-        self.string_count = 0
-
-    def generateID(self, type):
-        type = type.translate(None, '[]')
-        if type == 'INT':
-            return self.generateIntID()
-        if type == 'FLOAT':
-            return self.generateFloatID()
-        if type == 'STRING':
-            return self.generateStringID()
-        if type == 'BOOLEAN':
-            return self.generateBooleanID()
-
-    def generateArrayID(self, type, size):
-        type = type.translate(None, '[]')
-        if type == 'INT':
-            return self.generateArrayIntID(size)
-        if type == 'FLOAT':
-            return self.generateArrayFloatID(size)
-        if type == 'STRING':
-            return self.generateArrayStringID(size)
-        if type == 'BOOLEAN':
-            return self.generateArrayBooleanID(size)
-
-    def generateIntID(self):
-        self.int_count += 1
-        return self.int_count + self.int_start
-
-    def generateFloatID(self):
-        self.float_count += 1
-        return self.float_count + self.float_start
-
-    def generateStringID(self):
-        self.string_count += 1
-        return self.string_count + self.string_start
-
-    def generateBooleanID(self):
-        self.boolean_count += 1
-        return self.boolean_count + self.boolean_start
-
-    def generateArrayIntID(self, size):
-        memID = self.int_count + 1
-        self.int_count += size
-        return memID + self.int_start
-
-    def generateArrayFloatID(self, size):
-        memID = self.float_count + 1
-        self.float_count += size
-        return memID + self.float_start
-
-    def generateArrayStringID(self, size):
-        memID = self.string_count + 1
-        self.string_count += size
-        return memID + self.string_start
-
-    def generateArrayBooleanID(self, size):
-        memID = self.boolean_count + 1
-        self.boolean_count += size
-        return memID + self.boolean_start
-
-variables = MemoryMap(50000)
-constants = MemoryMap(100000)
-temps = MemoryMap(150000)
-functions = MemoryMap(200000)
-globalvars = MemoryMap(250000)
-
-# Estructura similar a la tabla de símbolos, pero mucho más simplificada.
-# Almacena las direcciones, los tipos y los valores de todas las constantes del programa, a través de un cubo semántico.
-class ConstantTable:
-    def __init__(self):
-        self.symbols = dict()
-
-    def insert(self, token, type, memID):
-        tok = self.symbols.get(token)
-        if not tok:
-            self.symbols[token] = dict()
-        self.symbols[token][type] = memID
-
-    def lookup(self, token, type):
-        if token in self.symbols:
-            return self.symbols[token].get(type)
-        return None
-
-constantTable = ConstantTable()
-
-# Estructura que almacena los datos de los “structs” declarados por el programador, y que además guarda una tabla de símbolos para las instancias de cada struct, así como sus atributos, sus tipos y sus direcciones virtuales.
-class StructManager:
-    def __init__(self):
-        self.structs = dict()
-        self.instances = dict()
-        self.arrays = dict()
-
-    def createStruct(self, structID, attrList):
-        self.structs[structID] = attrList
-
-    def getAttributes(self, structID):
-        return self.structs.get(structID)
-
-    def createInstance(self, structInstanceID):
-        self.instances[structInstanceID] = dict()
-
-    def createArray(self, structInstanceID, size):
-        self.arrays[structInstanceID] = { 'size': size, 'attributes': dict() }
-
-    def addInstanceAttribute(self, structInstanceID, attrType, attrID, memID):
-        self.instances[structInstanceID][attrID] = { 'type': attrType, 'memID': memID}
-
-    def getInstanceAttribute(self, structInstanceID, attrID):
-        instance = self.instances.get(structInstanceID)
-        if instance is None:
-            return None
-        return instance.get(attrID)
+        message = Exception.__str__(self)
+        if self.line is None:
+            return message
+        return '%s in line #%d.' % (message.rstrip('.'), self.line)
 
-    def getInstance(self, structInstanceID):
-        return self.instances.get(structInstanceID)
+# Número máximo de llamadas anidadas de un programa. Una recursión más profunda termina con un ExecutionError en lugar de agotar la memoria.
+MAX_CALL_DEPTH = 100000
+# Número de registros libres de cada tamaño que se conservan para reutilizarlos.
+FRAME_POOL_SIZE = 64
 
-    def addArrayAttribute(self, structInstanceID, attrType, attrID, memID, index):
-        self.arrays[structInstanceID]['attributes'][attrID] = { 'type': attrType, 'memID': memID, 'index': index }
-
-    def getArray(self, structInstanceID):
-        return self.arrays.get(structInstanceID)
-
-    def getArrayAtrribute(self, structInstanceID, attrID):
-        array = self.arrays.get(structInstanceID)
-        if array is None:
-            return None
-        return array['attributes'].get(attrID)
-
-structManager = StructManager()
-
-from cycler import cycler
-import matplotlib.pyplot as plt
-import numpy as np
+# Tipos de los operandos decodificados por el enlazador: un valor constante, una dirección global o local, o un apuntador (guardado en un temporal local) hacia un arreglo global o local.
+CONSTANT, GLOBAL, LOCAL, GLOBAL_POINTER, LOCAL_POINTER = range(5)
 
 # Clase central que maneja las estructuras de memoria y contiene las funciones para realizar las operaciones especiales del lenguaje.
 class VirtualStack:
@@ -352,125 +62,237 @@ class VirtualStack:
         # Estructura que almacena la información de las funciones compiladas del programa, para poder cargar los parámetros que necesita una función y ejecutar el cuádruplo donde esta inicia.
         self.functions = dict()
 
-        # La pila del programa en la que residen los valores en memoria del programa del usuario. Cada registro en la pila corresponde a una estructura de memoria hace un “mapeo” de la dirección virtual al valor almacenado. Cada llamada a una función genera un nuevo registro en la pila. Las variables globales residen siempre en el registro que se encuentra en el fondo de la pila.
-        self.stack = [{}]
+        # La pila del programa en la que residen los valores en memoria del programa del usuario. Cada registro en la pila es una lista reservada con el tamaño exacto de la función, y cada variable o temporal ocupa la posición que le asignó el enlazador. Cada llamada a una función genera un nuevo registro en la pila; el registro del fondo corresponde a main. Las variables globales residen en su propia lista.
+        self.stack = list()
+        self.globals = list()
+        self.frame = None
+        self.returnStack = list()
+        self.newStacks = list()
+        # Registros libres de las funciones que ya regresaron, agrupados por tamaño y con todas sus posiciones en None, para reutilizarlos en las siguientes llamadas.
+        self.framePools = dict()
+        self.emptyFrames = dict()
+        self.maxCallDepth = MAX_CALL_DEPTH
+        self.mainFrame = createFrameLayout([])
+        self.globalFrame = createFrameLayout([])
 
         # Estructura que almacena los valores constantes usados en el programa.
         self.constants = dict()
         self.retValue = None
-        self.fileBuffer = list()
-        self.colors = ['yellowgreen', 'gold', 'lightskyblue', 'lightcoral']
-        plt.xkcd()
-        plt.rc('lines', linewidth=4)
-        plt.rc('axes', prop_cycle=(cycler('color', ['r', 'g', 'b', 'y']) +
-                           cycler('linestyle', ['-', '--', ':', '-.'])))
-
-    def createFunction(self, funcMemID, funcData):
-        self.functions[funcMemID] = funcData
+        self.vectorShape = None
+        self.pendingLoad = None
+        self.streams = dict()
+        self.graphDirectory = None
+        self.graphBackend = None
+        self.graphFormat = 'png'
+        self.deferGraphs = False
+        self.graphWorkers = None
+        self.graphNames = dict()
+        self.pendingGraphs = list()
+
+        # Archivo donde se escribe lo que imprime el programa. Con None se usa la salida estándar.
+        self.output = None
+
+    # Carga los datos de un programa compilado que necesita la máquina virtual.
+    def loadProgram(self, program):
+        self.constants = program['constants']
+        self.functions = program['functions']
+        self.mainFrame = program['mainFrame']
+        self.globalFrame = program['globalFrame']
 
     def lookupFunction(self, memID):
         func = self.functions.get(memID)
         if func is None:
-            print('Error: function not found %d.' % (memID))
-            raise Exception
+            raise ExecutionError('function not found %d.' % (memID))
         return func
 
+    # Reserva la memoria global y el registro de main antes de ejecutar el programa.
+    def initMemory(self):
+        self.globals = [None] * self.globalFrame['size']
+        self.frame = [None] * self.mainFrame['size']
+        self.stack = [self.frame]
+        self.returnStack = list()
+        self.newStacks = list()
+
     def createActivationRecord(self, funcMemID):
-        self.funcData = self.lookupFunction(funcMemID)
-        self.newStack = dict()
-        self.newStack['funcMemID'] = funcMemID
+        funcData = self.lookupFunction(funcMemID)
+        pool = self.framePools.get(funcData['size'])
+        self.newStacks.append((funcData, pool.pop() if pool else [None] * funcData['size']))
+
+    # Limpia un registro que ya no se usa y lo guarda para otra llamada, hasta FRAME_POOL_SIZE registros de cada tamaño.
+    def releaseFrame(self, frame):
+        size = len(frame)
+        pool = self.framePools.get(size)
+        if pool is None:
+            pool = self.framePools[size] = list()
+            self.emptyFrames[size] = [None] * size
+        if len(pool) < FRAME_POOL_SIZE:
+            frame[:] = self.emptyFrames[size]
+            pool.append(frame)
 
     def setParam(self, memID, index):
-        paramID = self.funcData['params'][index - 1]
-        self.newStack[paramID] = self.getAddressValue(memID)
+        funcData, newStack = self.newStacks[-1]
+        newStack[funcData['params'][index - 1]] = self.readOperand(memID)
 
     def replaceActivationRecord(self, quad):
-        currStack = self.getCurrentStack()
-        currStack['quad'] = quad
-        self.stack.append(self.newStack)
-        return self.funcData['start']
+        if len(self.stack) > self.maxCallDepth:
+            raise ExecutionError('maximum call depth of %d exceeded.' % self.maxCallDepth)
+        funcData, newStack = self.newStacks.pop()
+        self.returnStack.append(quad)
+        self.stack.append(newStack)
+        self.frame = newStack
+        return funcData['start']
+
+    # Llamada en posición de cola (TAILCALL): el registro de la función llamada sustituye al de la función actual, que ya no se necesita, y la dirección de regreso de la función actual no cambia, de modo que la pila no crece.
+    def replaceTailRecord(self):
+        funcData, newStack = self.newStacks.pop()
+        self.releaseFrame(self.stack[-1])
+        self.stack[-1] = newStack
+        self.frame = newStack
+        return funcData['start']
 
     def setReturnValue(self, memID):
-        self.retValue = self.getAddressValue(memID)
+        self.retValue = self.readOperand(memID)
 
     def endActivationRecord(self):
-        lastStack = self.stack.pop()
+        self.releaseFrame(self.stack.pop())
         assert len(self.stack) > 0, "There is no memory stack!"
-        currStack = self.getCurrentStack()
-        currStack[lastStack['funcMemID']] = self.retValue
-        return currStack['quad']
-
-    def getCurrentStack(self):
-        if len(self.stack) == 0:
-            self.stack.append(dict())
-        return self.stack[-1]
-
-    def insertConstantValue(self, id, val):
-        self.constants[id] = val
-
-    def findInStack(self, address):
-        if address > 250000:
-            return self.stack[0].get(address)
-
-        return self.stack[-1].get(address)
-
-    # Función principal para acceder a un valor en memoria durante la ejecución. Convierte los apuntadores en direcciones, y maneja las estructuras de stack y constants. La dirección se procesa para determinar, en base al rango en el que corresponde, si es una constante, una variable global, o una variable local.
-    def getAddressValue(self, address):
-        if (address > 100000 and address < 150000):
-            return self.constants[address]
+        self.frame = self.stack[-1]
+        return self.returnStack.pop()
+
+    # Función principal para acceder a un valor en memoria durante la ejecución. Recibe un operando ya decodificado por el enlazador, por lo que solo debe elegir la estructura de la que se lee el valor: la constante misma, la lista global, el registro actual, o la posición guardada en un apuntador.
+    def readOperand(self, operand):
+        kind, value = operand
+        if kind == LOCAL:
+            return self.frame[value]
+        elif kind == CONSTANT:
+            return value
+        elif kind == GLOBAL:
+            return self.globals[value]
+        elif kind == LOCAL_POINTER:
+            frame = self.frame
+            return frame[frame[value]]
         else:
-            if type(address) is str and address.startswith('*'):
-                address = self.findInStack(int(address[1:]))
-                return self.findInStack(address)
-            else:
-                return self.findInStack(address)
-
-    # Función utilizada para registrar los cambios a los valores en ejecución. Recibe la dirección y el valor que se le debe asignar. Determina la estructura que se debe actualizar dependiendo de si la dirección corresponde a un apuntador, a una variable global, o a una variable local.
-    def updateAddressValue(self, address, value):
-        if type(address) is str and address.startswith('*'):
-            address = self.findInStack(int(address[1:]))
-
-        if address > 250000:
-            self.stack[0][address] = value
+            return self.globals[self.frame[value]]
+
+    # Función utilizada para registrar los cambios a los valores en ejecución. Recibe el operando decodificado y el valor que se le debe asignar.
+    def writeOperand(self, operand, value):
+        kind, slot = operand
+        if kind == LOCAL:
+            self.frame[slot] = value
+        elif kind == GLOBAL:
+            self.globals[slot] = value
+        elif kind == LOCAL_POINTER:
+            frame = self.frame
+            frame[frame[slot]] = value
         else:
-            self.stack[-1][address] = value
+            self.globals[self.frame[slot]] = value
+
+    # Regresa la lista en la que reside un arreglo, a partir del tipo de su dirección base.
+    def getArrayStack(self, kind):
+        if kind == GLOBAL:
+            return self.globals
+        return self.frame
+
+    # Lee los valores contiguos de un arreglo como un arreglo de NumPy. Regresa None si algún elemento no tiene valor.
+    def readVector(self, operand, length):
+        kind, slot = operand
+        values = self.getArrayStack(kind)[slot:slot + length]
+        if None in values:
+            return None
+        return loadNumpy().array(values)
+
+    # Escribe de una sola vez los valores de un arreglo de NumPy en las posiciones contiguas de un arreglo.
+    def writeVector(self, operand, values):
+        kind, slot = operand
+        self.getArrayStack(kind)[slot:slot + len(values)] = values.tolist()
 
+    # Obtiene el tipo de una dirección a partir de su rango, sin importar si es local, temporal o global.
     def getVarType(self, address):
-        if address > 60000 and address < 70000:
-            return 'INT'
-        elif address > 70000 and address < 80000:
-            return 'FLOAT'
-        elif address > 80000 and address < 90000:
-            return 'BOOLEAN'
-        elif address > 90000 and address < 100000:
-            return 'STRING'
-
-    def cast(self, value, type):
+        return (None, 'INT', 'FLOAT', 'BOOLEAN', 'STRING')[(address % 50000) // 10000]
+
+    # Regresa la función que convierte el texto de una celda al tipo indicado, o None si el texto se guarda tal cual.
+    def getConverter(self, type):
         if type == 'INT':
-            return int(value)
+            return int
         elif type == 'FLOAT':
-            return float(value)
+            return float
         elif type == 'BOOLEAN':
-            return value == 'true'
+            return 'true'.__eq__
         elif type == 'STRING':
-            return value
+            return None
         else:
-            print('Unrecognized type "%s".' % type)
-            sys.exit()
-
-    def cleanFileBuffer(self):
-        self.fileBuffer = list()
-
-    def addFileRow(self, row):
-        self.fileBuffer.append(row)
-
-    def loadColumnInto(self, array, col):
-        type = self.getVarType(array)
-        index = 0
-        for row in self.fileBuffer:
-            value = self.cast(row[col], type)
-            self.updateAddressValue(array + index, value)
-            index += 1
+            raise ExecutionError('unrecognized type "%s".' % type)
+
+    # Registra el archivo que se va a cargar. La lectura ocurre hasta que se registran todas las columnas con addLoadColumn. Si se indica el nombre de un stream, en lugar de cargar el archivo se deja abierto para leerlo por bloques con fetchRows.
+    def prepareLoad(self, filename, maxRows, columnCount, stream=None):
+        self.pendingLoad = { 'filename': filename, 'maxRows': maxRows, 'columnCount': columnCount, 'columns': list(), 'stream': stream }
+
+    def addLoadColumn(self, array, col, type):
+        load = self.pendingLoad
+        load['columns'].append((col, self.getConverter(type), array))
+        if len(load['columns']) == load['columnCount']:
+            self.pendingLoad = None
+            if load['stream'] is None:
+                self.loadFile(load)
+            else:
+                self.openStream(load)
+
+    def loadFile(self, load):
+        with open(load['filename'], 'rb') as csvfile:
+            self.readRows(csv.reader(csvfile), load['columns'], load['maxRows'], load['filename'])
+
+    # Lee hasta maxRows filas en bloques. Cada bloque se transpone en columnas, cada columna se convierte con la función de su tipo y se escribe de una sola vez en su arreglo a partir de la posición 0, y el bloque se descarta antes de leer el siguiente. Regresa el número de filas leídas.
+    def readRows(self, reader, columns, maxRows, filename):
+        columns = [ (col, convert, self.getArrayStack(array[0]), array[1]) for col, convert, array in columns ]
+        loaded = 0
+        while loaded < maxRows:
+            rows = list(itertools.islice(reader, min(LOAD_CHUNK_ROWS, maxRows - loaded)))
+            if not rows:
+                break
+            cells = zip(*rows)
+            for col, convert, arrayStack, slot in columns:
+                if col >= len(cells):
+                    raise ExecutionError('missing column %d in file "%s".' % (col, filename))
+                values = cells[col] if convert is None else map(convert, cells[col])
+                arrayStack[slot + loaded:slot + loaded + len(rows)] = values
+            loaded += len(rows)
+        return loaded
+
+    # Abre el archivo de un stream mapeado en memoria, de modo que las filas se leen directamente de las páginas del archivo sin cargarlo completo.
+    def openStream(self, load):
+        self.closeStream(load['stream'])
+        csvfile = open(load['filename'], 'rb')
+        if os.fstat(csvfile.fileno()).st_size > 0:
+            data = mmap.mmap(csvfile.fileno(), 0, access=mmap.ACCESS_READ)
+            reader = csv.reader(iter(data.readline, ''))
+        else:
+            data, reader = None, csv.reader([])
+        self.streams[load['stream']] = { 'file': csvfile, 'data': data, 'reader': reader, 'columns': load['columns'], 'filename': load['filename'] }
+
+    def fetchRows(self, name, maxRows):
+        stream = self.streams.get(name)
+        if stream is None:
+            raise ExecutionError('struct array "%s" has no open stream.' % name)
+        if stream['reader'] is None:
+            return 0
+        rows = self.readRows(stream['reader'], stream['columns'], maxRows, stream['filename'])
+        if rows < maxRows:
+            self.closeStream(name)
+            stream['reader'] = None
+            self.streams[name] = stream
+        return rows
+
+    def closeStreams(self):
+        for name in list(self.streams):
+            self.closeStream(name)
+
+    def closeStream(self, name):
+        stream = self.streams.pop(name, None)
+        if stream is None or stream['reader'] is None:
+            return
+        if not stream['data'] is None:
+            stream['data'].close()
+        stream['file'].close()
 
     def prepareGraph(self, dataSize, attributes):
         fig = plt.figure()
@@ -483,1124 +305,1417 @@ class VirtualStack:
         self.plotData = list()
 
     def prepareGraph(self, dataSize, attributes):
+        loadGraphing(self.graphBackend)
         self.plotDataSize = dataSize
         self.plotAttributeNum = attributes
         self.plotLabels = list()
         self.plotLegends = list()
         self.plotData = list()
 
-    def prepareLabels(self, memID, nameMemID):
+    def prepareLabels(self, array, nameMemID):
+        kind, memID = array
+        arrayStack = self.getArrayStack(kind)
         index = 0
         while index < self.plotDataSize:
-            self.plotLabels.append(self.getAddressValue(memID + index))
+            self.plotLabels.append(arrayStack[memID + index])
             index += 1
-        self.plotLabelsName = self.getAddressValue(nameMemID)
+        self.plotLabelsName = self.readOperand(nameMemID)
 
-    def prepareColumn(self, memID, nameMemID):
-        self.plotLegends.append(self.getAddressValue(nameMemID))
+    def prepareColumn(self, array, nameMemID):
+        kind, memID = array
+        arrayStack = self.getArrayStack(kind)
+        self.plotLegends.append(self.readOperand(nameMemID))
         data = list()
         index = 0
         while index < self.plotDataSize:
-            data.append(self.getAddressValue(memID + index))
+            data.append(arrayStack[memID + index])
             index += 1
         self.plotData.append(data)
 
-    def displayLineGraph(self, graphTitle):
-        fig = plt.figure()
-        ax = fig.add_axes((0.1, 0.2, 0.8, 0.7))
-        ax.spines["right"].set_visible(False)
-        ax.spines["top"].set_visible(False)
+    # Configura la salida de las gráficas. Sin directorio, cada gráfica se muestra en una ventana con plt.show(); con directorio, se dibuja con un backend no interactivo y se guarda en un archivo con el nombre del arreglo de structs. Con defer, las gráficas se guardan hasta terminar el programa y se dibujan en paralelo en varios procesos.
+    def setGraphOutput(self, directory, format='png', defer=False, workers=None):
+        self.graphDirectory = directory
+        self.graphFormat = format
+        self.deferGraphs = defer
+        self.graphWorkers = workers
+        if not directory is None:
+            self.graphBackend = 'Agg'
+            if not plt is None:
+                plt.switch_backend('Agg')
 
-        index = 0
-        lines = list()
-        for data in self.plotData:
-            line, = plt.plot(data, label=self.plotLegends[index])
-            lines.append(line)
-            index += 1
-        ax.legend(handles=lines)
+    def displayLineGraph(self, graphTitle):
+        self.displayGraph('line', graphTitle)
 
-        lenLabels = len(self.plotLabels)
-        if lenLabels > 0:
-            plt.xticks(np.arange(lenLabels), self.plotLabels, rotation='vertical')
-            plt.margins(1)
-            plt.subplots_adjust(bottom=0.15)
+    def displayBarGraph(self, graphTitle):
+        self.displayGraph('bar', graphTitle)
 
-        plt.xlabel(self.plotLabelsName)
-        plt.title(self.getAddressValue(graphTitle))
-        plt.tick_params(bottom='off', top='off', right='off', left='off', pad=1.5)
-        plt.show()
+    def displayPieGraph(self, graphTitle):
+        self.displayGraph('pie', graphTitle)
+
+    # Reúne los datos preparados por GRAPH, LABELS y GATTR en una descripción de la gráfica que no depende de la memoria de la máquina virtual, para poder dibujarla después o en otro proceso.
+    def displayGraph(self, kind, graphTitle):
+        spec = {
+            'kind': kind,
+            'title': self.readOperand(graphTitle),
+            'dataSize': self.plotDataSize,
+            'attributeNum': self.plotAttributeNum,
+            'data': self.plotData,
+            'legends': self.plotLegends,
+            'labels': self.plotLabels,
+            'labelsName': getattr(self, 'plotLabelsName', ''),
+        }
+        if self.graphDirectory is None:
+            drawGraph(plt.figure(), spec)
+            plt.show()
+            return
+        count = self.graphNames.get(spec['title'], 0) + 1
+        self.graphNames[spec['title']] = count
+        name = spec['title'] if count == 1 else '%s-%d' % (spec['title'], count)
+        path = os.path.join(self.graphDirectory, '%s.%s' % (name, self.graphFormat))
+        if self.deferGraphs:
+            self.pendingGraphs.append((spec, path))
+        else:
+            saveGraph((spec, path))
+
+    # Dibuja las gráficas pendientes al terminar el programa, repartiéndolas entre varios procesos.
+    def flushGraphs(self):
+        graphs, self.pendingGraphs = self.pendingGraphs, list()
+        if len(graphs) > 1 and self.graphWorkers != 1:
+            import multiprocessing
+            pool = multiprocessing.Pool(self.graphWorkers)
+            try:
+                pool.map(saveGraph, graphs)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            for graph in graphs:
+                saveGraph(graph)
 
-    def displayBarGraph(self, graphTitle):
-        fig = plt.figure()
-        ax = fig.add_axes((0.1, 0.2, 0.8, 0.7))
-        ax.spines["right"].set_visible(False)
-        ax.spines["top"].set_visible(False)
+graphColors = ['yellowgreen', 'gold', 'lightskyblue', 'lightcoral']
 
-        width = 0.35
-        bars = list()
-        ind = np.arange(self.plotDataSize)
-        index = 0
-        for data in self.plotData:
-            bar = ax.bar(ind + index * width, data, width, color=self.colors[index % len(self.colors)])
-            bars.append(bar)
-            index += 1
-        plt.legend(bars, self.plotLegends)
+def drawLineGraph(fig, spec):
+    ax = fig.add_axes((0.1, 0.2, 0.8, 0.7))
+    ax.spines["right"].set_visible(False)
+    ax.spines["top"].set_visible(False)
 
-        lenLabels = len(self.plotLabels)
-        if lenLabels > 0:
-            plt.xticks(ind + width, self.plotLabels, rotation='vertical')
-            plt.subplots_adjust(bottom=0.15)
+    index = 0
+    lines = list()
+    for data in spec['data']:
+        line, = ax.plot(data, label=spec['legends'][index])
+        lines.append(line)
+        index += 1
+    ax.legend(handles=lines)
+
+    lenLabels = len(spec['labels'])
+    if lenLabels > 0:
+        ax.set_xticks(np.arange(lenLabels))
+        ax.set_xticklabels(spec['labels'], rotation='vertical')
+        ax.margins(1)
+        fig.subplots_adjust(bottom=0.15)
+
+    ax.set_xlabel(spec['labelsName'])
+    ax.set_title(spec['title'])
+    ax.tick_params(bottom='off', top='off', right='off', left='off', pad=1.5)
+
+def drawBarGraph(fig, spec):
+    ax = fig.add_axes((0.1, 0.2, 0.8, 0.7))
+    ax.spines["right"].set_visible(False)
+    ax.spines["top"].set_visible(False)
+
+    width = 0.35
+    bars = list()
+    ind = np.arange(spec['dataSize'])
+    index = 0
+    for data in spec['data']:
+        bar = ax.bar(ind + index * width, data, width, color=graphColors[index % len(graphColors)])
+        bars.append(bar)
+        index += 1
+    ax.legend(bars, spec['legends'])
 
-        plt.xlabel(self.plotLabelsName)
-        plt.title(self.getAddressValue(graphTitle))
-        plt.tick_params(bottom='off', top='off', right='off', left='off', pad=1.5)
-        plt.show()
+    lenLabels = len(spec['labels'])
+    if lenLabels > 0:
+        ax.set_xticks(ind + width)
+        ax.set_xticklabels(spec['labels'], rotation='vertical')
+        fig.subplots_adjust(bottom=0.15)
 
-    def displayPieGraph(self, graphTitle):
-        fig = plt.figure()
-        ax = fig.gca()
+    ax.set_xlabel(spec['labelsName'])
+    ax.set_title(spec['title'])
+    ax.tick_params(bottom='off', top='off', right='off', left='off', pad=1.5)
 
-        index = 0
-        radius = 1.0 / self.plotAttributeNum
-        offset = 0.5
-        for data in self.plotData:
-            ax.pie(data, labels=self.plotLabels, colors=self.colors, autopct='%1.1f%%', startangle=90, radius=radius, center=(index + radius * index, 0.5), shadow=True)
-            index += 1
+def drawPieGraph(fig, spec):
+    ax = fig.gca()
 
-        ax.set_xlim((-0.5, 1.5))
-        ax.set_ylim((-0.65, 1.5))
-        ax.set_aspect('equal')
-
-        ind = np.arange(len(self.plotLegends))
-        plt.xticks(ind + radius * ind, self.plotLegends)
-
-        plt.title(self.getAddressValue(graphTitle))
-        plt.tick_params(bottom='off', top='off', right='off', left='off')
-        plt.show()
-
-virtualStack = VirtualStack()
-
-declareGlobal = False
-
-def p_program(p):
-    '''
-    program : prog_token T_ID T_STOP structs var_declares functions main_token block
-            | prog_token T_ID T_STOP structs var_declares main_token block
-            | prog_token T_ID T_STOP structs functions main_token block
-            | prog_token T_ID T_STOP var_declares functions main_token block
-            | prog_token T_ID T_STOP functions main_token block
-            | prog_token T_ID T_STOP structs main_token block
-            | prog_token T_ID T_STOP var_declares main_token block
-            | prog_token T_ID T_STOP main_token block
-    '''
-    quadList.insertJump('END')
-    print('Program syntax parsed correctly')
-    print('Symbols Tables:')
-    print(currentSymbolTable)
-    print('Quadruples:')
-    quadList.printQuadruples()
-
-def p_prog_token(p):
-    '''
-    prog_token : T_PROGRAM
-    '''
-    quadList.insertJump('GOTO')
-
-def p_main_token(p):
-    '''
-    main_token : T_MAIN
-    '''
-    quadList.updateJump(0)
-
-def p_var_declares(p):
-    '''
-    var_declares : var_token var_declare T_STOP var_declares
-                 | var_token var_declare T_STOP
-    '''
-    global declareGlobal
-    declareGlobal = False
-
-def p_var_token(p):
-    'var_token : T_VAR'
-    global declareGlobal
-    declareGlobal = True
-
-def p_functions(p):
-    '''
-    functions : func functions
-              | func
-    '''
-
-def p_func(p):
-    '''
-    func : function_signature T_EXP_START parameters T_EXP_END block
-         | function_signature T_EXP_START T_EXP_END block
-    '''
-    pLen = len(p)
-    func_sign, block = p[1], p[pLen - 1]
-    assert not block is None, "Incorrectly parsed function '%s' block start quadruple, line #%d." % (id, func_sign['lineNumber'])
-    if pLen == 6:
-        params = p[3]
-    else:
-        params = list()
-    virtualStack.createFunction(func_sign['memID'], { 'start': block['start'], 'params': params })
-    if quadList.getLastQuad()[0] != 7:
-        quadList.insertJump('RET')
-
-def p_function_signature(p):
-    'function_signature : function_type T_ID'
-    type, id = p[1], p[2]
-    symbol = currentSymbolTable.lookup(id)
-    if not symbol is None and symbol['type'] == 'FUNCTION':
-        print('Semantic Error: duplicated function with ID "%s" in line #%d.' % (id, lineNumber))
-        sys.exit()
-    memID = functions.generateIntID()
-    currentSymbolTable.insertFunction(id, type, memID)
-    p[0] = { 'memID': memID, 'lineNumber': lineNumber }
-
-def p_parameters(p):
-    'parameters : param T_COMMA parameters'
-    p[0] = [ p[1] ] + p[3]
-
-def p_parameters_single(p):
-    'parameters : param'
-    p[0] = [ p[1] ]
-
-def p_param(p):
-    '''
-    param : type T_ID
-    '''
-    type, id = p[1], p[2]
-    symbol = currentSymbolTable.lookup(id)
-    if not symbol is None and symbol['type'] == type:
-        print('Semantic Error: duplicated variable of type %s with ID "%s" in line #%d.' % (type, id, lineNumber))
-        sys.exit()
-    memID = variables.generateID(type)
-    currentSymbolTable.insert(id, type, memID)
-    p[0] = memID
-
-def p_var_declare_array(p):
-    'var_declare : type T_ID T_ARR_START T_INT_CONST T_ARR_END'
-    type, id, size = p[1], p[2], int(p[4])
-    symbol = currentSymbolTable.lookup(id)
-    if not symbol is None and symbol['type'] == type:
-        print('Semantic Error: duplicated variable of type %s with ID "%s" in line #%d.' % (type, id, lineNumber))
-        sys.exit()
-    global declareGlobal
-    if declareGlobal:
-        memID = globalvars.generateArrayID(type, size)
-    else:
-        memID = variables.generateArrayID(type, size)
-    currentSymbolTable.insertArray(id, p[1], memID, size)
-
-def p_var_declare_matrix(p):
-    'var_declare : type T_ID T_ARR_START T_INT_CONST T_ARR_END T_ARR_START T_INT_CONST T_ARR_END'
-    type, id, rows, columns = p[1], p[2], int(p[4]), int(p[7])
-    symbol = currentSymbolTable.lookup(id)
-    if not symbol is None and symbol['type'] == type:
-        print('Semantic Error: duplicated variable of type %s with ID "%s" in line #%d.' % (type, id, lineNumber))
-        sys.exit()
-    size = rows * columns
-    global declareGlobal
-    if declareGlobal:
-        memID = globalvars.generateArrayID(type, size)
-    else:
-        memID = variables.generateArrayID(type, size)
-    currentSymbolTable.insertArray(id, p[1], memID, [ rows, columns ])
-
-def p_var_declare_struct_array(p):
-    'var_declare : T_STRUCT T_ID T_ID T_ARR_START T_INT_CONST T_ARR_END'
-    structID, arrID, size = p[2], p[3], int(p[5])
-    attributes = structManager.getAttributes(structID)
-    if attributes is None:
-        print('Semantic Error: undeclared struct type "%s" in line #%d.' % (structID, lineNumber))
-        sys.exit()
-    elif not structManager.getArray(arrID) is None:
-        print('Semantic Error: duplicated struct array "%s" in line #%d.' % (structID, lineNumber))
-        sys.exit()
-    structManager.createArray(arrID, size)
     index = 0
-    for attribute in attributes:
-        global declareGlobal
-        if declareGlobal:
-            memID = globalvars.generateArrayID(attribute['type'], size)
-        else:
-            memID = variables.generateArrayID(attribute['type'], size)
-        structManager.addArrayAttribute(arrID, attribute['type'], attribute['id'], memID, index)
+    radius = 1.0 / spec['attributeNum']
+    for data in spec['data']:
+        ax.pie(data, labels=spec['labels'], colors=graphColors, autopct='%1.1f%%', startangle=90, radius=radius, center=(index + radius * index, 0.5), shadow=True)
         index += 1
 
-def p_var_declare(p):
-    'var_declare : type var_ids'
-    type = p[1]
-    for id in p[2]:
-        symbol = currentSymbolTable.lookup(id)
-        if not symbol is None and symbol['type'] == type:
-            print('Semantic Error: duplicated variable of type %s with ID "%s" in line #%d.' % (type, id, lineNumber))
-            sys.exit()
-        global declareGlobal
-        if declareGlobal:
-            memID = globalvars.generateID(type)
-        else:
-            memID = variables.generateID(type)
-        currentSymbolTable.insert(id, type, memID)
-
-def p_function_type(p):
-    '''
-    function_type : type
-                  | T_VOID
-    '''
-    p[0] = p[1]
-
-def p_type(p):
-    '''
-    type : T_BOOLEAN
-         | T_STRING
-         | T_INT
-         | T_FLOAT
-    '''
-    p[0] = p[1].upper()
-
-def p_type_struct(p):
-    '''
-    type_struct : struct_id T_ID
-    '''
-    structID = p[2]
-    if structManager.getInstance(structID):
-        print('Semantic Error: duplicated struct instance name "%s" in line #%d' %(structID, lineNumber))
-        sys.exit()
-    attributeList = structManager.getAttributes(p[1])
-    structManager.createInstance(structID)
-    for attribute in attributeList:
-        memID = variables.generateID(attribute['type'])
-        structManager.addInstanceAttribute(structID, attribute['type'], attribute['id'], memID)
-
-def p_var_ids(p):
-    '''
-    var_ids : T_ID T_COMMA var_ids
-            | T_ID
-    '''
-    if len(p) < 4:
-        p[0] = [ p[1] ]
-    else:
-        p[3].append(p[1])
-        p[0] = p[3]
-
-def p_block(p):
-    '''
-    block : block_start process block_end
-    '''
-    p[0] = { 'start' : p[1], 'end' : p[3] }
-
-def p_block_empty(p):
-    '''
-    block : T_BLOCK_START T_BLOCK_END
-    '''
-    quadNumber = quadList.getListSize()
-    p[0] = { 'start': quadNumber, 'end': quadNumber }
-
-def p_block_start(p):
-    '''
-    block_start : T_BLOCK_START
-    '''
-    p[0] = quadList.getListSize()
-    # crear nuevo scope local dentro del bloque, solo si el scope anterior no esta vacio
-    global currentSymbolTable
-    newScope = SymbolTable()
-    currentSymbolTable.addChild(newScope)
-    newScope.setParent(currentSymbolTable)
-    currentSymbolTable = newScope
-
-def p_block_end(p):
-    '''
-    block_end : T_BLOCK_END
-    '''
-    p[0] = quadList.getListSize()
-    # cambiar al scope del bloque de afuera
-    global currentSymbolTable
-    currentSymbolTable = currentSymbolTable.parent
-
-def p_call_func(p):
-    '''
-    call_func : id_token T_EXP_START T_EXP_END
-    '''
-    symbol = p[1]
-    quadList.insertQuad('GOSUB', symbol['memID'])
-    p[0] = symbol
-
-def p_call_func_args(p):
-    '''
-    call_func : id_token T_EXP_START args T_EXP_END
-    '''
-    symbol, args = p[1], p[3]
-    count = 1
-    for param in args :
-        quadList.insertQuad('PARAM', param['id'], None, count)
-        count += 1
-    quadList.insertQuad('GOSUB', symbol['memID'])
-    p[0] = symbol
-
-def p_return(p):
-    '''
-    return : T_RETURN
-    '''
-    quadList.insertJump('RET')
-
-def p_return_value(p):
-    '''
-    return : T_RETURN value
-    '''
-    value = p[2]
-    quadList.insertQuad('RETURN', value['id'])
-    quadList.insertJump('RET')
-
-def p_structs(p):
-    '''
-    structs : stru structs
-            | stru
-    '''
-
-def p_stru(p):
-    '''
-    stru : T_STRUCT struct_id T_BLOCK_START struct_declare T_BLOCK_END
-    '''
-    structManager.createStruct(p[2], p[4])
-
-def p_struct_declare_repeat(p):
-    '''
-    struct_declare : type T_ID T_STOP struct_declare
-    '''
-    declare_list = p[4]
-    p[0] = [ { 'type' : p[1], 'id' : p[2] } ] + declare_list
-
-def p_struct_declare(p):
-    '''
-    struct_declare : type T_ID T_STOP
-    '''
-    p[0] = [ { 'type' : p[1], 'id' : p[2] } ]
-
-def p_struct_id(p):
-    '''
-    struct_id : T_ID
-    '''
-    p[0] = p[1]
-
-def p_id_token(p):
-    '''
-    id_token : T_ID
-    '''
-    id = p[1]
-    symbol = currentSymbolTable.lookup(id)
-    if symbol is None or symbol['type'] != 'FUNCTION' :
-        print('Semantic Error: "%s" is not a function in line #%d.' % (id, lineNumber))
-        sys.exit()
-    quadList.insertQuad('ERA', symbol['memID'])
-    p[0] = symbol
-
-def p_args(p):
-    '''
-    args : value T_COMMA args
-    '''
-    value, args = p[1], p[3]
-    p[0] = [ value ] + args
-
-def p_args_value(p):
-    '''
-    args : value
-    '''
-    p[0] = [ p[1] ]
-
-def p_process(p):
-    '''
-    process : proc T_STOP process
-            | proc T_STOP
-    '''
-
-def p_proc(p):
-    '''
-    proc : while
-         | do_while
-         | for
-         | assign
-         | assign_struct
-         | assign_matrix
-         | condition
-         | write
-         | input
-         | var_declare
-         | type_struct
-         | call_func
-         | return
-         | graph
-         | load
-    '''
-
-def p_condition(p):
-    # if (expression) { };
-    '''
-    condition : T_IF T_EXP_START expression exp_end block
-    '''
-    expression, exp_end = p[3], p[4]
-    quadList.updateJump(exp_end, expression['id'])
-
-def p_condition_else(p):
-    # if (expression) { } else { };
-    '''
-    condition : T_IF T_EXP_START expression exp_end block else
-    '''
-    expression, exp_end, block = p[3], p[4], p[5]
-    quadList.updateJump(exp_end, expression['id'], block['end'] + 1)
-
-def p_condition_else_if(p):
-    # if (expression) { } else if { };
-    '''
-    condition : T_IF T_EXP_START expression exp_end block else_token condition
-    '''
-    expression, exp_end, block, else_token = p[3], p[4], p[5], p[6]
-    quadList.updateJump(exp_end, expression['id'], block['end'] + 1)
-    quadList.updateJump(else_token)
-
-def p_exp_end(p):
-    '''
-    exp_end : T_EXP_END
-    '''
-    p[0] = quadList.insertJump('GOTOF')
-
-def p_else(p):
-    '''
-    else : else_token block
-    '''
-    else_token, block = p[1], p[2]
-    quadList.updateJump(else_token, None, block['end'])
-
-def p_else_token(p):
-    '''
-    else_token : T_ELSE
-    '''
-    p[0] = quadList.insertJump('GOTO')
-
-def p_while(p):
-    # while (expresion) { };
-    '''
-    while : while_token T_EXP_START expression exp_end block
-    '''
-    while_token, expression, exp_end = p[1], p[3], p[4]
-    quadList.insertJump('GOTO', while_token)
-    quadList.updateJump(exp_end, expression['id'])
-
-def p_while_token(p):
-    'while_token : T_WHILE'
-    p[0] = quadList.getListSize()
-
-def p_for(p):
-    '''
-    for : T_FOR T_EXP_START assign first_stop expression second_stop assign T_EXP_END block
-    '''
-    first_stop, expression, second_stop, block = p[4], p[5], p[6], p[9]
-    quadList.moveQuadRangeToEnd(second_stop + 1, block['start'])
-    quadList.insertJump('GOTO', first_stop)
-    quadList.updateJump(second_stop, expression['id'])
-
-def p_first_stop(p):
-    'first_stop : T_STOP'
-    p[0] = quadList.getListSize()
-
-def p_second_stop(p):
-    'second_stop : T_STOP'
-    p[0] = quadList.insertJump('GOTOF')
-
-def p_do_while(p):
-    # do { } while ();
-    '''
-    do_while : T_DO block T_WHILE T_EXP_START expression T_EXP_END
-    '''
-    block, expression = p[2], p[5]
-    quadList.insertJump('GOTOV', block['start'], expression['id'])
-
-def p_assign_simple(p):
-    '''
-    assign : id T_ASSIGN value
-    '''
-    id, value = p[1], p[3]
-    if id['type'] == 'FLOAT' and value['type'] == 'INT':
-        quadList.insertAssign(value['id'], id['id'])
-    elif id['type'] != value['type']:
-        print('Semantic Error: variable "%s" is type %s, but you are trying to assign a value of type %s in line #%d.' % (id['token'], id['type'], value['type'], lineNumber))
-        sys.exit()
-    else:
-        quadList.insertAssign(value['id'], id['id'])
-
-def p_assign_array(p):
-    'assign : id T_ASSIGN T_ARR_START array T_ARR_END'
-    id, array = p[1], p[4]
-    if not 'size' in id or type(id['size']) != int:
-        print('Semantic Error: variable "%s" must be an array in line #%d.' % (id['token'], lineNumber))
-        sys.exit()
-    elif id['size'] != len(array):
-        print('Semantic Error: cannot assign an array of size %d to "%s" in line #%d.' % (len(array), id['token'], lineNumber))
-        sys.exit()
-    elif id['type'] != array[0]['type'] and not (id['type'] == 'FLOAT' and array[0]['type'] == 'INT'):
-        print('Semantic Error: array is type %s, but you are trying to assign an array of type %s to it in line #%d.' % (id['type'], array[0]['type'], lineNumber))
-        sys.exit()
-    else:
-        i = 0
-        for value in array:
-            quadList.insertAssign(value['id'], id['id'] + i)
-            i += 1
-
-def p_assign_array_empty(p):
-    'assign : id T_ASSIGN T_ARR_START T_ARR_END'
-    id = p[1]
-    if 'size' not in id or type(id) != int:
-        print('Semantic Error: variable "%s" must be an array in line #%d.' % (id['token'], lineNumber))
-        sys.exit()
-    elif id['size'] != 0:
-        print('Semantic Error: cannot assign an empty array to "%s" in line #%d.' % (id['token'], lineNumber))
-        sys.exit()
-
-def p_assign_matrix(p):
-    'assign_matrix : id T_ASSIGN T_ARR_START arrays T_ARR_END'
-    id, arrays = p[1], p[4]
-    matrixLen = len(sum(arrays, []))
-    if not 'size' in id or len(id.get('size')) != 2:
-        print('Semantic Error: variable "%s" must be a matrix in line #%d.' % (id['token'], lineNumber))
-        sys.exit()
-    elif id['size'] != matrixLen:
-        print('Semantic Error: cannot assign an matrix of %d elements to "%s" in line #%d.' % (matrixLen, id['token'], lineNumber))
-        sys.exit()
-    elif id['type'] != arrays[0][0]['type'] and not (id['type'] == 'FLOAT' and arrays[0][0]['type'] == 'INT'):
-        print('Semantic Error: array is type %s, but you are trying to assign an array of type %s to it in line #%d.' % (id['type'], arrays[0][0]['type'], lineNumber))
-        sys.exit()
-    else:
-        i = 0
-        for array in arrays:
-            j = 0
-            for value in array:
-                offset = id['size'][1] * i + j
-                quadList.insertAssign(value['id'], id['id'] + offset)
-                j += 1
-            i += 1
-
-def p_arrays(p):
-    'arrays : T_ARR_START array T_ARR_END T_COMMA arrays'
-    array, arrays = p[2], p[5]
-    if array[0]['type'] != arrays[0][0]['type'] and not (array[0]['type'] == 'FLOAT' and arrays[0][0]['type'] == 'INT'):
-        print('Semantic Error: array type mismatch between %s and %s in line #%d.' % (array[0]['type'], arrays[0][0]['type'], lineNumber))
-        sys.exit()
-    p[0] = [ array ] + arrays
-
-def p_arrays_simple(p):
-    'arrays : T_ARR_START array T_ARR_END'
-    p[0] = [ p[2] ]
-
-def p_assign_struct(p):
-    '''
-    assign_struct : T_ID T_COLON T_ID T_ASSIGN value
-    '''
-    instance_id, attribute_id, value = p[1], p[3], p[5]
-    attribute = structManager.getInstanceAttribute(instance_id, attribute_id)
-    if attribute is None:
-        print('Semantic Error: attribute "%s" is not defined in for struct instance "%s" in line #%d.' % (attribute_id, instance_id, lineNumber))
-        sys.exit()
-    if attribute['type'] == 'FLOAT' and value['type'] == 'INT':
-        quadList.insertAssign(value['id'], attribute['memID'])
-    elif attribute['type'] != value['type']:
-        print('Semantic Error: attribute "%s" is type %s, but you are trying to assign a value of type %s in line #%d.' % (attribute_id, attribute['type'], value['type'], lineNumber))
-        sys.exit()
-    else:
-        quadList.insertAssign(value['id'], attribute['memID'])
-
-def p_id_array_struct(p):
-    'id : T_ID T_ARR_START e T_ARR_END T_COLON T_ID'
-    structID, e, attrID = p[1], p[3], p[6]
-    struct = structManager.getArray(structID)
-    if struct is None:
-        print('Semantic Error: variable "%s" must be a struct array in line #%d.' % (structID, lineNumber))
-        sys.exit()
-    elif not e['type'] == 'INT':
-        print('Semantic Error: array index for "%s" must be an integer in line #%d.' % (structID, lineNumber))
-        sys.exit()
-    attr = struct['attributes'].get(attrID)
-    if attr is None:
-        print('Semantic Error: struct "%s" has no attribute "%s" in line #%d.' % (structID, attrID, lineNumber))
-        sys.exit()
-    tempID = temps.generateIntID()
-    quadList.insertQuad('VER', e['id'], struct['size'])
-    quadList.insertOperation('ARRSUM', attr['memID'], e['id'], tempID)
-    p[0] = { 'type': attr['type'], 'id': '*' + str(tempID), 'size': struct['size'], 'token': attrID }
-
-def p_id_array(p):
-    '''
-    id : T_ID T_ARR_START e T_ARR_END
-    '''
-    symbol, e = currentSymbolTable.lookup(p[1]), p[3]
-    if symbol is None:
-        print('Semantic Error: undeclared array with ID "%s" in line #%d.' % (p[1], lineNumber))
-        sys.exit()
-    elif not 'size' in symbol:
-        print('Semantic Error: variable with ID "%s" must be an array in line #%d.' % (p[1], lineNumber))
-        sys.exit()
-    elif not e['type'] == 'INT':
-        print('Semantic Error: array index for "%s" must be an integer in line #%d.' % (p[1], lineNumber))
-        sys.exit()
-    tempID = temps.generateIntID()
-    quadList.insertQuad('VER', e['id'], symbol['size'])
-    quadList.insertOperation('ARRSUM', symbol['memID'], e['id'], tempID)
-    p[0] = { 'type': symbol['type'], 'id': '*' + str(tempID), 'size': symbol['size'], 'token': p[1] }
-
-def p_id_matrix(p):
-    'id : T_ID T_ARR_START e T_ARR_END T_ARR_START e T_ARR_END'
-    symbol, rowInd, colInd = currentSymbolTable.lookup(p[1]), p[3], p[6]
-    if symbol is None:
-        print('Semantic Error: undeclared array with ID "%s" in line #%d.' % (p[1], lineNumber))
-        sys.exit()
-    elif not 'size' in symbol:
-        print('Semantic Error: variable with ID "%s" must be an array in line #%d.' % (p[1], lineNumber))
-        sys.exit()
-    elif not rowInd['type'] == 'INT' or not colInd['type'] == 'INT':
-        print('Semantic Error: array index for "%s" must be an integer in line #%d.' % (p[1], lineNumber))
-        sys.exit()
-    multID, sumID, pointerID = temps.generateIntID(), temps.generateIntID(), temps.generateIntID()
-    quadList.insertQuad('VER', rowInd['id'], symbol['size'][0])
-    quadList.insertQuad('VER', colInd['id'], symbol['size'][1])
-    quadList.insertOperation('ARRMULT', symbol['size'][1], rowInd['id'], multID)
-    quadList.insertOperation('+', multID, colInd['id'], sumID)
-    quadList.insertOperation('ARRSUM', symbol['memID'], sumID, pointerID)
-    p[0] = { 'type': symbol['type'], 'id': '*' + str(pointerID), 'size': symbol['size'], 'token': p[1] }
-
-def p_id(p):
-    'id : T_ID'
-    symbol = currentSymbolTable.lookup(p[1])
-    if symbol is None:
-        print('Semantic Error: undeclared variable with ID "%s" in line #%d.' % (p[1], lineNumber))
-        sys.exit()
-    elif 'size' in symbol:
-        p[0] = { 'type': symbol['type'], 'id': symbol['memID'], 'size': symbol['size'], 'token': p[1] }
-    else:
-        p[0] = { 'type': symbol['type'], 'id': symbol['memID'], 'token': p[1] }
-
-def p_array(p):
-    'array : value T_COMMA array'
-    value, array = p[1], p[3]
-    if value['type'] != array[0]['type']:
-        print('Semantic Error: type mismatch in array declaration between %s and %s values in line #%d.' % (value['type'], array[0]['type'], lineNumber))
-        sys.exit()
-    p[0] = [ value ] + array
-
-def p_array_value(p):
-    'array : value'
-    p[0] = [ p[1] ]
-
-def p_value_expression(p):
-    'value : expression'
-    p[0] = p[1]
-
-def p_value_string(p):
-    'value : T_STRING_CONST'
-    type = 'STRING'
-    memID = constantTable.lookup(p[1], type)
-    if memID:
-        p[0] = { 'type': type, 'id': memID }
-    else:
-        memID = constants.generateStringID()
-        constantTable.insert(p[1], type, memID)
-        virtualStack.insertConstantValue(memID, p[1][1:-1])
-        p[0] = { 'type': type, 'id': memID }
-
-def p_write(p):
-    'write : T_PRINT T_EXP_START concat T_EXP_END'
-    concat = p[3]
-    quadList.insertQuad('PRINT', concat['id'])
-
-def p_write_line(p):
-    'write : T_PRINTLN T_EXP_START concat T_EXP_END'
-    concat = p[3]
-    quadList.insertQuad('PRINTLN', concat['id'])
-
-def p_input(p):
-    'input : T_INPUT T_EXP_START id T_EXP_END'
-    id = p[3]
-    quadList.insertQuad('INPUT', id['id'])
-
-def p_graph_struct(p):
-    '''
-    graph : T_LINE T_EXP_START T_ID T_EXP_END
-          | T_BAR T_EXP_START T_ID T_EXP_END
-          | T_PIE T_EXP_START T_ID T_EXP_END
-    '''
-    op, structID = p[1], p[3]
-    struct = structManager.getArray(structID)
-    if struct is None:
-        print('Semantic Error: variable "%s" must be a struct array in line #%d.' % (structID, lineNumber))
-        sys.exit()
-
-    graphAttributes = list()
-    labels = None
-    for attrID in struct['attributes']:
-        attribute = struct['attributes'][attrID]
-        if attribute['type'] == 'BOOLEAN':
-            continue
-        nameMemID = constantTable.lookup(attrID, 'STRING')
-        if nameMemID is None:
-            nameMemID = constants.generateStringID()
-            constantTable.insert(attrID, 'STRING', nameMemID)
-            virtualStack.insertConstantValue(nameMemID, attrID)
-        attribute['nameMemID'] = nameMemID
-        if attribute['type'] == 'INT' or attribute['type'] == 'FLOAT':
-            graphAttributes.append(attribute)
-        elif attribute['type'] == 'STRING':
-            labels = attribute
-
-    quadList.insertQuad('GRAPH', struct['size'], len(graphAttributes))
-
-    if len(graphAttributes) == 0:
-        print('Semantic Error: struct "%s" has no numeric attributes and cannot be graphed in line #%d.' % (structID, lineNumber))
-        sys.exit()
-    elif not labels is None:
-        quadList.insertQuad('LABELS', labels['memID'], labels['nameMemID'])
-
-    for attribute in graphAttributes:
-        quadList.insertQuad('GATTR', attribute['memID'], attribute['nameMemID'])
-
-    graphNameID = constantTable.lookup(structID, 'STRING')
-    if graphNameID is None:
-        graphNameID = constants.generateStringID()
-        constantTable.insert(structID, 'STRING', graphNameID)
-        virtualStack.insertConstantValue(graphNameID, structID)
-
-    if op == 'line':
-        quadList.insertQuad('LINEGRAPH', graphNameID, None, None)
-    elif op == 'bar':
-        quadList.insertQuad('BARGRAPH', graphNameID, None, None)
-    elif op == 'pie':
-        quadList.insertQuad('PIEGRAPH', graphNameID, None, None)
-
-def p_load(p):
-    'load : T_LOAD T_EXP_START T_STRING_CONST T_COMMA T_ID T_EXP_END'
-    string_const, structID = p[3], p[5]
-    memID = constantTable.lookup(string_const, 'STRING')
-    if memID is None:
-        memID = constants.generateStringID()
-        constantTable.insert(string_const, 'STRING', memID)
-        virtualStack.insertConstantValue(memID, string_const[1:-1])
-    struct = structManager.getArray(structID)
-    if struct is None:
-        print('Semantic Error: variable "%s" must be a struct array in line #%d.' % (structID, lineNumber))
-        sys.exit()
-    quadList.insertQuad('LOAD', memID, struct['size'], len(struct['attributes']))
-    for attrID in struct['attributes']:
-        attribute = struct['attributes'][attrID]
-        quadList.insertQuad('LATTR', attribute['index'], None, attribute['memID'])
-
-def p_concat_const(p):
-    'concat : T_STRING_CONST'
-    type = 'STRING'
-    memID = constantTable.lookup(p[1], type)
-    if memID:
-        p[0] = { 'type': type, 'id': memID }
-    else:
-        memID = constants.generateStringID()
-        constantTable.insert(p[1], type, memID)
-        virtualStack.insertConstantValue(memID, p[1][1:-1])
-        p[0] = { 'type': type, 'id': memID }
-
-def p_concat_expr(p):
-    'concat : expression'
-    p[0] = p[1]
-
-def p_concat_op_const(p):
-    'concat : T_STRING_CONST T_CONCAT concat'
-    string_const, op, concat = p[1], p[2], p[3]
-    type = 'STRING'
-    memID = constantTable.lookup(string_const, type)
-    if not memID:
-        memID = constants.generateStringID()
-        constantTable.insert(string_const, type, memID)
-        virtualStack.insertConstantValue(memID, string_const[1:-1])
-    operationMemID = temps.generateStringID()
-    quadList.insertOperation(op, memID, concat['id'], operationMemID)
-    p[0] = { 'type': type, 'id': operationMemID }
-
-def p_concat_op_expr(p):
-    'concat : expression T_CONCAT concat'
-    expression, op, concat = p[1], p[2], p[3]
-    memID = temps.generateStringID()
-    quadList.insertOperation(op, expression['id'], concat['id'], memID)
-    p[0] = { 'type': 'STRING', 'id': memID }
-
-def p_expression_op(p):
-    # Expresiones && y ||
-    'expression : exp T_OPREL expression'
-    exp, op, expression = p[1], p[2], p[3]
-    if exp['type'] != 'BOOLEAN' or expression['type'] != 'BOOLEAN':
-        print('Semantic Error: logic operands must be boolean type in line #%d.' % (lineNumber))
-        sys.exit()
-    memID = temps.generateBooleanID()
-    quadList.insertOperation(op, exp['id'], expression['id'], memID)
-    p[0] = { 'type': 'BOOLEAN', 'id': memID }
-
-def p_expresion(p):
-    'expression : exp'
-    p[0] = p[1]
-
-def p_exp_op(p):
-    # Expresiones de comparacion (<, >, !=, ==, <=, >=)
-    'exp : e T_OPCOMP exp'
-    e, op, exp = p[1], p[2], p[3]
-    if e['type'] != exp['type'] and ((e['type'] != 'INT' and e['type'] != 'FLOAT') or (exp['type'] != 'INT' and exp['type'] != 'FLOAT')):
-        print('Semantic Error: relational operands must be the same type in line #%d.' % (lineNumber))
-        sys.exit()
-    memID = temps.generateBooleanID()
-    quadList.insertOperation(op, e['id'], exp['id'], memID)
-    p[0] = { 'type': 'BOOLEAN', 'id': memID }
-
-def p_exp(p):
-    'exp : e'
-    p[0] = p[1]
-
-def p_e_op(p):
-    'e : term T_OPARIT e'
-    term, op, e = p[1], p[2], p[3]
-    if (term['type'] != 'INT' and term['type'] != 'FLOAT') or (e['type'] != 'INT' and e['type'] != 'FLOAT'):
-        print('Semantic Error: arithmetic operands must be of numeric type (int or float) in line #%d.' % (lineNumber))
-        sys.exit()
-    elif term['type'] == 'FLOAT' or e['type'] == 'FLOAT':
-        type = 'FLOAT'
-    else:
-        type = e['type']
-    memID = temps.generateID(type)
-    quadList.insertOperation(op, term['id'], e['id'], memID)
-    p[0] = { 'type': type, 'id': memID }
-
-def p_e(p):
-    'e : term'
-    p[0] = p[1]
-
-def p_term_op(p):
-    'term : factor T_OPFACT term'
-    factor, op, term = p[1], p[2], p[3]
-    if (factor['type'] != 'INT' and factor['type'] != 'FLOAT') or (term['type'] != 'INT' and term['type'] != 'FLOAT'):
-        print('Semantic Error: arithmetic operands must be of numeric type (int or float) in line #%d.' % (lineNumber))
-        sys.exit()
-    elif factor['type'] == 'FLOAT' or term['type'] == 'FLOAT':
-        type = 'FLOAT'
-    else:
-        type = term['type']
-    memID = temps.generateID(type)
-    quadList.insertOperation(op, factor['id'], term['id'], memID)
-    p[0] = { 'type': type, 'id': memID }
-
-def p_term(p):
-    'term : factor'
-    p[0] = p[1]
-
-def p_factor(p):
-    'factor : T_EXP_START expression T_EXP_END'
-    p[0] = p[2]
-
-def p_factor_int(p):
-    'factor : T_INT_CONST'
-    int_const = p[1]
-    type = 'INT'
-    memID = constantTable.lookup(int_const, type)
-    if not memID:
-        memID = constants.generateIntID()
-        constantTable.insert(int_const, type, memID)
-        virtualStack.insertConstantValue(memID, int(int_const))
-    p[0] = { 'type': type, 'id': memID }
-
-def p_factor_float(p):
-    'factor : T_FLOAT_CONST'
-    float_const = p[1]
-    type = 'FLOAT'
-    memID = constantTable.lookup(float_const, type)
-    if not memID:
-        memID = constants.generateFloatID()
-        constantTable.insert(float_const, type, memID)
-        virtualStack.insertConstantValue(memID, float(float_const))
-    p[0] = { 'type': type, 'id': memID }
-
-def p_factor_boolean(p):
-    '''
-    factor : T_TRUE
-           | T_FALSE
-    '''
-    bool_const = p[1]
-    type = 'BOOLEAN'
-    memID = constantTable.lookup(bool_const, type)
-    if not memID:
-        memID = constants.generateBooleanID()
-        constantTable.insert(bool_const, type, memID)
-        virtualStack.insertConstantValue(memID, bool_const == 'true')
-    p[0] = { 'type': type, 'id': memID }
-
-def p_factor_struct(p):
-    '''
-    factor : T_ID T_COLON T_ID
-    '''
-    instance_id, attribute_id = p[1], p[3]
-    attribute = structManager.getInstanceAttribute(instance_id, attribute_id)
-    p[0] = { 'type': attribute['type'], 'id': attribute['memID'] }
-
-def p_factor_id(p):
-    'factor : id'
-    id = p[1]
-    if id['type'].endswith('[]'):
-        p[0] = { 'type': id['type'][:-2], 'id': id['id'] }
-    else:
-        p[0] = id
-
-def p_factor_func(p):
-    'factor : call_func'
-    symbol = p[1]
-    if symbol is None or not 'returnType' in symbol:
-        print("Semantic Error: '%s' is not a function in line #%d." % (id, lineNumber))
-    tempID = temps.generateID(symbol['returnType'])
-    quadList.insertQuad('COPYRET', symbol['memID'], None, tempID)
-    p[0] = { 'type': symbol['returnType'], 'id': tempID }
-
-def p_error(p):
-    if p:
-        global lineNumber
-        print('Syntax error at token "%s" in line #%d.' % (p.value, lineNumber))
-    else:
-        print('Syntax error at EOF.')
-    sys.exit()
+    ax.set_xlim((-0.5, 1.5))
+    ax.set_ylim((-0.65, 1.5))
+    ax.set_aspect('equal')
+
+    ind = np.arange(len(spec['legends']))
+    ax.set_xticks(ind + radius * ind)
+    ax.set_xticklabels(spec['legends'])
+
+    ax.set_title(spec['title'])
+    ax.tick_params(bottom='off', top='off', right='off', left='off')
+
+graphDrawers = { 'line': drawLineGraph, 'bar': drawBarGraph, 'pie': drawPieGraph }
 
-parser = yacc.yacc()
+def drawGraph(fig, spec):
+    graphDrawers[spec['kind']](fig, spec)
 
-if len(sys.argv) < 2:
-    file_name = raw_input('Nombre del archivo de entrada: ')
-else:
-    file_name = sys.argv[1]
+# Figura que se reutiliza para guardar todas las gráficas de un proceso, en lugar de crear una nueva por cada gráfica.
+graphFigure = None
 
-with open(file_name) as file_obj:
-    parser.parse(file_obj.read())
+def saveGraph(graph):
+    global graphFigure
+    spec, path = graph
+    if graphFigure is None:
+        graphFigure = plt.figure()
+    graphFigure.clf()
+    drawGraph(graphFigure, spec)
+    graphFigure.savefig(path)
 
 import csv
-# Ejecutar cuadruplos
-i = 0
-lenQuads = len(quadList.quadruples)
-while i < lenQuads:
-    quad = quadList.quadruples[i]
-    i += 1
-    if quad[0] == 1:
-        i = int(quad[3])
-    elif quad[0] == 2:
-        condition = virtualStack.getAddressValue(quad[1])
+import itertools
+import mmap
+
+# Número de filas de un archivo CSV que se leen y convierten a la vez durante un load.
+LOAD_CHUNK_ROWS = 4096
+
+# Genera los manejadores de cada código de operación para una instancia de VirtualStack, de modo que cada máquina virtual tenga los suyos. Cada manejador recibe el cuádruplo y el índice del siguiente cuádruplo, y regresa el índice del cuádruplo que se debe ejecutar después.
+def createHandlers(virtualStack):
+    def execGoto(quad, i):
+        return int(quad[3])
+
+    def execGotoF(quad, i):
+        condition = virtualStack.readOperand(quad[1])
         if not condition:
-            i = int(quad[3])
-    elif quad[0] == 3:
-        condition = virtualStack.getAddressValue(quad[1])
+            return int(quad[3])
+        return i
+
+    def execGotoV(quad, i):
+        condition = virtualStack.readOperand(quad[1])
         if condition:
-            i = int(quad[3])
-    elif quad[0] == 4:
+            return int(quad[3])
+        return i
+
+    def execEra(quad, i):
         virtualStack.createActivationRecord(quad[1])
-    elif quad[0] == 5:
+        return i
+
+    def execGosub(quad, i):
         # Guardar el cuadruplo al que debemos regresar, y obtener el cuadruplo del inicio de la funcion
-        i = virtualStack.replaceActivationRecord(i)
-    elif quad[0] == 6:
+        return virtualStack.replaceActivationRecord(i)
+
+    def execParam(quad, i):
         virtualStack.setParam(quad[1], quad[3])
-    elif quad[0] == 7:
-        i = virtualStack.endActivationRecord()
-    elif quad[0] == 8:
+        return i
+
+    def execRet(quad, i):
+        return virtualStack.endActivationRecord()
+
+    def execTailCall(quad, i):
+        return virtualStack.replaceTailRecord()
+
+    def execReturn(quad, i):
         virtualStack.setReturnValue(quad[1])
-    elif quad[0] == 9:
-        print(virtualStack.getAddressValue(quad[1]), end="")
-    elif quad[0] == 10:
-        value = input()
-        virtualStack.updateAddressValue(quad[1], value)
-    elif quad[0] == 11:
-        virtualStack.displayLineGraph(quad[1])
-    elif quad[0] == 12:
-        virtualStack.prepareColumn(quad[1], quad[2])
-    elif quad[0] == 13:
-        value1, value2 = virtualStack.getAddressValue(quad[1]), virtualStack.getAddressValue(quad[2])
-        virtualStack.updateAddressValue(quad[3], value1 + value2)
-    elif quad[0] == 14:
-        value1, value2 = virtualStack.getAddressValue(quad[1]), virtualStack.getAddressValue(quad[2])
-        virtualStack.updateAddressValue(quad[3], value1 - value2)
-    elif quad[0] == 15:
-        value1, value2 = virtualStack.getAddressValue(quad[1]), virtualStack.getAddressValue(quad[2])
-        virtualStack.updateAddressValue(quad[3], value1 / value2)
-    elif quad[0] == 16:
-        value1, value2 = virtualStack.getAddressValue(quad[1]), virtualStack.getAddressValue(quad[2])
-        virtualStack.updateAddressValue(quad[3], value1 * value2)
-    elif quad[0] == 17:
-        value1, value2 = virtualStack.getAddressValue(quad[1]), virtualStack.getAddressValue(quad[2])
-        virtualStack.updateAddressValue(quad[3], str(value1) + str(value2))
-    elif quad[0] == 18:
-        value1, value2 = virtualStack.getAddressValue(quad[1]), virtualStack.getAddressValue(quad[2])
-        virtualStack.updateAddressValue(quad[3], value1 and value2)
-    elif quad[0] == 19:
-        value1, value2 = virtualStack.getAddressValue(quad[1]), virtualStack.getAddressValue(quad[2])
-        virtualStack.updateAddressValue(quad[3], value1 or value2)
-    elif quad[0] == 20:
-        value1, value2 = virtualStack.getAddressValue(quad[1]), virtualStack.getAddressValue(quad[2])
-        virtualStack.updateAddressValue(quad[3], value1 < value2)
-    elif quad[0] == 21:
-        value1, value2 = virtualStack.getAddressValue(quad[1]), virtualStack.getAddressValue(quad[2])
-        virtualStack.updateAddressValue(quad[3], value1 > value2)
-    elif quad[0] == 22:
-        value1, value2 = virtualStack.getAddressValue(quad[1]), virtualStack.getAddressValue(quad[2])
-        virtualStack.updateAddressValue(quad[3], value1 == value2)
-    elif quad[0] == 23:
-        value1, value2 = virtualStack.getAddressValue(quad[1]), virtualStack.getAddressValue(quad[2])
-        virtualStack.updateAddressValue(quad[3], value1 != value2)
-    elif quad[0] == 24:
-        sys.exit()
-    elif quad[0] == 25:
-        value = virtualStack.getAddressValue(quad[1])
+        return i
+
+    def execPrint(quad, i):
+        print(virtualStack.readOperand(quad[1]), end="", file=virtualStack.output)
+        return i
+
+    def execPrintLine(quad, i):
+        print(virtualStack.readOperand(quad[1]), file=virtualStack.output)
+        return i
+
+    # Lee una línea de la entrada y la convierte al tipo de la variable, que el enlazador deja en el segundo campo del cuádruplo. El texto nunca se evalúa como código.
+    def execInput(quad, i):
+        try:
+            text = raw_input()
+        except EOFError:
+            raise ExecutionError('no input available in quadruple #%d.' % (i - 1))
+        convert = parseBoolean if quad[2] == 'BOOLEAN' else virtualStack.getConverter(quad[2])
+        if convert is None:
+            value = text
+        else:
+            try:
+                value = convert(text.strip())
+            except ValueError:
+                raise ExecutionError('invalid %s input "%s" in quadruple #%d.' % (quad[2], text, i - 1))
+        virtualStack.writeOperand(quad[1], value)
+        return i
+
+    def execAssign(quad, i):
+        value = virtualStack.readOperand(quad[1])
         if value is None:
-            print('Error: undefined variable in quadruple #%d.' % (i - 1))
-            raise Exception
-        virtualStack.updateAddressValue(quad[3], value)
-        assert virtualStack.getAddressValue(quad[3]) == value
-    elif quad[0] == 26:
+            raise ExecutionError('undefined variable in quadruple #%d.' % (i - 1))
+        virtualStack.writeOperand(quad[3], value)
+        return i
+
+    def execCopyRet(quad, i):
+        virtualStack.writeOperand(quad[3], virtualStack.retValue)
+        return i
+
+    def execEnd(quad, i):
+        if virtualStack.pendingGraphs:
+            virtualStack.flushGraphs()
+        return sys.maxsize
+
+    def execLoad(quad, i):
         # Prepare to load a csv file to a struct
-        filename = virtualStack.getAddressValue(quad[1])
-        virtualStack.cleanFileBuffer()
-        maxRows = quad[2]
-        rows = 0
-        with open(filename, 'rb') as csvfile:
-            rows_reader = csv.reader(csvfile)
-            for row in rows_reader:
-                virtualStack.addFileRow(row)
-                rows += 1
-                if rows == maxRows:
-                    break
-    elif quad[0] == 27:
-        value = virtualStack.getAddressValue(quad[1])
+        virtualStack.prepareLoad(virtualStack.readOperand(quad[1]), quad[2], quad[3])
+        return i
+
+    def execStream(quad, i):
+        virtualStack.prepareLoad(virtualStack.readOperand(quad[1]), None, quad[3], virtualStack.readOperand(quad[2]))
+        return i
+
+    def execFetch(quad, i):
+        virtualStack.writeOperand(quad[3], virtualStack.fetchRows(virtualStack.readOperand(quad[1]), quad[2]))
+        return i
+
+    def execLoadAttribute(quad, i):
+        # Register the column of an attribute; the file is read once the last one is registered
+        virtualStack.addLoadColumn(quad[3], quad[1], quad[2])
+        return i
+
+    def execVerify(quad, i):
+        value = virtualStack.readOperand(quad[1])
         if value < 0 or value >= quad[2]:
-            print('Error: undefined index %d in quadruple #%d.' % (value, i))
-            raise Exception
-    elif quad[0] == 28:
-        address, index = quad[1], virtualStack.getAddressValue(quad[2])
-        virtualStack.updateAddressValue(quad[3], address + index)
-    elif quad[0] == 29:
-        address, index = quad[1], virtualStack.getAddressValue(quad[2])
-        virtualStack.updateAddressValue(quad[3], address * index)
-    elif quad[0] == 30:
-        retValue = virtualStack.getAddressValue(quad[1])
-        virtualStack.updateAddressValue(quad[3], retValue)
-    elif quad[0] == 31:
-        value1, value2 = virtualStack.getAddressValue(quad[1]), virtualStack.getAddressValue(quad[2])
-        virtualStack.updateAddressValue(quad[3], value1 <= value2)
-    elif quad[0] == 32:
-        value1, value2 = virtualStack.getAddressValue(quad[1]), virtualStack.getAddressValue(quad[2])
-        virtualStack.updateAddressValue(quad[3], value1 >= value2)
-    elif quad[0] == 33:
-        # Load file column into attribute
-        virtualStack.loadColumnInto(quad[3], quad[1])
-    elif quad[0] == 34:
-        virtualStack.prepareLabels(quad[1], quad[2])
-    elif quad[0] == 35:
+            raise ExecutionError('undefined index %d in quadruple #%d.' % (value, i))
+        return i
+
+    def execArraySum(quad, i):
+        address, index = quad[1][1], virtualStack.readOperand(quad[2])
+        virtualStack.writeOperand(quad[3], address + index)
+        return i
+
+    def execArrayMult(quad, i):
+        size, index = quad[1], virtualStack.readOperand(quad[2])
+        virtualStack.writeOperand(quad[3], size * index)
+        return i
+
+    # Accesos directos a un elemento: equivalen a VER, ARRSUM y la lectura o escritura a través del apuntador (y a ARRMULT y + en las matrices), en un solo cuádruplo.
+    def execArrayLoad(quad, i):
+        kind, slot, limit = quad[1]
+        index = virtualStack.readOperand(quad[2])
+        checkIndex(index, limit, i)
+        array = virtualStack.globals if kind == GLOBAL else virtualStack.frame
+        virtualStack.writeOperand(quad[3], array[slot + index])
+        return i
+
+    def execArrayStore(quad, i):
+        value = virtualStack.readOperand(quad[1])
+        if value is None:
+            raise ExecutionError('undefined variable in quadruple #%d.' % (i - 1))
+        kind, slot, limit = quad[3]
+        index = virtualStack.readOperand(quad[2])
+        checkIndex(index, limit, i)
+        array = virtualStack.globals if kind == GLOBAL else virtualStack.frame
+        array[slot + index] = value
+        return i
+
+    def execMatrixLoad(quad, i):
+        kind, slot, columns, rowLimit, columnLimit = quad[1]
+        row, column = virtualStack.readOperand(quad[2][0]), virtualStack.readOperand(quad[2][1])
+        checkIndex(row, rowLimit, i)
+        checkIndex(column, columnLimit, i)
+        array = virtualStack.globals if kind == GLOBAL else virtualStack.frame
+        virtualStack.writeOperand(quad[3], array[slot + columns * row + column])
+        return i
+
+    def execMatrixStore(quad, i):
+        value = virtualStack.readOperand(quad[1])
+        if value is None:
+            raise ExecutionError('undefined variable in quadruple #%d.' % (i - 1))
+        kind, slot, columns, rowLimit, columnLimit = quad[3]
+        row, column = virtualStack.readOperand(quad[2][0]), virtualStack.readOperand(quad[2][1])
+        checkIndex(row, rowLimit, i)
+        checkIndex(column, columnLimit, i)
+        array = virtualStack.globals if kind == GLOBAL else virtualStack.frame
+        array[slot + columns * row + column] = value
+        return i
+
+    def execGraph(quad, i):
         virtualStack.prepareGraph(quad[1], quad[2])
-    elif quad[0] == 36:
+        return i
+
+    def execLabels(quad, i):
+        virtualStack.prepareLabels(quad[1], quad[2])
+        return i
+
+    def execGraphAttribute(quad, i):
+        virtualStack.prepareColumn(quad[1], quad[2])
+        return i
+
+    def execLineGraph(quad, i):
+        virtualStack.displayLineGraph(quad[1])
+        return i
+
+    def execBarGraph(quad, i):
         virtualStack.displayBarGraph(quad[1])
-    elif quad[0] == 37:
+        return i
+
+    def execPieGraph(quad, i):
         virtualStack.displayPieGraph(quad[1])
-    elif quad[0] == 38:
-        print(virtualStack.getAddressValue(quad[1]))
+        return i
+
+    # Genera el manejador de una operación binaria a partir de la función que calcula el resultado.
+    def binaryOperation(operation):
+        readOperand, writeOperand = virtualStack.readOperand, virtualStack.writeOperand
+        def execOperation(quad, i):
+            writeOperand(quad[3], operation(readOperand(quad[1]), readOperand(quad[2])))
+            return i
+        return execOperation
+
+    def execVectorDim(quad, i):
+        virtualStack.vectorShape = quad[1:]
+        return i
+
+    # Lee un operando de una operación sobre arreglos: el arreglo completo si así lo indica el cuádruplo VDIM previo, o un escalar que se aplica a todos los elementos.
+    def readVectorOperand(operand, length, isArray, i):
+        if isArray:
+            value = virtualStack.readVector(operand, length)
+        else:
+            value = virtualStack.readOperand(operand)
+        if value is None:
+            raise ExecutionError('undefined variable in quadruple #%d.' % (i - 1))
+        return value
+
+    # Genera el manejador de una operación elemento por elemento sobre arreglos, usando la misma función que la operación escalar.
+    def elementwiseOperation(operation):
+        def execVectorOperation(quad, i):
+            length, flags = virtualStack.vectorShape[0], virtualStack.vectorShape[1]
+            left = readVectorOperand(quad[1], length, flags & 1, i)
+            right = readVectorOperand(quad[2], length, flags & 2, i)
+            if operation is binaryOperations['/'] and not np.all(right):
+                raise ZeroDivisionError('division by zero')
+            virtualStack.writeVector(quad[3], operation(left, right))
+            return i
+        return execVectorOperation
+
+    # Genera el manejador de una reducción de un arreglo a un escalar.
+    def vectorReduction(reduction):
+        def execVectorReduction(quad, i):
+            values = readVectorOperand(quad[1], quad[2], True, i)
+            virtualStack.writeOperand(quad[3], reduction(values))
+            return i
+        return execVectorReduction
+
+    def execVectorDot(quad, i):
+        length = virtualStack.vectorShape[0]
+        left = readVectorOperand(quad[1], length, True, i)
+        right = readVectorOperand(quad[2], length, True, i)
+        virtualStack.writeOperand(quad[3], np.dot(left, right).item())
+        return i
+
+    def execMatrixMult(quad, i):
+        rows, inner, columns = virtualStack.vectorShape
+        left = readVectorOperand(quad[1], rows * inner, True, i).reshape(rows, inner)
+        right = readVectorOperand(quad[2], inner * columns, True, i).reshape(inner, columns)
+        virtualStack.writeVector(quad[3], np.dot(left, right).ravel())
+        return i
+
+    def execVectorCopy(quad, i):
+        virtualStack.writeVector(quad[3], readVectorOperand(quad[1], quad[2], True, i))
+        return i
+
+    return {
+        'GOTO': execGoto,
+        'GOTOF': execGotoF,
+        'GOTOV': execGotoV,
+        'ERA': execEra,
+        'GOSUB': execGosub,
+        'PARAM': execParam,
+        'RET': execRet,
+        'TAILCALL': execTailCall,
+        'RETURN': execReturn,
+        'PRINT': execPrint,
+        'INPUT': execInput,
+        'LINEGRAPH': execLineGraph,
+        'GATTR': execGraphAttribute,
+        '+': binaryOperation(binaryOperations['+']),
+        '-': binaryOperation(binaryOperations['-']),
+        '/': binaryOperation(binaryOperations['/']),
+        '*': binaryOperation(binaryOperations['*']),
+        '.': binaryOperation(binaryOperations['.']),
+        '&&': binaryOperation(binaryOperations['&&']),
+        '||': binaryOperation(binaryOperations['||']),
+        '<': binaryOperation(binaryOperations['<']),
+        '>': binaryOperation(binaryOperations['>']),
+        '==': binaryOperation(binaryOperations['==']),
+        '!=': binaryOperation(binaryOperations['!=']),
+        'END': execEnd,
+        '=': execAssign,
+        'LOAD': execLoad,
+        'VER': execVerify,
+        'ARRSUM': execArraySum,
+        'ARRMULT': execArrayMult,
+        'COPYRET': execCopyRet,
+        '<=': binaryOperation(binaryOperations['<=']),
+        '>=': binaryOperation(binaryOperations['>=']),
+        'LATTR': execLoadAttribute,
+        'LABELS': execLabels,
+        'GRAPH': execGraph,
+        'BARGRAPH': execBarGraph,
+        'PIEGRAPH': execPieGraph,
+        'PRINTLN': execPrintLine,
+        'VDIM': execVectorDim,
+        'V+': elementwiseOperation(binaryOperations['+']),
+        'V-': elementwiseOperation(binaryOperations['-']),
+        'V/': elementwiseOperation(binaryOperations['/']),
+        'V*': elementwiseOperation(binaryOperations['*']),
+        'VSUM': vectorReduction(lambda values: values.sum().item()),
+        'VMIN': vectorReduction(lambda values: values.min().item()),
+        'VMAX': vectorReduction(lambda values: values.max().item()),
+        'VMEAN': vectorReduction(lambda values: float(values.mean())),
+        'VDOT': execVectorDot,
+        'MATMUL': execMatrixMult,
+        'VCOPY': execVectorCopy,
+        'STREAM': execStream,
+        'FETCH': execFetch,
+        'ALOAD': execArrayLoad,
+        'ASTORE': execArrayStore,
+        'MLOAD': execMatrixLoad,
+        'MSTORE': execMatrixStore,
+    }
+
+# Verifica un índice como VER. Un límite None indica que el optimizador ya verificó el índice.
+def checkIndex(value, limit, i):
+    if not limit is None and (value < 0 or value >= limit):
+        raise ExecutionError('undefined index %d in quadruple #%d.' % (value, i))
+
+# Convierte el texto que lee INPUT para una variable booleana. A diferencia de los archivos CSV, cualquier otro texto es un error.
+def parseBoolean(text):
+    if text == 'true':
+        return True
+    elif text == 'false':
+        return False
+    raise ValueError(text)
+
+# Convierte un error de Python en la ejecución de un cuádruplo (una división entre cero, o una operación con un valor indefinido o de otro tipo) en un ExecutionError. Si el error ocurrió dentro de una función compilada por el backend 'jit', el índice es el del cuádruplo de esa función que lo generó.
+def runtimeError(error, index):
+    traceback = sys.exc_info()[2]
+    while not traceback is None:
+        quadIndexes = traceback.tb_frame.f_globals.get('quadIndexes')
+        if not quadIndexes is None and traceback.tb_lineno <= len(quadIndexes) and not quadIndexes[traceback.tb_lineno - 1] is None:
+            index = quadIndexes[traceback.tb_lineno - 1]
+        traceback = traceback.tb_next
+    if isinstance(error, ZeroDivisionError):
+        executionError = ExecutionError('division by zero in quadruple #%d.' % index)
     else:
-        print('Error: undefined OP code %d.' % quad[0])
-        raise Exception
+        executionError = ExecutionError('invalid operation (%s) in quadruple #%d.' % (error, index))
+    executionError.index = index
+    return executionError
+
+def execUndefined(quad, i):
+    raise ExecutionError('undefined OP code %d.' % quad[0])
+
+# Tabla de despacho indexada por el código numérico de cada operación, para no recorrer una cadena de comparaciones por cada cuádruplo.
+def createDispatchTable(virtualStack):
+    dispatchTable = [execUndefined] * (max(ops.values()) + 1)
+    for name, handler in createHandlers(virtualStack).items():
+        dispatchTable[ops[name]] = handler
+    return dispatchTable
+
+linkModes = [(None, None, None)] * (max(ops.values()) + 1)
+for name, modes in operandModes.items():
+    linkModes[ops[name]] = modes
+
+# Decodifica una dirección virtual en un operando (tipo, valor). Las constantes se sustituyen por su valor, las variables por su posición en el registro global o en el registro de la función a la que pertenece el cuádruplo, y los apuntadores ('*' seguido de la dirección del temporal) se clasifican según el arreglo al que apuntan.
+def decodeAddress(virtualStack, address, layout, pointerKinds, index):
+    if type(address) is str:
+        pointer = int(address[1:])
+        kind = pointerKinds.get(pointer)
+        if kind is None:
+            raise ExecutionError('unresolved pointer %s in quadruple #%d.' % (address, index))
+        return (kind, resolveSlot(layout, pointer, index))
+    elif address > 100000 and address < 150000:
+        return (CONSTANT, virtualStack.constants[address])
+    elif address > 250000:
+        return (GLOBAL, resolveSlot(virtualStack.globalFrame, address, index))
+    return (LOCAL, resolveSlot(layout, address, index))
+
+# Decodifica la dirección base de un arreglo en (tipo, posición), sin sustituirla por su valor.
+def decodeArrayBase(virtualStack, address, layout, index):
+    if address > 250000:
+        return (GLOBAL, resolveSlot(virtualStack.globalFrame, address, index))
+    return (LOCAL, resolveSlot(layout, address, index))
+
+def resolveSlot(layout, address, index):
+    slot = None
+    if not layout is None:
+        slot = frameSlot(layout, address)
+    if slot is None:
+        raise ExecutionError('address %d is outside the activation record of quadruple #%d.' % (address, index))
+    return slot
+
+# Regresa las regiones de código (cuádruplo inicial, distribución del registro) de cada función y de main, ordenadas por su inicio.
+def getCodeRegions(virtualStack, quadruples):
+    regions = [ (funcData['start'], funcData) for funcData in virtualStack.functions.values() ]
+    regions.append((quadruples[0][3], virtualStack.mainFrame))
+    regions.sort(key=lambda region: region[0])
+    return regions
+
+# Enlazador: convierte una sola vez los operandos de cada cuádruplo a su forma decodificada, para que la máquina virtual no tenga que procesar cadenas ni clasificar rangos de direcciones durante la ejecución.
+def linkQuadruples(virtualStack, quadruples):
+    pointerKinds = dict()
+    linked = list()
+    regions = getCodeRegions(virtualStack, quadruples)
+    layout = None
+    for index, quad in enumerate(quadruples):
+        while regions and regions[0][0] <= index:
+            layout = regions.pop(0)[1]
+        op = quad[0]
+        linkedQuad = [op]
+        for mode, field in zip(linkModes[op], quad[1:]):
+            if mode is None or field is None:
+                linkedQuad.append(field)
+            elif mode == 'a':
+                linkedQuad.append(decodeArrayBase(virtualStack, field, layout, index))
+            elif mode == 'd':
+                linkedQuad.append(decodeArrayBase(virtualStack, field[0], layout, index) + tuple(field[1:]))
+            elif mode == 'p':
+                linkedQuad.append(tuple(decodeAddress(virtualStack, value, layout, pointerKinds, index) for value in field))
+            else:
+                linkedQuad.append(decodeAddress(virtualStack, field, layout, pointerKinds, index))
+        if op == ops['ARRSUM']:
+            pointerKinds[quad[3]] = GLOBAL_POINTER if linkedQuad[1][0] == GLOBAL else LOCAL_POINTER
+        elif op == ops['LATTR']:
+            linkedQuad[2] = virtualStack.getVarType(quad[3])
+        elif op == ops['INPUT']:
+            linkedQuad[2] = valueTypes[quad[2]]
+        linked.append(tuple(linkedQuad))
+    return linked
+
+# Ejecutar cuadruplos. Regresa el número de cuádruplos ejecutados.
+def execute(virtualStack, table, quadruples):
+    virtualStack.initMemory()
+    executed = 0
+    i = 0
+    lenQuads = len(quadruples)
+    try:
+        while i < lenQuads:
+            quad = quadruples[i]
+            i = table[quad[0]](quad, i + 1)
+            executed += 1
+    except ExecutionError as error:
+        error.index = i
+        raise
+    except (ZeroDivisionError, TypeError) as error:
+        raise runtimeError(error, i)
+    return executed
+
+import operator
+
+# Funciones de las operaciones binarias para el backend de closures. Donde el resultado es el mismo, se usan las funciones del módulo operator, que se llaman más rápido que las de binaryOperations.
+closureOperations = dict((ops[name], operation) for name, operation in binaryOperations.items())
+closureOperations.update({
+    ops['+']: operator.add,
+    ops['-']: operator.sub,
+    ops['/']: operator.div,
+    ops['*']: operator.mul,
+    ops['<']: operator.lt,
+    ops['>']: operator.gt,
+    ops['==']: operator.eq,
+    ops['!=']: operator.ne,
+    ops['<=']: operator.le,
+    ops['>=']: operator.ge,
+})
+
+# Backend de closures: convierte cada cuádruplo enlazado en una función sin argumentos que ya tiene resueltos sus operandos y el índice del siguiente cuádruplo, y que al ejecutarse regresa el índice del cuádruplo que sigue. Las operaciones más frecuentes tienen versiones especializadas según el tipo de sus operandos; las demás llaman al manejador de la tabla de despacho con el cuádruplo ya fijo. Se genera después de initMemory, porque las closures guardan la lista de variables globales de la ejecución.
+# Con jit, además, las funciones del usuario que se llaman JIT_CALL_THRESHOLD veces se traducen a funciones de Python con compileFunction, y sus siguientes llamadas las ejecutan directamente.
+def compileClosures(virtualStack, table, quadruples, jit=False):
+    globalMemory = virtualStack.globals
+    jitFunctions = dict()
+
+    # Regresa una función que lee el valor actual del operando.
+    def reader(operand):
+        kind, value = operand
+        if kind == CONSTANT:
+            return lambda: value
+        elif kind == LOCAL:
+            return lambda: virtualStack.frame[value]
+        elif kind == GLOBAL:
+            return lambda: globalMemory[value]
+        elif kind == LOCAL_POINTER:
+            def readLocalPointer():
+                frame = virtualStack.frame
+                return frame[frame[value]]
+            return readLocalPointer
+        return lambda: globalMemory[virtualStack.frame[value]]
+
+    # Regresa una función que asigna un valor al operando.
+    def writer(operand):
+        kind, slot = operand
+        if kind == LOCAL:
+            def writeLocal(value):
+                virtualStack.frame[slot] = value
+            return writeLocal
+        elif kind == GLOBAL:
+            def writeGlobal(value):
+                globalMemory[slot] = value
+            return writeGlobal
+        elif kind == LOCAL_POINTER:
+            def writeLocalPointer(value):
+                frame = virtualStack.frame
+                frame[frame[slot]] = value
+            return writeLocalPointer
+        def writeGlobalPointer(value):
+            globalMemory[virtualStack.frame[slot]] = value
+        return writeGlobalPointer
+
+    def undefinedVariable(next):
+        return ExecutionError('undefined variable in quadruple #%d.' % (next - 1))
+
+    def gotoClosure(quad, next):
+        target = int(quad[3])
+        return lambda: target
+
+    def gotoFalseClosure(quad, next):
+        target = int(quad[3])
+        kind, value = quad[1]
+        if kind == LOCAL:
+            return lambda: next if virtualStack.frame[value] else target
+        readCondition = reader(quad[1])
+        return lambda: next if readCondition() else target
+
+    def gotoTrueClosure(quad, next):
+        target = int(quad[3])
+        readCondition = reader(quad[1])
+        return lambda: target if readCondition() else next
+
+    def binaryClosure(quad, next):
+        operation = closureOperations[quad[0]]
+        (leftKind, left), (rightKind, right), (destKind, dest) = quad[1], quad[2], quad[3]
+        if destKind == LOCAL and leftKind == LOCAL and rightKind == LOCAL:
+            def execLocals():
+                frame = virtualStack.frame
+                frame[dest] = operation(frame[left], frame[right])
+                return next
+            return execLocals
+        elif destKind == LOCAL and leftKind == LOCAL and rightKind == CONSTANT:
+            def execLocalConstant():
+                frame = virtualStack.frame
+                frame[dest] = operation(frame[left], right)
+                return next
+            return execLocalConstant
+        elif destKind == LOCAL and leftKind == CONSTANT and rightKind == LOCAL:
+            def execConstantLocal():
+                frame = virtualStack.frame
+                frame[dest] = operation(left, frame[right])
+                return next
+            return execConstantLocal
+        readLeft, readRight, write = reader(quad[1]), reader(quad[2]), writer(quad[3])
+        def execOperation():
+            write(operation(readLeft(), readRight()))
+            return next
+        return execOperation
+
+    def assignClosure(quad, next):
+        (sourceKind, source), (destKind, dest) = quad[1], quad[3]
+        if destKind == LOCAL and sourceKind == CONSTANT and not source is None:
+            def assignConstant():
+                virtualStack.frame[dest] = source
+                return next
+            return assignConstant
+        elif destKind == LOCAL and sourceKind == LOCAL:
+            def assignLocal():
+                frame = virtualStack.frame
+                value = frame[source]
+                if value is None:
+                    raise undefinedVariable(next)
+                frame[dest] = value
+                return next
+            return assignLocal
+        read, write = reader(quad[1]), writer(quad[3])
+        def assign():
+            value = read()
+            if value is None:
+                raise undefinedVariable(next)
+            write(value)
+            return next
+        return assign
+
+    def verifyClosure(quad, next):
+        read, limit = reader(quad[1]), quad[2]
+        def verify():
+            value = read()
+            if value < 0 or value >= limit:
+                raise ExecutionError('undefined index %d in quadruple #%d.' % (value, next))
+            return next
+        return verify
+
+    def arraySumClosure(quad, next):
+        address, readIndex, write = quad[1][1], reader(quad[2]), writer(quad[3])
+        def arraySum():
+            write(address + readIndex())
+            return next
+        return arraySum
+
+    def arrayMultClosure(quad, next):
+        size, readIndex, write = quad[1], reader(quad[2]), writer(quad[3])
+        def arrayMult():
+            write(size * readIndex())
+            return next
+        return arrayMult
+
+    def arrayLoadClosure(quad, next):
+        kind, slot, limit = quad[1]
+        isGlobal, readIndex, write = kind == GLOBAL, reader(quad[2]), writer(quad[3])
+        def arrayLoad():
+            index = readIndex()
+            if not (limit is None or 0 <= index < limit):
+                checkIndex(index, limit, next)
+            write((globalMemory if isGlobal else virtualStack.frame)[slot + index])
+            return next
+        return arrayLoad
+
+    def arrayStoreClosure(quad, next):
+        kind, slot, limit = quad[3]
+        isGlobal, read, readIndex = kind == GLOBAL, reader(quad[1]), reader(quad[2])
+        def arrayStore():
+            value = read()
+            if value is None:
+                raise undefinedVariable(next)
+            index = readIndex()
+            if not (limit is None or 0 <= index < limit):
+                checkIndex(index, limit, next)
+            (globalMemory if isGlobal else virtualStack.frame)[slot + index] = value
+            return next
+        return arrayStore
+
+    def matrixLoadClosure(quad, next):
+        kind, slot, columns, rowLimit, columnLimit = quad[1]
+        isGlobal, readRow, readColumn, write = kind == GLOBAL, reader(quad[2][0]), reader(quad[2][1]), writer(quad[3])
+        def matrixLoad():
+            row, column = readRow(), readColumn()
+            checkIndex(row, rowLimit, next)
+            checkIndex(column, columnLimit, next)
+            write((globalMemory if isGlobal else virtualStack.frame)[slot + columns * row + column])
+            return next
+        return matrixLoad
+
+    def matrixStoreClosure(quad, next):
+        kind, slot, columns, rowLimit, columnLimit = quad[3]
+        isGlobal, read, readRow, readColumn = kind == GLOBAL, reader(quad[1]), reader(quad[2][0]), reader(quad[2][1])
+        def matrixStore():
+            value = read()
+            if value is None:
+                raise undefinedVariable(next)
+            row, column = readRow(), readColumn()
+            checkIndex(row, rowLimit, next)
+            checkIndex(column, columnLimit, next)
+            (globalMemory if isGlobal else virtualStack.frame)[slot + columns * row + column] = value
+            return next
+        return matrixStore
+
+    def eraClosure(quad, next):
+        createActivationRecord, memID = virtualStack.createActivationRecord, quad[1]
+        def era():
+            createActivationRecord(memID)
+            return next
+        return era
+
+    def paramClosure(quad, next):
+        setParam, operand, index = virtualStack.setParam, quad[1], quad[3]
+        def param():
+            setParam(operand, index)
+            return next
+        return param
+
+    def gosubClosure(quad, next):
+        replaceActivationRecord = virtualStack.replaceActivationRecord
+        if not jit:
+            return lambda: replaceActivationRecord(next)
+        # Llamadas y función compilada (o False si no se puede compilar) de la función llamada, compartidas por todas sus llamadas.
+        newStacks, state = virtualStack.newStacks, jitFunctions.setdefault(quad[1], [0, None])
+        def gosub():
+            function = state[1]
+            if function:
+                frame = newStacks.pop()[1]
+                function(frame)
+                virtualStack.releaseFrame(frame)
+                return next
+            elif function is None:
+                state[0] += 1
+                if state[0] >= JIT_CALL_THRESHOLD:
+                    state[1] = compileFunction(virtualStack, quadruples, quad[1]) or False
+            return replaceActivationRecord(next)
+        return gosub
+
+    def retClosure(quad, next):
+        return virtualStack.endActivationRecord
+
+    def tailCallClosure(quad, next):
+        return virtualStack.replaceTailRecord
+
+    def returnClosure(quad, next):
+        read = reader(quad[1])
+        def setReturnValue():
+            virtualStack.retValue = read()
+            return next
+        return setReturnValue
+
+    def copyRetClosure(quad, next):
+        write = writer(quad[3])
+        def copyRet():
+            write(virtualStack.retValue)
+            return next
+        return copyRet
+
+    # Cualquier otra operación llama a su manejador con el cuádruplo y el índice ya fijos.
+    def handlerClosure(quad, next):
+        handler = table[quad[0]]
+        return lambda: handler(quad, next)
+
+    builders = [handlerClosure] * len(table)
+    for op in closureOperations:
+        builders[op] = binaryClosure
+    for name, builder in [('GOTO', gotoClosure), ('GOTOF', gotoFalseClosure), ('GOTOV', gotoTrueClosure), ('=', assignClosure), ('VER', verifyClosure), ('ARRSUM', arraySumClosure), ('ARRMULT', arrayMultClosure), ('ALOAD', arrayLoadClosure), ('ASTORE', arrayStoreClosure), ('MLOAD', matrixLoadClosure), ('MSTORE', matrixStoreClosure), ('ERA', eraClosure), ('PARAM', paramClosure), ('GOSUB', gosubClosure), ('RET', retClosure), ('TAILCALL', tailCallClosure), ('RETURN', returnClosure), ('COPYRET', copyRetClosure)]:
+        builders[ops[name]] = builder
+    return [ builders[quad[0]](quad, index + 1) for index, quad in enumerate(quadruples) ]
+
+# Igual que execute, pero con el backend de closures: el ciclo solo llama a la closure del cuádruplo actual.
+def closureExecute(virtualStack, table, quadruples, jit=False):
+    virtualStack.initMemory()
+    code = compileClosures(virtualStack, table, quadruples, jit)
+    executed = 0
+    i = 0
+    lenQuads = len(code)
+    try:
+        while i < lenQuads:
+            i = code[i]()
+            executed += 1
+    except ExecutionError as error:
+        # Los errores de una función compilada ya traen el índice del cuádruplo que falló dentro de la función.
+        if error.index is None:
+            error.index = i
+        raise
+    except (ZeroDivisionError, TypeError) as error:
+        raise runtimeError(error, i)
+    return executed
+
+# Número de llamadas a una función después del cual el backend 'jit' intenta compilarla.
+JIT_CALL_THRESHOLD = 10
+
+# Operaciones que se pueden traducir a código de Python: aritmética, comparaciones, saltos, accesos a arreglos y el regreso de la función. Una función con cualquier otra operación (llamadas, impresión, gráficas, operaciones sobre arreglos completos) se sigue ejecutando en el backend de closures.
+jitExpressions = {
+    '+': '%s + %s',
+    '-': '%s - %s',
+    '/': '%s / %s',
+    '*': '%s * %s',
+    '.': 'str(%s) + str(%s)',
+    '&&': '%s and %s',
+    '||': '%s or %s',
+    '<': '%s < %s',
+    '>': '%s > %s',
+    '==': '%s == %s',
+    '!=': '%s != %s',
+    '<=': '%s <= %s',
+    '>=': '%s >= %s',
+}
+jitExpressions = dict((ops[name], expression) for name, expression in jitExpressions.items())
+jitOperations = set(jitExpressions) | set(ops[name] for name in ['GOTO', 'GOTOF', 'GOTOV', 'RETURN', 'RET', '=', 'VER', 'ARRSUM', 'ARRMULT', 'ALOAD', 'ASTORE', 'MLOAD', 'MSTORE'])
+
+# Indica que una función no se puede traducir a código de Python.
+class JitUnsupported(Exception):
+    pass
+
+# Errores de una función compilada. Llevan el índice del cuádruplo que falló, para reportar la línea del programa fuente.
+def jitUndefinedVariable(index):
+    error = ExecutionError('undefined variable in quadruple #%d.' % index)
+    error.index = index
+    return error
+
+def jitUndefinedIndex(value, index):
+    error = ExecutionError('undefined index %d in quadruple #%d.' % (value, index + 1))
+    error.index = index
+    return error
+
+# Traduce los cuádruplos enlazados de una función, desde su inicio hasta su RET, a una función de Python que recibe el registro de activación ya preparado por ERA y PARAM. Las variables y temporales locales se vuelven variables de Python, salvo que la función use arreglos locales; en ese caso todo se lee y escribe en el registro. Los saltos se reconstruyen como while, if y else, con break, continue y return; si algún salto no corresponde a esas estructuras, la función no se traduce.
+class FunctionTranslator:
+    def __init__(self, virtualStack, quadruples, start, end):
+        self.quadruples = quadruples
+        self.start = start
+        self.end = end
+        self.lines = list()
+        self.indexes = list()
+        self.current = None
+        self.slots = set()
+        self.namespace = { 'G': virtualStack.globals, 'VS': virtualStack, 'undefinedVariable': jitUndefinedVariable, 'undefinedIndex': jitUndefinedIndex }
+        self.promoteLocals = not self.usesLocalArrays()
+
+    def usesLocalArrays(self):
+        for quad in self.quadruples[self.start:self.end]:
+            for mode, field in zip(linkModes[quad[0]], quad[1:]):
+                if mode in ('a', 'd') and field[0] == LOCAL:
+                    return True
+                elif mode in ('r', 'w') and field[0] == LOCAL_POINTER:
+                    return True
+                elif mode == 'p' and any(operand[0] == LOCAL_POINTER for operand in field):
+                    return True
+        return False
+
+    def translate(self):
+        for quad in self.quadruples[self.start:self.end]:
+            if not quad[0] in jitOperations:
+                raise JitUnsupported()
+        if self.quadruples[self.end - 1][0] != ops['RET']:
+            raise JitUnsupported()
+        self.block(self.start, self.end, None, 1)
+        header = ['def function(F):']
+        header.extend('    v%d = F[%d]' % (slot, slot) for slot in sorted(self.slots))
+        # Cuádruplo que generó cada línea del código, para que runtimeError reporte el índice de una operación que falla.
+        self.namespace['quadIndexes'] = [ None ] * len(header) + self.indexes
+        return '\n'.join(header + self.lines) + '\n'
+
+    def emit(self, depth, text):
+        self.lines.append('    ' * depth + text)
+        self.indexes.append(self.current)
+
+    def local(self, slot):
+        if not self.promoteLocals:
+            return 'F[%d]' % slot
+        self.slots.add(slot)
+        return 'v%d' % slot
+
+    def constant(self, value):
+        if type(value) in (int, long, bool) or (type(value) is float and value - value == 0):
+            return repr(value)
+        name = 'k%d' % len(self.namespace)
+        self.namespace[name] = value
+        return name
+
+    def operand(self, operand):
+        kind, value = operand
+        if kind == CONSTANT:
+            return self.constant(value)
+        elif kind == LOCAL:
+            return self.local(value)
+        elif kind == GLOBAL:
+            return 'G[%d]' % value
+        elif kind == LOCAL_POINTER:
+            return 'F[%s]' % self.local(value)
+        return 'G[%s]' % self.local(value)
+
+    def element(self, kind, address):
+        return '%s[%s]' % ('G' if kind == GLOBAL else 'F', address)
+
+    # Genera las instrucciones de los cuádruplos en [low, high). loop es el par (inicio, salida) del ciclo más interno, o None.
+    def block(self, low, high, loop, depth):
+        count = len(self.lines)
+        index = low
+        while index < high:
+            backEdge = None
+            for other in range(index + 1, high):
+                quad = self.quadruples[other]
+                if quad[0] == ops['GOTO'] and int(quad[3]) == index:
+                    backEdge = other
+            if backEdge is None:
+                index = self.statement(index, high, loop, depth)
+                continue
+            self.emit(depth, 'while True:')
+            self.block(index, backEdge, (index, backEdge + 1), depth + 1)
+            index = backEdge + 1
+        if len(self.lines) == count:
+            self.emit(depth, 'pass')
+
+    def jump(self, target, loop):
+        if not loop is None and target == loop[1]:
+            return 'break'
+        elif not loop is None and target == loop[0]:
+            return 'continue'
+        elif target == self.end - 1:
+            return 'return'
+        raise JitUnsupported()
+
+    # Genera la instrucción del cuádruplo index y regresa el índice del siguiente cuádruplo por traducir.
+    def statement(self, index, high, loop, depth):
+        quad = self.quadruples[index]
+        op = quad[0]
+        self.current = index
+        if op == ops['GOTO']:
+            self.emit(depth, self.jump(int(quad[3]), loop))
+        elif op == ops['GOTOF'] or op == ops['GOTOV']:
+            condition = self.operand(quad[1])
+            taken, notTaken = ('not %s' % condition, condition) if op == ops['GOTOF'] else (condition, 'not %s' % condition)
+            target = int(quad[3])
+            if target <= index or target > high:
+                self.emit(depth, 'if %s:' % taken)
+                self.emit(depth + 1, self.jump(target, loop))
+                return index + 1
+            # Un salto hacia adelante dentro del bloque es un if; si el bloque que salta termina con un GOTO hacia adelante, es un if con else.
+            last = self.quadruples[target - 1]
+            self.emit(depth, 'if %s:' % notTaken)
+            if target - 1 > index and last[0] == ops['GOTO'] and target < int(last[3]) <= high:
+                self.block(index + 1, target - 1, loop, depth + 1)
+                self.emit(depth, 'else:')
+                self.block(target, int(last[3]), loop, depth + 1)
+                return int(last[3])
+            self.block(index + 1, target, loop, depth + 1)
+            return target
+        elif op == ops['RET']:
+            self.emit(depth, 'return')
+        elif op == ops['RETURN']:
+            self.emit(depth, 'VS.retValue = %s' % self.operand(quad[1]))
+        elif op in jitExpressions:
+            self.emit(depth, '%s = %s' % (self.operand(quad[3]), jitExpressions[op] % (self.operand(quad[1]), self.operand(quad[2]))))
+        elif op == ops['=']:
+            self.checkDefined(quad[1], index, depth)
+            self.emit(depth, '%s = %s' % (self.operand(quad[3]), self.operand(quad[1])))
+        elif op == ops['VER']:
+            self.checkIndex(self.operand(quad[1]), quad[2], index, depth)
+        elif op == ops['ARRSUM']:
+            self.emit(depth, '%s = %d + %s' % (self.operand(quad[3]), quad[1][1], self.operand(quad[2])))
+        elif op == ops['ARRMULT']:
+            self.emit(depth, '%s = %d * %s' % (self.operand(quad[3]), quad[1], self.operand(quad[2])))
+        elif op == ops['ALOAD']:
+            kind, slot, limit = quad[1]
+            position = self.operand(quad[2])
+            self.checkIndex(position, limit, index, depth)
+            self.emit(depth, '%s = %s' % (self.operand(quad[3]), self.element(kind, '%d + %s' % (slot, position))))
+        elif op == ops['ASTORE']:
+            kind, slot, limit = quad[3]
+            position = self.operand(quad[2])
+            self.checkDefined(quad[1], index, depth)
+            self.checkIndex(position, limit, index, depth)
+            self.emit(depth, '%s = %s' % (self.element(kind, '%d + %s' % (slot, position)), self.operand(quad[1])))
+        elif op == ops['MLOAD']:
+            self.emit(depth, '%s = %s' % (self.operand(quad[3]), self.matrixElement(quad[1], quad[2], index, depth)))
+        elif op == ops['MSTORE']:
+            self.checkDefined(quad[1], index, depth)
+            self.emit(depth, '%s = %s' % (self.matrixElement(quad[3], quad[2], index, depth), self.operand(quad[1])))
+        return index + 1
+
+    def matrixElement(self, descriptor, position, index, depth):
+        kind, slot, columns, rowLimit, columnLimit = descriptor
+        row, column = self.operand(position[0]), self.operand(position[1])
+        self.checkIndex(row, rowLimit, index, depth)
+        self.checkIndex(column, columnLimit, index, depth)
+        return self.element(kind, '%d + %d * %s + %s' % (slot, columns, row, column))
+
+    def checkDefined(self, operand, index, depth):
+        if operand[0] != CONSTANT:
+            value = self.operand(operand)
+            self.emit(depth, 'if %s is None:' % value)
+            self.emit(depth + 1, 'raise undefinedVariable(%d)' % index)
+
+    def checkIndex(self, value, limit, index, depth):
+        if not limit is None:
+            self.emit(depth, 'if %s < 0 or %s >= %d:' % (value, value, limit))
+            self.emit(depth + 1, 'raise undefinedIndex(%s, %d)' % (value, index))
+
+# Compila una función del programa con FunctionTranslator. Regresa la función de Python, o None si la función no se puede traducir.
+def compileFunction(virtualStack, quadruples, memID):
+    start = virtualStack.lookupFunction(memID)['start']
+    end = min([ region[0] for region in getCodeRegions(virtualStack, quadruples) if region[0] > start ] + [len(quadruples)])
+    translator = FunctionTranslator(virtualStack, quadruples, start, end)
+    try:
+        source = translator.translate()
+        # Python limita el número de bloques anidados; una función con demasiados ciclos anidados no se compila.
+        code = compile(source, '<function %d>' % memID, 'exec', 0, True)
+    except (JitUnsupported, SyntaxError):
+        return None
+    exec code in translator.namespace
+    return translator.namespace['function']
+
+# Número de cuádruplos que se incluyen en el reporte del perfilador, los de mayor tiempo acumulado.
+PROFILE_TOP_QUADRUPLES = 40
+
+# Perfilador de la ejecución: cuenta cuántas veces se ejecuta cada cuádruplo y cuánto tiempo acumula, y atribuye ese tiempo a la pila de llamadas de funciones del usuario en la que ocurrió. Con estos datos genera un reporte por cuádruplo, por operación y por función, y un archivo de pilas colapsadas para generar una gráfica de flama (flamegraph.pl, speedscope).
+class Profiler:
+    def __init__(self, program):
+        self.quadruples = program['quadruples']
+        self.lines = program.get('lines') or array('i', [0] * len(self.quadruples))
+        self.names = dict((memID, funcData.get('name', str(memID))) for memID, funcData in program['functions'].items())
+        self.counts = [0] * len(self.quadruples)
+        self.times = [0.0] * len(self.quadruples)
+        # Llamadas y tiempo total de cada función, contando una sola vez el tiempo de las llamadas recursivas.
+        self.calls = dict()
+        self.totalTimes = dict()
+        self.depths = dict()
+        # Tiempo propio de cada pila de llamadas ('main;fibonacci;fibonacci'), guardado en una lista para que el ciclo de ejecución lo acumule directamente.
+        self.stackTimes = dict()
+        self.callStack = list()
+        self.executed = 0
+        self.elapsed = 0.0
+
+    # Registra la entrada a una función y regresa el acumulador de tiempo de la nueva pila.
+    def enter(self, name, now):
+        key = name if not self.callStack else self.callStack[-1][1] + ';' + name
+        self.callStack.append((name, key, now))
+        self.calls[name] = self.calls.get(name, 0) + 1
+        self.depths[name] = self.depths.get(name, 0) + 1
+        return self.stackTimes.setdefault(key, [0.0])
+
+    # Registra la salida de la función actual y regresa el acumulador de tiempo de la pila de la función que la llamó.
+    def leave(self, now):
+        name, key, start = self.callStack.pop()
+        self.depths[name] -= 1
+        if self.depths[name] == 0:
+            self.totalTimes[name] = self.totalTimes.get(name, 0.0) + now - start
+        if not self.callStack:
+            return [0.0]
+        return self.stackTimes[self.callStack[-1][1]]
+
+    def finish(self, now):
+        while self.callStack:
+            self.leave(now)
+
+    def getSelfTimes(self):
+        selfTimes = dict()
+        for key, time in self.stackTimes.items():
+            name = key.rsplit(';', 1)[-1]
+            selfTimes[name] = selfTimes.get(name, 0.0) + time[0]
+        return selfTimes
+
+    def writeReport(self, file_obj):
+        opNames = compilador.opNames
+        print('Quadruples executed: %d in %.6f s' % (self.executed, self.elapsed), file=file_obj)
+
+        print('\nFunctions:', file=file_obj)
+        print('%10s %12s %12s  %s' % ('calls', 'self (s)', 'total (s)', 'function'), file=file_obj)
+        selfTimes = self.getSelfTimes()
+        for name in sorted(self.calls, key=lambda name: -self.totalTimes.get(name, 0.0)):
+            print('%10d %12.6f %12.6f  %s' % (self.calls[name], selfTimes.get(name, 0.0), self.totalTimes.get(name, 0.0), name), file=file_obj)
+
+        print('\nOperations:', file=file_obj)
+        print('%10s %12s  %s' % ('count', 'time (s)', 'operation'), file=file_obj)
+        opCounts, opTimes = dict(), dict()
+        for index, quad in enumerate(self.quadruples):
+            if self.counts[index]:
+                opCounts[quad[0]] = opCounts.get(quad[0], 0) + self.counts[index]
+                opTimes[quad[0]] = opTimes.get(quad[0], 0.0) + self.times[index]
+        for op in sorted(opCounts, key=lambda op: -opTimes[op]):
+            print('%10d %12.6f  %s' % (opCounts[op], opTimes[op], opNames.get(op, op)), file=file_obj)
+
+        print('\nLines:', file=file_obj)
+        print('%10s %12s  %s' % ('count', 'time (s)', 'line'), file=file_obj)
+        lineCounts, lineTimes = dict(), dict()
+        for index, line in enumerate(self.lines):
+            if self.counts[index]:
+                lineCounts[line] = max(lineCounts.get(line, 0), self.counts[index])
+                lineTimes[line] = lineTimes.get(line, 0.0) + self.times[index]
+        for line in sorted(lineTimes, key=lambda line: -lineTimes[line])[:PROFILE_TOP_QUADRUPLES]:
+            print('%10d %12.6f  %d' % (lineCounts[line], lineTimes[line], line), file=file_obj)
+
+        print('\nQuadruples:', file=file_obj)
+        print('%10s %12s  %5s %5s  %s' % ('count', 'time (s)', 'index', 'line', 'quadruple'), file=file_obj)
+        indexes = [ index for index in range(len(self.quadruples)) if self.counts[index] ]
+        indexes.sort(key=lambda index: -self.times[index])
+        for index in indexes[:PROFILE_TOP_QUADRUPLES]:
+            quad = self.quadruples[index]
+            print('%10d %12.6f  %5d %5d  %s %s %s %s' % ((self.counts[index], self.times[index], index, self.lines[index], opNames.get(quad[0], quad[0])) + tuple(compilador.filterNone(field) for field in quad[1:])), file=file_obj)
+
+    # Escribe una línea por pila de llamadas con su tiempo propio en microsegundos, en el formato de pilas colapsadas de flamegraph.pl.
+    def writeStacks(self, file_obj):
+        for key in sorted(self.stackTimes):
+            microseconds = int(round(self.stackTimes[key][0] * 1e6))
+            if microseconds > 0:
+                print('%s %d' % (key, microseconds), file=file_obj)
+
+# Igual que execute, pero registra en el perfilador el número de ejecuciones y el tiempo de cada cuádruplo, y las llamadas a funciones (GOSUB y TAILCALL) y sus regresos (RET).
+def profileExecute(virtualStack, table, quadruples, profiler):
+    virtualStack.initMemory()
+    counts, times, names = profiler.counts, profiler.times, profiler.names
+    gosub, ret, tailCall = ops['GOSUB'], ops['RET'], ops['TAILCALL']
+    clock = timeit.default_timer
+    executed = 0
+    i = 0
+    lenQuads = len(quadruples)
+    start = last = clock()
+    current = profiler.enter('main', start)
+    try:
+        while i < lenQuads:
+            quad = quadruples[i]
+            index = i
+            i = table[quad[0]](quad, i + 1)
+            now = clock()
+            elapsed = now - last
+            counts[index] += 1
+            times[index] += elapsed
+            current[0] += elapsed
+            if quad[0] == gosub:
+                current = profiler.enter(names.get(quad[1], str(quad[1])), now)
+            elif quad[0] == ret:
+                current = profiler.leave(now)
+            elif quad[0] == tailCall:
+                profiler.leave(now)
+                current = profiler.enter(names.get(quad[1], str(quad[1])), now)
+            executed += 1
+            last = now
+    except ExecutionError as error:
+        error.index = index
+        raise
+    except (ZeroDivisionError, TypeError) as error:
+        raise runtimeError(error, index)
+    finally:
+        now = clock()
+        profiler.finish(now)
+        profiler.executed = executed
+        profiler.elapsed = now - start
+    return executed
+
+# Formas de ejecutar los cuádruplos: 'loop' es el ciclo con tabla de despacho, que se conserva como referencia, 'closures' el backend de closures, y 'jit' el backend de closures que además compila a Python las funciones que se llaman con frecuencia.
+BACKENDS = ('loop', 'closures', 'jit')
+
+# Máquina virtual reutilizable: cada instancia tiene su propia memoria y su propia tabla de despacho, de modo que un proceso puede ejecutar muchos programas, uno después de otro o en distintas instancias, sin que compartan estado. Los errores del programa se reportan con ExecutionError en lugar de terminar el proceso.
+class VM:
+    def __init__(self, output=None, backend='loop', maxCallDepth=MAX_CALL_DEPTH):
+        if not backend in BACKENDS:
+            raise ValueError('unknown backend "%s".' % backend)
+        self.virtualStack = VirtualStack()
+        self.virtualStack.output = output
+        self.virtualStack.maxCallDepth = maxCallDepth
+        self.dispatchTable = createDispatchTable(self.virtualStack)
+        self.backend = backend
+        self.lines = None
+
+    def setGraphOutput(self, directory, format='png', defer=False, workers=None):
+        self.virtualStack.setGraphOutput(directory, format, defer, workers)
+
+    # Carga el programa y regresa sus cuádruplos enlazados, listos para execute.
+    def link(self, program):
+        self.virtualStack.loadProgram(program)
+        self.lines = program.get('lines')
+        return linkQuadruples(self.virtualStack, program['quadruples'])
+
+    # Ejecuta los cuádruplos enlazados con el backend de la máquina virtual. Si se recibe un Profiler, la ejecución se hace siempre con profileExecute, que mide cada cuádruplo del ciclo de referencia. Con 'jit', los cuádruplos de las funciones compiladas no se cuentan entre los ejecutados.
+    def execute(self, quadruples, profiler=None):
+        try:
+            if not profiler is None:
+                return profileExecute(self.virtualStack, self.dispatchTable, quadruples, profiler)
+            elif self.backend != 'loop':
+                return closureExecute(self.virtualStack, self.dispatchTable, quadruples, self.backend == 'jit')
+            return execute(self.virtualStack, self.dispatchTable, quadruples)
+        except ExecutionError as error:
+            if self.lines and not error.index is None and error.index < len(self.lines):
+                error.line = self.lines[error.index]
+            raise
+        finally:
+            self.virtualStack.closeStreams()
+
+    # Ejecuta un programa compilado y regresa el número de cuádruplos ejecutados.
+    def run(self, program, profiler=None):
+        return self.execute(self.link(program), profiler)
+
+import hashlib
+import marshal
+import os
+import timeit
+from array import array
+
+# Formato de los archivos objeto: un encabezado con la versión del formato, seguido del programa compilado serializado con marshal. Los cuádruplos y sus líneas se guardan como bloques de bytes con sus columnas.
+OBJECT_MAGIC = 'BINEDU-OBJ\x03'
+
+def hashSource(source):
+    return hashlib.sha1(source).hexdigest()
+
+# Escribe el programa compilado (cuádruplos, constantes, funciones, registros y structs) en un archivo objeto, para poder ejecutarlo sin volver a compilar el código fuente.
+def writeObjectFile(path, program, sourceHash):
+    program = dict(program)
+    program['quadruples'] = program['quadruples'].serialize()
+    program['lines'] = program['lines'].tostring()
+    program['hash'] = sourceHash
+    program['python'] = tuple(sys.version_info[:2])
+    tempPath = '%s.%d.tmp' % (path, os.getpid())
+    with open(tempPath, 'wb') as file_obj:
+        file_obj.write(OBJECT_MAGIC)
+        marshal.dump(program, file_obj)
+    os.rename(tempPath, path)
+
+# Lee un archivo objeto. Regresa None si el archivo no es un archivo objeto o si fue generado por otra versión del formato o de Python.
+def readObjectFile(path):
+    with open(path, 'rb') as file_obj:
+        if file_obj.read(len(OBJECT_MAGIC)) != OBJECT_MAGIC:
+            return None
+        try:
+            program = marshal.load(file_obj)
+        except (EOFError, ValueError, TypeError):
+            return None
+    if program.get('python') != tuple(sys.version_info[:2]):
+        return None
+    program['quadruples'] = compilador.QuadrupleArray.deserialize(*program['quadruples'])
+    program['lines'] = array('i', program.get('lines', ''))
+    return program
+
+def buildProgram(source, optimize=True, report=False, listing=True):
+    return compilador.compileProgram(source, optimize, report, listing)
+
+# Regresa el programa compilado de un código fuente, usando el directorio de caché cuando se indica. Los archivos en caché se identifican por el hash del código fuente.
+def compileSource(source, cacheDir=None, optimize=True, report=False, listing=True):
+    sourceHash = hashSource(source)
+    if not optimize:
+        sourceHash += '-O0'
+    if cacheDir:
+        cachePath = os.path.join(cacheDir, sourceHash + '.bdo')
+        if os.path.exists(cachePath):
+            program = readObjectFile(cachePath)
+            if not program is None and program['hash'] == sourceHash:
+                return program
+    program = buildProgram(source, optimize, report, listing)
+    if cacheDir:
+        if not os.path.isdir(cacheDir):
+            os.makedirs(cacheDir)
+        writeObjectFile(cachePath, program, sourceHash)
+    return program
+
+if __name__ == '__main__':
+    import argparse
+    argParser = argparse.ArgumentParser(description='Compila y ejecuta un programa.')
+    argParser.add_argument('file', nargs='?', help='programa fuente o archivo objeto (.bdo)')
+    argParser.add_argument('-c', '--compile', action='store_true', help='solo compilar el programa y escribir el archivo objeto')
+    argParser.add_argument('-o', '--output', help='ruta del archivo objeto generado con --compile')
+    argParser.add_argument('--cache', metavar='DIR', help='reutilizar los programas compilados guardados en DIR')
+    argParser.add_argument('--no-opt', action='store_true', help='no optimizar los cuádruplos')
+    argParser.add_argument('--opt-report', action='store_true', help='imprimir los cuádruplos optimizados y cuántos se eliminaron')
+    argParser.add_argument('--graph-dir', metavar='DIR', help='guardar las gráficas como archivos en DIR en lugar de mostrarlas en una ventana')
+    argParser.add_argument('--graph-format', choices=['png', 'svg'], default='png', help='formato de los archivos de las gráficas')
+    argParser.add_argument('--graph-defer', action='store_true', help='dibujar todas las gráficas al terminar el programa, en paralelo')
+    argParser.add_argument('--graph-workers', metavar='N', type=int, help='número de procesos para dibujar las gráficas con --graph-defer')
+    argParser.add_argument('--backend', choices=BACKENDS, default='loop', help='forma de ejecutar los cuádruplos: el ciclo de referencia, closures precompiladas, o closures y funciones compiladas a Python')
+    argParser.add_argument('--max-depth', metavar='N', type=int, default=MAX_CALL_DEPTH, help='número máximo de llamadas anidadas')
+    argParser.add_argument('--profile', metavar='FILE', help='escribir en FILE cuántas veces se ejecutó y cuánto tiempo tomó cada cuádruplo, operación y función')
+    argParser.add_argument('--profile-stacks', metavar='FILE', help='escribir en FILE el tiempo de cada pila de llamadas en formato de pilas colapsadas (flamegraph)')
+    args = argParser.parse_args()
+    vm = VM(backend=args.backend, maxCallDepth=args.max_depth)
+    if args.graph_dir:
+        vm.setGraphOutput(args.graph_dir, args.graph_format, args.graph_defer, args.graph_workers)
+
+    file_name = args.file
+    if file_name is None:
+        file_name = raw_input('Nombre del archivo de entrada: ')
+
+    try:
+        program = readObjectFile(file_name)
+        if program is None:
+            with open(file_name) as file_obj:
+                source = file_obj.read()
+            if args.compile:
+                program = buildProgram(source, not args.no_opt, args.opt_report)
+                writeObjectFile(args.output or os.path.splitext(file_name)[0] + '.bdo', program, hashSource(source))
+                sys.exit()
+            program = compileSource(source, args.cache, not args.no_opt, args.opt_report)
+        profiler = None
+        if args.profile or args.profile_stacks:
+            profiler = Profiler(program)
+        vm.run(program, profiler)
+        if args.profile:
+            with open(args.profile, 'w') as file_obj:
+                profiler.writeReport(file_obj)
+        if args.profile_stacks:
+            with open(args.profile_stacks, 'w') as file_obj:
+                profiler.writeStacks(file_obj)
+    except compilador.CompileError as error:
+        print(error)
+        sys.exit(1)
+    except ExecutionError as error:
+        print('Error: %s' % error)
+        sys.exit(1)
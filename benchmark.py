@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*-
+
+# Mide el compilador y la máquina virtual con versiones más grandes y no interactivas de los programas de prueba, y el tiempo de arranque de un programa corto.
+# Cada programa se compila y ejecuta en un proceso independiente, para que la memoria y el recolector de basura de una medición no afecten a las demás.
+# Con --json los resultados se guardan en un archivo, y con --compare se comparan contra los de otra ejecución (por ejemplo, de otro commit).
+
+from __future__ import print_function
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+# Programas de la prueba. Cada uno es una plantilla con los parámetros que determinan su tamaño.
+BENCHMARKS = [
+    ('fibonacci', { 'n': 20000 }, '''program BenchFibonacci;
+main {
+    int arr[%(n)d];
+    arr[0] = 0;
+    arr[1] = 1;
+    int i;
+    for (i = 2; i < %(n)d; i = i + 1) {
+        arr[i] = arr[i - 1] + arr[i - 2];
+        if (arr[i] > 1000000) {
+            arr[i] = arr[i] - 1000000;
+        };
+    };
+    println("arr[N - 1] = " . arr[%(n)d - 1]);
+}
+'''),
+    ('matrixMult', { 'n': 24 }, '''program BenchMatrixMult;
+var int A[%(n)d][%(n)d];
+var int B[%(n)d][%(n)d];
+var int C[%(n)d][%(n)d];
+void initMatrices() {
+    int i, j;
+    for (i = 0; i < %(n)d; i = i + 1) {
+        for (j = 0; j < %(n)d; j = j + 1) {
+            A[i][j] = (i + j) * 2 + j;
+            B[i][j] = (i * 2 - j + 1) * 3 + i * 5;
+        };
+    };
+}
+void multiplyMatrices() {
+    int i, j, k, sum;
+    for (i = 0; i < %(n)d; i = i + 1) {
+        for (j = 0; j < %(n)d; j = j + 1) {
+            sum = 0;
+            for (k = 0; k < %(n)d; k = k + 1) {
+                sum = sum + A[i][k] * B[k][j];
+            };
+            C[i][j] = sum;
+        };
+    };
+}
+main {
+    initMatrices();
+    multiplyMatrices();
+    println("C[N - 1][N - 1] = " . C[%(n)d - 1][%(n)d - 1]);
+}
+'''),
+    ('sort', { 'n': 300 }, '''program BenchSort;
+var int arr[%(n)d];
+main {
+    int i, j, aux;
+    for (i = 0; i < %(n)d; i = i + 1) {
+        arr[i] = (i * 7919 + 13) - ((i * 7919 + 13) / 1000) * 1000;
+    };
+    for (i = 0; i < %(n)d; i = i + 1) {
+        for (j = i; j < %(n)d; j = j + 1) {
+            if (arr[i] < arr[j]) {
+                aux = arr[i];
+                arr[i] = arr[j];
+                arr[j] = aux;
+            };
+        };
+    };
+    println("arr[0] = " . arr[0]);
+}
+'''),
+    ('recursion', { 'depth': 400, 'repeat': 50 }, '''program BenchRecursion;
+int sumTo(int n) {
+    if (n == 0) {
+        return 0;
+    };
+    return n + sumTo(n - 1);
+}
+main {
+    int i, total;
+    total = 0;
+    for (i = 0; i < %(repeat)d; i = i + 1) {
+        total = total + sumTo(%(depth)d);
+    };
+    println("total = " . total);
+}
+'''),
+    ('find', { 'n': 500, 'searches': 500 }, '''program BenchFind;
+var int arr[%(n)d];
+int find(int n) {
+    int i;
+    for (i = 0; i < %(n)d; i = i + 1) {
+        if (arr[i] == n) {
+            return i;
+        };
+    };
+    return -1;
+}
+main {
+    int i, found;
+    for (i = 0; i < %(n)d; i = i + 1) {
+        arr[i] = %(n)d - i;
+    };
+    found = 0;
+    for (i = 0; i < %(searches)d; i = i + 1) {
+        if (find(i) != -1) {
+            found = found + 1;
+        };
+    };
+    println("found = " . found);
+}
+'''),
+    ('load', { 'rows': 20000 }, '''program BenchLoad;
+struct Row {
+    int id;
+    string name;
+    float value;
+    boolean flag;
+}
+main {
+    struct Row rows[%(rows)d];
+    load("%(csv)s", rows);
+    int i;
+    float total;
+    total = 0.0;
+    for (i = 0; i < %(rows)d; i = i + 1) {
+        total = total + rows[i]:value;
+    };
+    println("total = " . total);
+}
+'''),
+    ('literal', { 'elements': 50000 }, '''program BenchLiteral;
+var int table[%(elements)d];
+main {
+    table = [ %(values)s ];
+    println("table[N - 1] = " . table[%(elements)d - 1]);
+}
+'''),
+    ('loops', { 'loops': 3000 }, '''program BenchLoops;
+main {
+    int i, j, total;
+    total = 0;
+%(body)s
+    println("total = " . total);
+}
+'''),
+]
+
+# Cuerpo de un ciclo del programa 'loops'. Se repite tantas veces como indica su parámetro.
+LOOP_TEMPLATE = '''    for (i = 0; i < 3; i = i + 1) {
+        for (j = 0; j < 2; j = j + 1) {
+            total = total + i * j + %d;
+        };
+    };
+'''
+
+# Programa corto que no usa gráficas, para medir el tiempo total de un proceso: importar el módulo, compilar y ejecutar.
+STARTUP_PROGRAM = ('testFactorial.txt', '')
+
+# Genera el archivo CSV que lee el programa 'load'.
+def writeCSV(path, rows):
+    with open(path, 'w') as file_obj:
+        for index in range(rows):
+            file_obj.write('%d,name%d,%.3f,%s\n' % (index, index, index * 0.25, 'true' if index % 2 else 'false'))
+
+# Escribe el código fuente de cada programa de la prueba en el directorio indicado y regresa sus rutas. Los programas 'literal' y 'loops' miden sobre todo la compilación: un arreglo literal con el número de elementos indicado, y el número indicado de ciclos for anidados.
+def writePrograms(directory):
+    paths = list()
+    for name, params, template in BENCHMARKS:
+        params = dict(params)
+        if 'rows' in params:
+            params['csv'] = os.path.join(directory, name + '.csv')
+            writeCSV(params['csv'], params['rows'])
+        if 'elements' in params:
+            params['values'] = ', '.join(str(index * 7919 % 1000) for index in range(params['elements']))
+        if 'loops' in params:
+            params['body'] = ''.join(LOOP_TEMPLATE % index for index in range(params['loops']))
+        path = os.path.join(directory, name + '.txt')
+        with open(path, 'w') as file_obj:
+            file_obj.write(template % params)
+        paths.append((name, path))
+    return paths
+
+# Compila y ejecuta un programa en este proceso e imprime sus mediciones en JSON: el tiempo de la compilación sin optimizar (análisis sintáctico y generación de cuádruplos), el de la compilación completa, el número de cuádruplos generados y ejecutados, el tiempo de ejecución y la memoria máxima del proceso.
+def runChild(file_name, backend):
+    import resource
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        import analizador
+        import compilador
+        with open(file_name) as file_obj:
+            source = file_obj.read()
+        # Las tablas del analizador se cargan (o construyen) antes de medir, para que ninguna de las dos compilaciones incluya ese tiempo.
+        compilador.getParser()
+        start = time.time()
+        compilador.Compiler(optimize=False).compile(source)
+        noOptSeconds = time.time() - start
+        start = time.time()
+        program = compilador.Compiler().compile(source)
+        compileSeconds = time.time() - start
+        vm = analizador.VM(sys.stdout, backend)
+        quadruples = vm.link(program)
+        start = time.time()
+        executed = vm.execute(quadruples)
+        elapsed = time.time() - start
+    finally:
+        sys.stdout = stdout
+    print(json.dumps({
+        'noOptSeconds': noOptSeconds,
+        'compileSeconds': compileSeconds,
+        'quadCount': len(program['quadruples']),
+        'quads': executed,
+        'seconds': elapsed,
+        'peakMemoryKB': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }))
+
+# Ejecuta un programa varias veces y se queda con el menor tiempo de cada medición y la mayor memoria.
+def runProgram(file_name, stdin, repeat, backend):
+    best = None
+    for _ in range(repeat):
+        child = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--child', file_name, backend], stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        output, _ = child.communicate(stdin)
+        result = json.loads(output.splitlines()[-1])
+        if best is None:
+            best = result
+            continue
+        for key in ('noOptSeconds', 'compileSeconds', 'seconds'):
+            best[key] = min(best[key], result[key])
+        best['peakMemoryKB'] = max(best['peakMemoryKB'], result['peakMemoryKB'])
+    return best
+
+def timeProcess(command, stdin, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        child = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, cwd=os.path.dirname(os.path.abspath(__file__)))
+        child.communicate(stdin)
+        elapsed = time.time() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+def measureStartup(repeat):
+    file_name, stdin = STARTUP_PROGRAM
+    importTime = timeProcess([sys.executable, '-c', 'import analizador'], '', repeat)
+    runTime = timeProcess([sys.executable, 'analizador.py', file_name], stdin, repeat)
+    return { 'importSeconds': importTime, 'runSeconds': runTime }
+
+def getCommit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=open(os.devnull, 'w')).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def printResult(name, result):
+    print('%12s | no-opt %7.4f s | compile %7.4f s | %6d quads | %9d executed | %8.4f s | %10.0f quads/s | %7d KB' % (name, result['noOptSeconds'], result['compileSeconds'], result['quadCount'], result['quads'], result['seconds'], result['quads'] / max(result['seconds'], 1e-9), result['peakMemoryKB']))
+
+# Imprime el cambio de cada medición respecto a una ejecución anterior. Un porcentaje positivo en los tiempos significa que la medición actual es más lenta.
+def printComparison(results, previous):
+    print('\nComparison with %s:' % (previous.get('commit') or 'previous run'))
+    for name, result in sorted(results['programs'].items()):
+        old = previous['programs'].get(name)
+        if old is None:
+            continue
+        changes = list()
+        for key in ('noOptSeconds', 'compileSeconds', 'seconds', 'peakMemoryKB'):
+            if not key in old:
+                continue
+            changes.append('%s %+6.1f%%' % (key, (result[key] - old[key]) * 100.0 / max(old[key], 1e-9)))
+        if result['quads'] != old['quads']:
+            changes.append('executed %d -> %d' % (old['quads'], result['quads']))
+        print('%12s | %s' % (name, ' | '.join(changes)))
+
+def main():
+    import argparse
+    argParser = argparse.ArgumentParser(description='Mide el compilador y la máquina virtual con los programas de la prueba.')
+    argParser.add_argument('repeat', nargs='?', type=int, default=5, help='número de ejecuciones de cada programa')
+    argParser.add_argument('--only', metavar='NAME', action='append', help='medir solo el programa indicado (se puede repetir)')
+    argParser.add_argument('--backend', choices=['loop', 'closures', 'jit'], default='loop', help='backend de ejecución de la máquina virtual')
+    argParser.add_argument('--json', metavar='FILE', help='guardar los resultados en FILE')
+    argParser.add_argument('--compare', metavar='FILE', help='comparar con los resultados guardados en FILE')
+    args = argParser.parse_args()
+
+    results = { 'commit': getCommit(), 'python': sys.version.split()[0], 'date': time.strftime('%Y-%m-%d %H:%M:%S'), 'repeat': args.repeat, 'backend': args.backend, 'programs': dict() }
+    directory = tempfile.mkdtemp(prefix='binedu-bench-')
+    try:
+        for name, path in writePrograms(directory):
+            if args.only and not name in args.only:
+                continue
+            result = runProgram(path, '', args.repeat, args.backend)
+            results['programs'][name] = result
+            printResult(name, result)
+    finally:
+        shutil.rmtree(directory)
+    results['startup'] = measureStartup(args.repeat)
+    print('%12s | import %8.4f s | run %8.4f s' % ('startup', results['startup']['importSeconds'], results['startup']['runSeconds']))
+
+    if args.json:
+        with open(args.json, 'w') as file_obj:
+            json.dump(results, file_obj, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as file_obj:
+            printComparison(results, json.load(file_obj))
+
+if __name__ == '__main__':
+    if len(sys.argv) > 3 and sys.argv[1] == '--child':
+        runChild(sys.argv[2], sys.argv[3])
+    else:
+        main()
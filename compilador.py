@@ -0,0 +1,2346 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import print_function
+import hashlib
+import imp
+import os
+import re
+import sys
+import threading
+import ply.lex as lex
+
+# Error léxico, sintáctico o semántico en el programa fuente. El mensaje indica la línea donde ocurrió.
+class CompileError(Exception):
+    pass
+
+tokens = [
+    'T_STOP',
+    'T_COMMA',
+    'T_ASSIGN',
+    'T_BLOCK_START',
+    'T_BLOCK_END',
+    'T_CONCAT',
+    'T_EXP_START',
+    'T_EXP_END',
+    'T_ARR_START',
+    'T_ARR_END',
+    'T_ID',
+    'T_FLOAT_CONST',
+    'T_INT_CONST',
+    'T_STRING_CONST',
+    'T_OPARIT',
+    'T_OPFACT',
+    'T_OPCOMP',
+    'T_OPREL',
+    'T_COLON',
+    'T_VECFUNC'
+]
+
+reserved = {
+    'if': 'T_IF',
+    'else': 'T_ELSE',
+    'program': 'T_PROGRAM',
+    'int': 'T_INT',
+    'float': 'T_FLOAT',
+    'string': 'T_STRING',
+    'boolean': 'T_BOOLEAN',
+    'struct': 'T_STRUCT',
+    'print': 'T_PRINT',
+    'for': 'T_FOR',
+    'print': 'T_PRINT',
+    'load': 'T_LOAD',
+    'stream': 'T_STREAM',
+    'fetch': 'T_FETCH',
+    'input': 'T_INPUT',
+    'while': 'T_WHILE',
+    'do': 'T_DO',
+    'true': 'T_TRUE',
+    'false': 'T_FALSE',
+    'main': 'T_MAIN',
+    'return': 'T_RETURN',
+    'void': 'T_VOID',
+    'line': 'T_LINE',
+    'bar': 'T_BAR',
+    'pie': 'T_PIE',
+    'var': 'T_VAR',
+    'println': 'T_PRINTLN',
+}
+
+tokens += reserved.values()
+
+t_T_STOP = r'\;'
+t_T_COMMA = r'\,'
+t_T_ASSIGN = r'\='
+t_T_BLOCK_START = r'\{'
+t_T_BLOCK_END = r'\}'
+t_T_CONCAT = r'\.'
+t_T_EXP_START = r'\('
+t_T_EXP_END = r'\)'
+t_T_ARR_START = r'\['
+t_T_ARR_END = r'\]'
+
+t_T_FLOAT_CONST = r'[+-]?[0-9]+\.[0-9]+f?'
+t_T_INT_CONST = r'[+-]?[0-9]+'
+t_T_STRING_CONST = r'\".*\"'
+t_T_OPARIT = r'[+-]'
+t_T_OPFACT = r'[*/]'
+t_T_OPCOMP = r'!=|==|<=|>=|<|>'
+t_T_OPREL = r'&&|\|\|'
+
+t_T_COLON = r'\:'
+
+t_ignore = ' \t'
+
+# Funciones sobre arreglos completos, con el código de operación que generan. Sus nombres no son palabras reservadas: seguidos de un paréntesis forman un token T_VECFUNC, y el analizador sintáctico decide si se trata de la función del lenguaje o de una función del usuario con el mismo nombre.
+vectorFunctions = {
+    'sum': 'VSUM',
+    'min': 'VMIN',
+    'max': 'VMAX',
+    'mean': 'VMEAN',
+    'dot': 'VDOT',
+    'matmul': 'MATMUL',
+}
+callStart = re.compile(r'[ \t]*\(')
+
+def t_T_ID(t):
+    r'[a-zA-Z][a-zA-Z0-9_]*'
+    if t.value in reserved:
+        t.type = reserved[t.value]
+    elif t.value in vectorFunctions and callStart.match(t.lexer.lexdata, t.lexer.lexpos):
+        t.type = 'T_VECFUNC'
+    return t
+
+lineNumber = 1
+def t_endl(t):
+    r'\r?\n'
+    global lineNumber
+    lineNumber += 1
+
+def t_error(t):
+    raise CompileError("Illegal character '%s' in line #%d." % (t.value[0], lineNumber))
+
+lexer = None
+
+import ply.yacc as yacc
+
+from array import array
+import heapq
+
+from operations import ops, operandModes, binaryOperations, binaryOpNames, valueTypes
+
+# Almacena las direcciones, IDs y tipos de las variables homogéneas, tanto locales como globales.
+# Utiliza una referencia recursiva para crear un árbol de instancias de esta clase, donde cada nodo corresponde a un bloque del programa.
+# Esto permite manejar distintos “scopes” de la misma manera que Java, C y C++.
+class SymbolTable:
+    def __init__(self):
+        self.symbols = dict()
+        self.children = list()
+        self.parent = None
+
+    def insert(self, id, type, memID):
+        self.symbols[id] = { 'type': type, 'memID': memID }
+
+    def insertFunction(self, id, type, memID):
+        self.symbols[id] = { 'type': 'FUNCTION', 'memID': memID, 'returnType': type }
+
+    def insertArray(self, id, type, memID, size):
+        self.symbols[id] = { 'type': type, 'memID': memID, 'size': size }
+
+    def lookup(self, id):
+        result = self.symbols.get(id)
+        if not result is None or self.parent is None:
+            return result
+        return self.parent.lookup(id)
+
+    def addChild(self, child):
+        self.children.append(child)
+
+    def setParent(self, parent):
+        self.parent = parent
+
+    def __str__(self):
+        result = ''
+        tab = '| =>%9s' % (' ')
+        for key, symbol in self.symbols.iteritems():
+            result += '| %10s | %10s |\n' % (key, symbol['memID'])
+        for child in self.children:
+            childStr = str(child)
+            if childStr:
+                result += tab
+                result += tab.join(childStr.splitlines(True))
+        return result
+
+currentSymbolTable = SymbolTable()
+
+def filterNone(token):
+    if token is None:
+        return '-'
+    return token
+
+# Tipo de cada campo de un cuádruplo en QuadrupleArray: un entero, un campo vacío (None), un apuntador ('*' seguido de la dirección del temporal), o cualquier otro valor, que se guarda en una lista aparte (por ejemplo, los descriptores de los accesos a arreglos).
+FIELD_INT, FIELD_NONE, FIELD_POINTER, FIELD_OBJECT = range(4)
+
+# Almacena cuádruplos como una estructura de arreglos: una columna de enteros para el código de operación y una para cada campo, y una columna de bytes con el tipo de los tres campos (dos bits por campo). Cada cuádruplo ocupa 17 bytes en lugar de una tupla con sus objetos, y las columnas se guardan y se leen de un archivo como un solo bloque de bytes.
+# Se usa como una lista de tuplas (op, arg1, arg2, dest): el índice, la asignación y la iteración convierten entre ambas formas.
+class QuadrupleArray:
+    def __init__(self, quadruples=()):
+        self.ops = array('i')
+        self.columns = (array('i'), array('i'), array('i'))
+        self.kinds = array('B')
+        self.objects = list()
+        self.extend(quadruples)
+
+    # Codifica un campo. Un valor que va a la lista aparte ocupa la posición slot si el campo que reemplaza ya tenía una, o una nueva al final.
+    def encodeField(self, value, slot=None):
+        if value is None:
+            return FIELD_NONE, 0
+        elif type(value) is int and -0x80000000 <= value <= 0x7fffffff:
+            return FIELD_INT, value
+        elif type(value) is str and value[:1] == '*' and value[1:].isdigit():
+            return FIELD_POINTER, int(value[1:])
+        if not slot is None:
+            self.objects[slot] = value
+            return FIELD_OBJECT, slot
+        self.objects.append(value)
+        return FIELD_OBJECT, len(self.objects) - 1
+
+    def decodeField(self, kind, value):
+        if kind == FIELD_INT:
+            return value
+        elif kind == FIELD_NONE:
+            return None
+        elif kind == FIELD_POINTER:
+            return '*' + str(value)
+        return self.objects[value]
+
+    def encode(self, quad, slots=(None, None, None)):
+        kinds = 0
+        values = list()
+        for field in range(3):
+            kind, value = self.encodeField(quad[field + 1], slots[field])
+            kinds |= kind << (2 * field)
+            values.append(value)
+        return quad[0], values, kinds
+
+    def append(self, quad):
+        op, values, kinds = self.encode(quad)
+        self.ops.append(op)
+        for column, value in zip(self.columns, values):
+            column.append(value)
+        self.kinds.append(kinds)
+
+    def extend(self, quadruples):
+        for quad in quadruples:
+            self.append(quad)
+
+    def __len__(self):
+        return len(self.ops)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [ self[position] for position in range(*index.indices(len(self))) ]
+        if index < 0:
+            index += len(self)
+        kinds = self.kinds[index]
+        return (self.ops[index], self.decodeField(kinds & 3, self.columns[0][index]), self.decodeField((kinds >> 2) & 3, self.columns[1][index]), self.decodeField(kinds >> 4, self.columns[2][index]))
+
+    def __setitem__(self, index, quad):
+        if index < 0:
+            index += len(self)
+        kinds = self.kinds[index]
+        slots = [ self.columns[field][index] if (kinds >> (2 * field)) & 3 == FIELD_OBJECT else None for field in range(3) ]
+        op, values, kinds = self.encode(quad, slots)
+        self.ops[index] = op
+        for column, value in zip(self.columns, values):
+            column[index] = value
+        self.kinds[index] = kinds
+
+    def __delitem__(self, index):
+        del self.ops[index]
+        for column in self.columns:
+            del column[index]
+        del self.kinds[index]
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    # Regresa las columnas en un solo bloque de bytes y la lista de los demás valores, para guardarlos en un archivo objeto. Solo se guardan los valores que todavía usa algún cuádruplo (los cuádruplos eliminados o reemplazados por otros sin valores aparte dejan posiciones sin usar).
+    def serialize(self):
+        columns = tuple(array('i', column) for column in self.columns)
+        objects = list()
+        positions = dict()
+        for index, kinds in enumerate(self.kinds):
+            for field in range(3):
+                if (kinds >> (2 * field)) & 3 == FIELD_OBJECT:
+                    slot = columns[field][index]
+                    if not slot in positions:
+                        positions[slot] = len(objects)
+                        objects.append(self.objects[slot])
+                    columns[field][index] = positions[slot]
+        return ''.join(column.tostring() for column in (self.ops,) + columns + (self.kinds,)), objects
+
+    @staticmethod
+    def deserialize(data, objects):
+        quadruples = QuadrupleArray()
+        itemSize = quadruples.ops.itemsize
+        count = len(data) // (4 * itemSize + 1)
+        offset = 0
+        for column in (quadruples.ops,) + quadruples.columns:
+            column.fromstring(data[offset:offset + count * itemSize])
+            offset += count * itemSize
+        quadruples.kinds.fromstring(data[offset:offset + count])
+        quadruples.objects = list(objects)
+        return quadruples
+
+# Almacena los cuádruplos que se generan durante la compilación, exponiendo varios métodos para crear cuádruplos, manipularlos (en el caso de la generación del estatuto “for”), o actualizarlos después de haber sido creados (en el caso de la generación de saltos).
+# Junto a cada cuádruplo se guarda la línea del programa fuente que lo generó, en un arreglo paralelo de enteros, para que los errores de ejecución y el perfilador puedan indicar la línea.
+class QuadrupleList:
+    def __init__(self):
+        self.quadruples = QuadrupleArray()
+        self.lines = array('i')
+
+    def insertQuad(self, name, arg1, arg2=None, dest=None):
+        self.quadruples.append((ops[name], arg1, arg2, dest))
+        self.lines.append(lineNumber)
+
+    def insertOperation(self, op, arg1, arg2=None, memID=None):
+        self.quadruples.append((ops[op], arg1, arg2, memID))
+        self.lines.append(lineNumber)
+
+    def insertAssign(self, val, dest):
+        self.quadruples.append((ops['='], val, None, dest))
+        self.lines.append(lineNumber)
+
+    def insertJump(self, jump, destination=None, expression=None):
+        self.quadruples.append((ops[jump], expression, None, destination))
+        self.lines.append(lineNumber)
+        return len(self.quadruples) - 1
+
+    def updateJump(self, index, expression=None, destination=None):
+        if destination is None :
+            destination = len(self.quadruples)
+        jump = (self.quadruples[index][0], expression, None, destination)
+        self.quadruples[index] = jump
+
+    def getListSize(self):
+        return len(self.quadruples)
+
+    def getLastQuad(self):
+        return self.quadruples[-1]
+
+    # Quita los últimos cuádruplos a partir de begin y los regresa con sus líneas, para insertarlos más adelante con appendQuads. El incremento del “for” se genera antes que el bloque, pero se debe ejecutar después de él; así se mueve sin recorrer ni reconstruir la lista.
+    def takeQuadsFrom(self, begin):
+        taken = { 'quadruples': self.quadruples[begin:], 'lines': self.lines[begin:] }
+        del self.quadruples[begin:]
+        del self.lines[begin:]
+        return taken
+
+    def appendQuads(self, taken):
+        self.quadruples.extend(taken['quadruples'])
+        self.lines.extend(taken['lines'])
+
+    def printQuadruples(self):
+        index = 0
+        for quad in self.quadruples:
+            print('| %3d| %3s | %7s | %7s | %7s |' % (index, filterNone(quad[0]), filterNone(quad[1]), filterNone(quad[2]), filterNone(quad[3])))
+            index += 1
+
+quadList = QuadrupleList()
+
+# Estructura para generar las direcciones virtuales.
+# Permite generar direcciones en diferentes rangos en base al tipo de valor.
+# Además, se puede instanciar con un diferente número base para generar distintos rangos de direcciones en cada instancia.
+# Esto permite diferenciar las direcciones globales, locales, constantes, temporales, y de funciones, en base al rango al que corresponden.
+class MemoryMap:
+    def __init__(self, range_start=0):
+        self.int_start = range_start + 10000
+        self.float_start = range_start + 20000
+        self.boolean_start = range_start + 30000
+        self.string_start = range_start + 40000
+
+        self.int_count = 0
+        self.float_count = 0
+        self.boolean_count = 0
+        self.string_count = 0
+
+    def generateID(self, type):
+        type = type.translate(None, '[]')
+        if type == 'INT':
+            return self.generateIntID()
+        if type == 'FLOAT':
+            return self.generateFloatID()
+        if type == 'STRING':
+            return self.generateStringID()
+        if type == 'BOOLEAN':
+            return self.generateBooleanID()
+
+    def generateArrayID(self, type, size):
+        type = type.translate(None, '[]')
+        if type == 'INT':
+            return self.generateArrayIntID(size)
+        if type == 'FLOAT':
+            return self.generateArrayFloatID(size)
+        if type == 'STRING':
+            return self.generateArrayStringID(size)
+        if type == 'BOOLEAN':
+            return self.generateArrayBooleanID(size)
+
+    def generateIntID(self):
+        self.int_count += 1
+        return self.int_count + self.int_start
+
+    def generateFloatID(self):
+        self.float_count += 1
+        return self.float_count + self.float_start
+
+    def generateStringID(self):
+        self.string_count += 1
+        return self.string_count + self.string_start
+
+    def generateBooleanID(self):
+        self.boolean_count += 1
+        return self.boolean_count + self.boolean_start
+
+    def generateArrayIntID(self, size):
+        memID = self.int_count + 1
+        self.int_count += size
+        return memID + self.int_start
+
+    def generateArrayFloatID(self, size):
+        memID = self.float_count + 1
+        self.float_count += size
+        return memID + self.float_start
+
+    def generateArrayStringID(self, size):
+        memID = self.string_count + 1
+        self.string_count += size
+        return memID + self.string_start
+
+    def generateArrayBooleanID(self, size):
+        memID = self.boolean_count + 1
+        self.boolean_count += size
+        return memID + self.boolean_start
+
+    def getCounts(self):
+        return (self.int_count, self.float_count, self.boolean_count, self.string_count)
+
+    # Regresa los segmentos (primera dirección, cantidad) de cada tipo que se generaron desde que se tomaron los contadores indicados.
+    def getSegmentsSince(self, counts):
+        starts = (self.int_start, self.float_start, self.boolean_start, self.string_start)
+        return [ (start + count + 1, current - count) for start, count, current in zip(starts, counts, self.getCounts()) ]
+
+# Construye la distribución de un registro de activación a partir de los segmentos de direcciones que utiliza una función. Cada segmento ocupa posiciones contiguas de una lista, a partir de su desplazamiento, de modo que el registro se puede reservar con el tamaño exacto.
+def createFrameLayout(segments):
+    layout = list()
+    offset = 0
+    for first, count in segments:
+        if count > 0:
+            layout.append((first, count, offset))
+            offset += count
+    return { 'segments': layout, 'size': offset }
+
+# Convierte una dirección virtual en su posición dentro de un registro de activación.
+def frameSlot(layout, address):
+    for first, count, offset in layout['segments']:
+        if address >= first and address < first + count:
+            return offset + address - first
+    return None
+
+variables = MemoryMap(50000)
+constants = MemoryMap(100000)
+temps = MemoryMap(150000)
+functions = MemoryMap(200000)
+globalvars = MemoryMap(250000)
+
+# Estructura similar a la tabla de símbolos, pero mucho más simplificada.
+# Almacena las direcciones, los tipos y los valores de todas las constantes del programa, a través de un cubo semántico.
+class ConstantTable:
+    def __init__(self):
+        self.symbols = dict()
+        self.values = dict()
+
+    def insert(self, token, type, memID):
+        tok = self.symbols.get(token)
+        if not tok:
+            self.symbols[token] = dict()
+        self.symbols[token][type] = memID
+
+    def lookup(self, token, type):
+        if token in self.symbols:
+            return self.symbols[token].get(type)
+        return None
+
+    def insertValue(self, memID, value):
+        self.values[memID] = value
+
+constantTable = ConstantTable()
+
+# Estructura que almacena los datos de los “structs” declarados por el programador, y que además guarda una tabla de símbolos para las instancias de cada struct, así como sus atributos, sus tipos y sus direcciones virtuales.
+class StructManager:
+    def __init__(self):
+        self.structs = dict()
+        self.instances = dict()
+        self.arrays = dict()
+
+    def createStruct(self, structID, attrList):
+        self.structs[structID] = attrList
+
+    def getAttributes(self, structID):
+        return self.structs.get(structID)
+
+    def createInstance(self, structInstanceID):
+        self.instances[structInstanceID] = dict()
+
+    def createArray(self, structInstanceID, size):
+        self.arrays[structInstanceID] = { 'size': size, 'attributes': dict() }
+
+    def addInstanceAttribute(self, structInstanceID, attrType, attrID, memID):
+        self.instances[structInstanceID][attrID] = { 'type': attrType, 'memID': memID}
+
+    def getInstanceAttribute(self, structInstanceID, attrID):
+        instance = self.instances.get(structInstanceID)
+        if instance is None:
+            return None
+        return instance.get(attrID)
+
+    def getInstance(self, structInstanceID):
+        return self.instances.get(structInstanceID)
+
+    def addArrayAttribute(self, structInstanceID, attrType, attrID, memID, index):
+        self.arrays[structInstanceID]['attributes'][attrID] = { 'type': attrType, 'memID': memID, 'index': index }
+
+    def getArray(self, structInstanceID):
+        return self.arrays.get(structInstanceID)
+
+    def getArrayAtrribute(self, structInstanceID, attrID):
+        array = self.arrays.get(structInstanceID)
+        if array is None:
+            return None
+        return array['attributes'].get(attrID)
+
+structManager = StructManager()
+
+# Resultado de la compilación que necesita la máquina virtual, además de los cuádruplos y las constantes: los datos de cada función (inicio, parámetros y registro de activación) y la distribución de los registros de main y de las variables globales.
+compiledFunctions = dict()
+mainFrame = createFrameLayout([])
+globalFrame = createFrameLayout([])
+
+declareGlobal = False
+
+# Tamaño total de cada arreglo declarado, indexado por su dirección base. Lo usa el optimizador para saber si un índice constante cae dentro del arreglo.
+arraySizes = dict()
+
+# Indica si al terminar el análisis se imprimen la tabla de símbolos y los cuádruplos del programa.
+printListing = True
+
+# Reinicia todas las estructuras de la compilación, para que cada programa se compile desde cero aunque el módulo ya haya compilado otros antes.
+def resetState():
+    global currentSymbolTable, quadList, variables, constants, temps, functions, globalvars, constantTable, structManager
+    global compiledFunctions, mainFrame, globalFrame, declareGlobal, arraySizes, lineNumber
+    currentSymbolTable = SymbolTable()
+    quadList = QuadrupleList()
+    variables = MemoryMap(50000)
+    constants = MemoryMap(100000)
+    temps = MemoryMap(150000)
+    functions = MemoryMap(200000)
+    globalvars = MemoryMap(250000)
+    constantTable = ConstantTable()
+    structManager = StructManager()
+    compiledFunctions = dict()
+    mainFrame = createFrameLayout([])
+    globalFrame = createFrameLayout([])
+    declareGlobal = False
+    arraySizes = dict()
+    lineNumber = 1
+
+def p_program(p):
+    '''
+    program : prog_token T_ID T_STOP structs var_declares functions main_token block
+            | prog_token T_ID T_STOP structs var_declares main_token block
+            | prog_token T_ID T_STOP structs functions main_token block
+            | prog_token T_ID T_STOP var_declares functions main_token block
+            | prog_token T_ID T_STOP functions main_token block
+            | prog_token T_ID T_STOP structs main_token block
+            | prog_token T_ID T_STOP var_declares main_token block
+            | prog_token T_ID T_STOP main_token block
+    '''
+    global mainFrame, globalFrame
+    quadList.insertJump('END')
+    mainToken = p[len(p) - 2]
+    mainFrame = createFrameLayout(variables.getSegmentsSince(mainToken['variables']) + temps.getSegmentsSince(mainToken['temps']))
+    globalFrame = createFrameLayout(globalvars.getSegmentsSince((0, 0, 0, 0)))
+    if printListing:
+        print('Program syntax parsed correctly')
+        print('Symbols Tables:')
+        print(currentSymbolTable)
+        print('Quadruples:')
+        quadList.printQuadruples()
+
+def p_prog_token(p):
+    '''
+    prog_token : T_PROGRAM
+    '''
+    quadList.insertJump('GOTO')
+
+def p_main_token(p):
+    '''
+    main_token : T_MAIN
+    '''
+    quadList.updateJump(0)
+    p[0] = { 'variables': variables.getCounts(), 'temps': temps.getCounts() }
+
+def p_var_declares(p):
+    '''
+    var_declares : var_token var_declare T_STOP var_declares
+                 | var_token var_declare T_STOP
+    '''
+    global declareGlobal
+    declareGlobal = False
+
+def p_var_token(p):
+    'var_token : T_VAR'
+    global declareGlobal
+    declareGlobal = True
+
+def p_functions(p):
+    '''
+    functions : func functions
+              | func
+    '''
+
+def p_func(p):
+    '''
+    func : function_signature T_EXP_START parameters T_EXP_END block
+         | function_signature T_EXP_START T_EXP_END block
+    '''
+    pLen = len(p)
+    func_sign, block = p[1], p[pLen - 1]
+    assert not block is None, "Incorrectly parsed function '%s' block start quadruple, line #%d." % (id, func_sign['lineNumber'])
+    if pLen == 6:
+        params = p[3]
+    else:
+        params = list()
+    funcData = createFrameLayout(variables.getSegmentsSince(func_sign['variables']) + temps.getSegmentsSince(func_sign['temps']))
+    funcData['start'] = block['start']
+    funcData['params'] = [ frameSlot(funcData, memID) for memID in params ]
+    funcData['name'] = func_sign['id']
+    compiledFunctions[func_sign['memID']] = funcData
+    if quadList.getLastQuad()[0] != 7:
+        quadList.insertJump('RET')
+
+def p_function_signature(p):
+    '''
+    function_signature : function_type T_ID
+                       | function_type T_VECFUNC
+    '''
+    type, id = p[1], p[2]
+    symbol = currentSymbolTable.lookup(id)
+    if not symbol is None and symbol['type'] == 'FUNCTION':
+        raise CompileError('Semantic Error: duplicated function with ID "%s" in line #%d.' % (id, lineNumber))
+    memID = functions.generateIntID()
+    currentSymbolTable.insertFunction(id, type, memID)
+    p[0] = { 'id': id, 'memID': memID, 'lineNumber': lineNumber, 'variables': variables.getCounts(), 'temps': temps.getCounts() }
+
+# Las listas de la gramática (parámetros, argumentos y valores de arreglos y matrices) usan recursión por la izquierda: cada regla agrega un elemento a la lista ya construida, en lugar de copiarla, y la pila del analizador no crece con el tamaño de la lista.
+def p_parameters(p):
+    'parameters : parameters T_COMMA param'
+    p[1].append(p[3])
+    p[0] = p[1]
+
+def p_parameters_single(p):
+    'parameters : param'
+    p[0] = [ p[1] ]
+
+def p_param(p):
+    '''
+    param : type T_ID
+    '''
+    type, id = p[1], p[2]
+    symbol = currentSymbolTable.lookup(id)
+    if not symbol is None and symbol['type'] == type:
+        raise CompileError('Semantic Error: duplicated variable of type %s with ID "%s" in line #%d.' % (type, id, lineNumber))
+    memID = variables.generateID(type)
+    currentSymbolTable.insert(id, type, memID)
+    p[0] = memID
+
+def p_var_declare_array(p):
+    'var_declare : type T_ID T_ARR_START T_INT_CONST T_ARR_END'
+    type, id, size = p[1], p[2], int(p[4])
+    symbol = currentSymbolTable.lookup(id)
+    if not symbol is None and symbol['type'] == type:
+        raise CompileError('Semantic Error: duplicated variable of type %s with ID "%s" in line #%d.' % (type, id, lineNumber))
+    global declareGlobal
+    if declareGlobal:
+        memID = globalvars.generateArrayID(type, size)
+    else:
+        memID = variables.generateArrayID(type, size)
+    arraySizes[memID] = size
+    currentSymbolTable.insertArray(id, p[1], memID, size)
+
+def p_var_declare_matrix(p):
+    'var_declare : type T_ID T_ARR_START T_INT_CONST T_ARR_END T_ARR_START T_INT_CONST T_ARR_END'
+    type, id, rows, columns = p[1], p[2], int(p[4]), int(p[7])
+    symbol = currentSymbolTable.lookup(id)
+    if not symbol is None and symbol['type'] == type:
+        raise CompileError('Semantic Error: duplicated variable of type %s with ID "%s" in line #%d.' % (type, id, lineNumber))
+    size = rows * columns
+    global declareGlobal
+    if declareGlobal:
+        memID = globalvars.generateArrayID(type, size)
+    else:
+        memID = variables.generateArrayID(type, size)
+    arraySizes[memID] = size
+    currentSymbolTable.insertArray(id, p[1], memID, [ rows, columns ])
+
+def p_var_declare_struct_array(p):
+    'var_declare : T_STRUCT T_ID T_ID T_ARR_START T_INT_CONST T_ARR_END'
+    structID, arrID, size = p[2], p[3], int(p[5])
+    attributes = structManager.getAttributes(structID)
+    if attributes is None:
+        raise CompileError('Semantic Error: undeclared struct type "%s" in line #%d.' % (structID, lineNumber))
+    elif not structManager.getArray(arrID) is None:
+        raise CompileError('Semantic Error: duplicated struct array "%s" in line #%d.' % (structID, lineNumber))
+    structManager.createArray(arrID, size)
+    index = 0
+    for attribute in attributes:
+        global declareGlobal
+        if declareGlobal:
+            memID = globalvars.generateArrayID(attribute['type'], size)
+        else:
+            memID = variables.generateArrayID(attribute['type'], size)
+        arraySizes[memID] = size
+        structManager.addArrayAttribute(arrID, attribute['type'], attribute['id'], memID, index)
+        index += 1
+
+def p_var_declare(p):
+    'var_declare : type var_ids'
+    type = p[1]
+    for id in p[2]:
+        symbol = currentSymbolTable.lookup(id)
+        if not symbol is None and symbol['type'] == type:
+            raise CompileError('Semantic Error: duplicated variable of type %s with ID "%s" in line #%d.' % (type, id, lineNumber))
+        global declareGlobal
+        if declareGlobal:
+            memID = globalvars.generateID(type)
+        else:
+            memID = variables.generateID(type)
+        currentSymbolTable.insert(id, type, memID)
+
+def p_function_type(p):
+    '''
+    function_type : type
+                  | T_VOID
+    '''
+    p[0] = p[1]
+
+def p_type(p):
+    '''
+    type : T_BOOLEAN
+         | T_STRING
+         | T_INT
+         | T_FLOAT
+    '''
+    p[0] = p[1].upper()
+
+def p_type_struct(p):
+    '''
+    type_struct : struct_id T_ID
+    '''
+    structID = p[2]
+    if structManager.getInstance(structID):
+        raise CompileError('Semantic Error: duplicated struct instance name "%s" in line #%d' %(structID, lineNumber))
+    attributeList = structManager.getAttributes(p[1])
+    structManager.createInstance(structID)
+    for attribute in attributeList:
+        memID = variables.generateID(attribute['type'])
+        structManager.addInstanceAttribute(structID, attribute['type'], attribute['id'], memID)
+
+def p_var_ids(p):
+    '''
+    var_ids : T_ID T_COMMA var_ids
+            | T_ID
+    '''
+    if len(p) < 4:
+        p[0] = [ p[1] ]
+    else:
+        p[3].append(p[1])
+        p[0] = p[3]
+
+def p_block(p):
+    '''
+    block : block_start process block_end
+    '''
+    p[0] = { 'start' : p[1], 'end' : p[3] }
+
+def p_block_empty(p):
+    '''
+    block : T_BLOCK_START T_BLOCK_END
+    '''
+    quadNumber = quadList.getListSize()
+    p[0] = { 'start': quadNumber, 'end': quadNumber }
+
+def p_block_start(p):
+    '''
+    block_start : T_BLOCK_START
+    '''
+    p[0] = quadList.getListSize()
+    # crear nuevo scope local dentro del bloque, solo si el scope anterior no esta vacio
+    global currentSymbolTable
+    newScope = SymbolTable()
+    currentSymbolTable.addChild(newScope)
+    newScope.setParent(currentSymbolTable)
+    currentSymbolTable = newScope
+
+def p_block_end(p):
+    '''
+    block_end : T_BLOCK_END
+    '''
+    p[0] = quadList.getListSize()
+    # cambiar al scope del bloque de afuera
+    global currentSymbolTable
+    currentSymbolTable = currentSymbolTable.parent
+
+def p_call_func(p):
+    '''
+    call_func : id_token T_EXP_START T_EXP_END
+    '''
+    symbol = p[1]
+    if symbol['type'] == 'VECFUNC':
+        p[0] = { 'type': 'VECFUNC', 'value': vectorFunctionCall(symbol['id'], list()) }
+        return
+    quadList.insertQuad('GOSUB', symbol['memID'])
+    p[0] = symbol
+
+def p_call_func_args(p):
+    '''
+    call_func : id_token T_EXP_START args T_EXP_END
+    '''
+    symbol, args = p[1], p[3]
+    if symbol['type'] == 'VECFUNC':
+        p[0] = { 'type': 'VECFUNC', 'value': vectorFunctionCall(symbol['id'], args) }
+        return
+    count = 1
+    for param in args :
+        quadList.insertQuad('PARAM', param['id'], None, count)
+        count += 1
+    quadList.insertQuad('GOSUB', symbol['memID'])
+    p[0] = symbol
+
+def p_return(p):
+    '''
+    return : T_RETURN
+    '''
+    quadList.insertJump('RET')
+
+def p_return_value(p):
+    '''
+    return : T_RETURN value
+    '''
+    value = p[2]
+    if isTailCall(value):
+        # return f(...): la función llamada regresa directamente a quien llamó a esta, con su propio valor de regreso.
+        memID = quadList.takeQuadsFrom(quadList.getListSize() - 2)['quadruples'][0][1]
+        quadList.insertQuad('TAILCALL', memID)
+        return
+    quadList.insertQuad('RETURN', value['id'])
+    quadList.insertJump('RET')
+
+# Indica si el valor de un return es el resultado de la llamada que se acaba de generar (GOSUB seguido del COPYRET de su valor), dentro de una función. En main no se usan llamadas en posición de cola, porque su registro es el fondo de la pila; mientras se generan las funciones, el salto inicial a main todavía no tiene destino.
+def isTailCall(value):
+    quads = quadList.quadruples
+    if len(quads) < 2 or not quads[0][3] is None:
+        return False
+    copy, call = quads[-1], quads[-2]
+    return copy[0] == ops['COPYRET'] and copy[3] == value['id'] and call[0] == ops['GOSUB'] and call[1] == copy[1]
+
+def p_structs(p):
+    '''
+    structs : stru structs
+            | stru
+    '''
+
+def p_stru(p):
+    '''
+    stru : T_STRUCT struct_id T_BLOCK_START struct_declare T_BLOCK_END
+    '''
+    structManager.createStruct(p[2], p[4])
+
+def p_struct_declare_repeat(p):
+    '''
+    struct_declare : type T_ID T_STOP struct_declare
+    '''
+    declare_list = p[4]
+    p[0] = [ { 'type' : p[1], 'id' : p[2] } ] + declare_list
+
+def p_struct_declare(p):
+    '''
+    struct_declare : type T_ID T_STOP
+    '''
+    p[0] = [ { 'type' : p[1], 'id' : p[2] } ]
+
+def p_struct_id(p):
+    '''
+    struct_id : T_ID
+    '''
+    p[0] = p[1]
+
+def p_id_token(p):
+    '''
+    id_token : T_ID
+             | T_VECFUNC
+    '''
+    id = p[1]
+    symbol = currentSymbolTable.lookup(id)
+    if (symbol is None or symbol['type'] != 'FUNCTION') and id in vectorFunctions:
+        # Sin una función del usuario con ese nombre, la llamada es a la función del lenguaje.
+        p[0] = { 'type': 'VECFUNC', 'id': id }
+        return
+    if symbol is None or symbol['type'] != 'FUNCTION' :
+        raise CompileError('Semantic Error: "%s" is not a function in line #%d.' % (id, lineNumber))
+    quadList.insertQuad('ERA', symbol['memID'])
+    p[0] = symbol
+
+def p_args(p):
+    '''
+    args : args T_COMMA value
+    '''
+    args, value = p[1], p[3]
+    args.append(value)
+    p[0] = args
+
+def p_args_value(p):
+    '''
+    args : value
+    '''
+    p[0] = [ p[1] ]
+
+def p_process(p):
+    '''
+    process : proc T_STOP process
+            | proc T_STOP
+    '''
+
+def p_proc(p):
+    '''
+    proc : while
+         | do_while
+         | for
+         | assign
+         | assign_struct
+         | assign_matrix
+         | condition
+         | write
+         | input
+         | var_declare
+         | type_struct
+         | call_func
+         | return
+         | graph
+         | load
+         | stream
+    '''
+
+def p_condition(p):
+    # if (expression) { };
+    '''
+    condition : T_IF T_EXP_START expression exp_end block
+    '''
+    expression, exp_end = p[3], p[4]
+    quadList.updateJump(exp_end, expression['id'])
+
+def p_condition_else(p):
+    # if (expression) { } else { };
+    '''
+    condition : T_IF T_EXP_START expression exp_end block else
+    '''
+    expression, exp_end, block = p[3], p[4], p[5]
+    quadList.updateJump(exp_end, expression['id'], block['end'] + 1)
+
+def p_condition_else_if(p):
+    # if (expression) { } else if { };
+    '''
+    condition : T_IF T_EXP_START expression exp_end block else_token condition
+    '''
+    expression, exp_end, block, else_token = p[3], p[4], p[5], p[6]
+    quadList.updateJump(exp_end, expression['id'], block['end'] + 1)
+    quadList.updateJump(else_token)
+
+def p_exp_end(p):
+    '''
+    exp_end : T_EXP_END
+    '''
+    p[0] = quadList.insertJump('GOTOF')
+
+def p_else(p):
+    '''
+    else : else_token block
+    '''
+    else_token, block = p[1], p[2]
+    quadList.updateJump(else_token, None, block['end'])
+
+def p_else_token(p):
+    '''
+    else_token : T_ELSE
+    '''
+    p[0] = quadList.insertJump('GOTO')
+
+def p_while(p):
+    # while (expresion) { };
+    '''
+    while : while_token T_EXP_START expression exp_end block
+    '''
+    while_token, expression, exp_end = p[1], p[3], p[4]
+    quadList.insertJump('GOTO', while_token)
+    quadList.updateJump(exp_end, expression['id'])
+
+def p_while_token(p):
+    'while_token : T_WHILE'
+    p[0] = quadList.getListSize()
+
+def p_for(p):
+    '''
+    for : T_FOR T_EXP_START assign first_stop expression for_increment block
+    '''
+    first_stop, expression, increment = p[4], p[5], p[6]
+    quadList.appendQuads(increment)
+    quadList.insertJump('GOTO', first_stop)
+    quadList.updateJump(increment['jump'], expression['id'])
+
+def p_first_stop(p):
+    'first_stop : T_STOP'
+    p[0] = quadList.getListSize()
+
+def p_second_stop(p):
+    'second_stop : T_STOP'
+    p[0] = quadList.insertJump('GOTOF')
+
+# Separa los cuádruplos del incremento, que se agregan después del bloque en p_for.
+def p_for_increment(p):
+    'for_increment : second_stop assign T_EXP_END'
+    second_stop = p[1]
+    increment = quadList.takeQuadsFrom(second_stop + 1)
+    increment['jump'] = second_stop
+    p[0] = increment
+
+def p_do_while(p):
+    # do { } while ();
+    '''
+    do_while : T_DO block T_WHILE T_EXP_START expression T_EXP_END
+    '''
+    block, expression = p[2], p[5]
+    quadList.insertJump('GOTOV', block['start'], expression['id'])
+
+# Asigna un arreglo completo a otro de la misma forma. Si el valor es el resultado de la operación anterior, la operación escribe directamente en el arreglo destino en lugar de copiar su temporal.
+def assignVector(id, value):
+    if not isVector(id) or id['size'] != value['size']:
+        raise CompileError('Semantic Error: cannot assign an array to "%s" because their shapes differ in line #%d.' % (id['token'], lineNumber))
+    elif id['type'] != value['type'] and not (id['type'] == 'FLOAT' and value['type'] == 'INT'):
+        raise CompileError('Semantic Error: array is type %s, but you are trying to assign an array of type %s to it in line #%d.' % (id['type'], value['type'], lineNumber))
+    last = quadList.getLastQuad()
+    if isTemp(value['id']) and last[3] == value['id'] and operandModes[opNames[last[0]]][2] == 'a':
+        quadList.quadruples[-1] = (last[0], last[1], last[2], id['id'])
+    else:
+        quadList.insertQuad('VCOPY', value['id'], vectorLength(value['size']), id['id'])
+
+def p_assign_simple(p):
+    '''
+    assign : id T_ASSIGN value
+    '''
+    id, value = p[1], p[3]
+    if isVector(value):
+        assignVector(id, value)
+    elif id['type'] == 'FLOAT' and value['type'] == 'INT':
+        quadList.insertAssign(value['id'], id['id'])
+    elif id['type'] != value['type']:
+        raise CompileError('Semantic Error: variable "%s" is type %s, but you are trying to assign a value of type %s in line #%d.' % (id['token'], id['type'], value['type'], lineNumber))
+    else:
+        quadList.insertAssign(value['id'], id['id'])
+
+def p_assign_array(p):
+    'assign : id T_ASSIGN T_ARR_START array T_ARR_END'
+    id, array = p[1], p[4]
+    if not 'size' in id or type(id['size']) != int:
+        raise CompileError('Semantic Error: variable "%s" must be an array in line #%d.' % (id['token'], lineNumber))
+    elif id['size'] != len(array):
+        raise CompileError('Semantic Error: cannot assign an array of size %d to "%s" in line #%d.' % (len(array), id['token'], lineNumber))
+    elif id['type'] != array[0]['type'] and not (id['type'] == 'FLOAT' and array[0]['type'] == 'INT'):
+        raise CompileError('Semantic Error: array is type %s, but you are trying to assign an array of type %s to it in line #%d.' % (id['type'], array[0]['type'], lineNumber))
+    else:
+        i = 0
+        for value in array:
+            quadList.insertAssign(value['id'], id['id'] + i)
+            i += 1
+
+def p_assign_array_empty(p):
+    'assign : id T_ASSIGN T_ARR_START T_ARR_END'
+    id = p[1]
+    if 'size' not in id or type(id) != int:
+        raise CompileError('Semantic Error: variable "%s" must be an array in line #%d.' % (id['token'], lineNumber))
+    elif id['size'] != 0:
+        raise CompileError('Semantic Error: cannot assign an empty array to "%s" in line #%d.' % (id['token'], lineNumber))
+
+def p_assign_matrix(p):
+    'assign_matrix : id T_ASSIGN T_ARR_START arrays T_ARR_END'
+    id, arrays = p[1], p[4]
+    matrixLen = sum(len(row) for row in arrays)
+    if not 'size' in id or type(id['size']) == int or len(id['size']) != 2:
+        raise CompileError('Semantic Error: variable "%s" must be a matrix in line #%d.' % (id['token'], lineNumber))
+    elif len(arrays) != id['size'][0] or any(len(row) != id['size'][1] for row in arrays):
+        raise CompileError('Semantic Error: cannot assign an matrix of %d elements to "%s" in line #%d.' % (matrixLen, id['token'], lineNumber))
+    elif id['type'] != arrays[0][0]['type'] and not (id['type'] == 'FLOAT' and arrays[0][0]['type'] == 'INT'):
+        raise CompileError('Semantic Error: array is type %s, but you are trying to assign an array of type %s to it in line #%d.' % (id['type'], arrays[0][0]['type'], lineNumber))
+    else:
+        i = 0
+        for row in arrays:
+            j = 0
+            for value in row:
+                offset = id['size'][1] * i + j
+                quadList.insertAssign(value['id'], id['id'] + offset)
+                j += 1
+            i += 1
+
+def p_arrays(p):
+    'arrays : arrays T_COMMA T_ARR_START array T_ARR_END'
+    arrays, row = p[1], p[4]
+    if arrays[0][0]['type'] != row[0]['type'] and not (arrays[0][0]['type'] == 'FLOAT' and row[0]['type'] == 'INT'):
+        raise CompileError('Semantic Error: array type mismatch between %s and %s in line #%d.' % (arrays[0][0]['type'], row[0]['type'], lineNumber))
+    arrays.append(row)
+    p[0] = arrays
+
+def p_arrays_simple(p):
+    'arrays : T_ARR_START array T_ARR_END'
+    p[0] = [ p[2] ]
+
+def p_assign_struct(p):
+    '''
+    assign_struct : T_ID T_COLON T_ID T_ASSIGN value
+    '''
+    instance_id, attribute_id, value = p[1], p[3], p[5]
+    attribute = structManager.getInstanceAttribute(instance_id, attribute_id)
+    if attribute is None:
+        raise CompileError('Semantic Error: attribute "%s" is not defined in for struct instance "%s" in line #%d.' % (attribute_id, instance_id, lineNumber))
+    if attribute['type'] == 'FLOAT' and value['type'] == 'INT':
+        quadList.insertAssign(value['id'], attribute['memID'])
+    elif attribute['type'] != value['type']:
+        raise CompileError('Semantic Error: attribute "%s" is type %s, but you are trying to assign a value of type %s in line #%d.' % (attribute_id, attribute['type'], value['type'], lineNumber))
+    else:
+        quadList.insertAssign(value['id'], attribute['memID'])
+
+def p_id_array_struct(p):
+    'id : T_ID T_ARR_START e T_ARR_END T_COLON T_ID'
+    structID, e, attrID = p[1], p[3], p[6]
+    struct = structManager.getArray(structID)
+    if struct is None:
+        raise CompileError('Semantic Error: variable "%s" must be a struct array in line #%d.' % (structID, lineNumber))
+    elif not e['type'] == 'INT':
+        raise CompileError('Semantic Error: array index for "%s" must be an integer in line #%d.' % (structID, lineNumber))
+    attr = struct['attributes'].get(attrID)
+    if attr is None:
+        raise CompileError('Semantic Error: struct "%s" has no attribute "%s" in line #%d.' % (structID, attrID, lineNumber))
+    tempID = temps.generateIntID()
+    quadList.insertQuad('VER', e['id'], struct['size'])
+    quadList.insertOperation('ARRSUM', attr['memID'], e['id'], tempID)
+    p[0] = { 'type': attr['type'], 'id': '*' + str(tempID), 'size': struct['size'], 'token': attrID }
+
+def p_id_array(p):
+    '''
+    id : T_ID T_ARR_START e T_ARR_END
+    '''
+    symbol, e = currentSymbolTable.lookup(p[1]), p[3]
+    if symbol is None:
+        raise CompileError('Semantic Error: undeclared array with ID "%s" in line #%d.' % (p[1], lineNumber))
+    elif not 'size' in symbol:
+        raise CompileError('Semantic Error: variable with ID "%s" must be an array in line #%d.' % (p[1], lineNumber))
+    elif not e['type'] == 'INT':
+        raise CompileError('Semantic Error: array index for "%s" must be an integer in line #%d.' % (p[1], lineNumber))
+    tempID = temps.generateIntID()
+    quadList.insertQuad('VER', e['id'], symbol['size'])
+    quadList.insertOperation('ARRSUM', symbol['memID'], e['id'], tempID)
+    p[0] = { 'type': symbol['type'], 'id': '*' + str(tempID), 'size': symbol['size'], 'token': p[1] }
+
+def p_id_matrix(p):
+    'id : T_ID T_ARR_START e T_ARR_END T_ARR_START e T_ARR_END'
+    symbol, rowInd, colInd = currentSymbolTable.lookup(p[1]), p[3], p[6]
+    if symbol is None:
+        raise CompileError('Semantic Error: undeclared array with ID "%s" in line #%d.' % (p[1], lineNumber))
+    elif not 'size' in symbol:
+        raise CompileError('Semantic Error: variable with ID "%s" must be an array in line #%d.' % (p[1], lineNumber))
+    elif not rowInd['type'] == 'INT' or not colInd['type'] == 'INT':
+        raise CompileError('Semantic Error: array index for "%s" must be an integer in line #%d.' % (p[1], lineNumber))
+    multID, sumID, pointerID = temps.generateIntID(), temps.generateIntID(), temps.generateIntID()
+    quadList.insertQuad('VER', rowInd['id'], symbol['size'][0])
+    quadList.insertQuad('VER', colInd['id'], symbol['size'][1])
+    quadList.insertOperation('ARRMULT', symbol['size'][1], rowInd['id'], multID)
+    quadList.insertOperation('+', multID, colInd['id'], sumID)
+    quadList.insertOperation('ARRSUM', symbol['memID'], sumID, pointerID)
+    p[0] = { 'type': symbol['type'], 'id': '*' + str(pointerID), 'size': symbol['size'], 'token': p[1] }
+
+def p_id(p):
+    'id : T_ID'
+    symbol = currentSymbolTable.lookup(p[1])
+    if symbol is None:
+        raise CompileError('Semantic Error: undeclared variable with ID "%s" in line #%d.' % (p[1], lineNumber))
+    elif 'size' in symbol:
+        p[0] = { 'type': symbol['type'], 'id': symbol['memID'], 'size': symbol['size'], 'token': p[1] }
+    else:
+        p[0] = { 'type': symbol['type'], 'id': symbol['memID'], 'token': p[1] }
+
+def p_array(p):
+    'array : array T_COMMA value'
+    array, value = p[1], p[3]
+    if array[0]['type'] != value['type']:
+        raise CompileError('Semantic Error: type mismatch in array declaration between %s and %s values in line #%d.' % (array[0]['type'], value['type'], lineNumber))
+    array.append(value)
+    p[0] = array
+
+def p_array_value(p):
+    'array : value'
+    p[0] = [ p[1] ]
+
+def p_value_expression(p):
+    'value : expression'
+    p[0] = p[1]
+
+def p_value_string(p):
+    'value : T_STRING_CONST'
+    type = 'STRING'
+    memID = constantTable.lookup(p[1], type)
+    if memID:
+        p[0] = { 'type': type, 'id': memID }
+    else:
+        memID = constants.generateStringID()
+        constantTable.insert(p[1], type, memID)
+        constantTable.insertValue(memID, p[1][1:-1])
+        p[0] = { 'type': type, 'id': memID }
+
+def p_write(p):
+    'write : T_PRINT T_EXP_START concat T_EXP_END'
+    concat = p[3]
+    quadList.insertQuad('PRINT', concat['id'])
+
+def p_write_line(p):
+    'write : T_PRINTLN T_EXP_START concat T_EXP_END'
+    concat = p[3]
+    quadList.insertQuad('PRINTLN', concat['id'])
+
+def p_input(p):
+    'input : T_INPUT T_EXP_START id T_EXP_END'
+    id = p[3]
+    # El tipo de la variable indica a la máquina virtual cómo convertir el texto leído.
+    quadList.insertQuad('INPUT', id['id'], valueTypes.index(id['type'].translate(None, '[]')))
+
+def p_graph_struct(p):
+    '''
+    graph : T_LINE T_EXP_START T_ID T_EXP_END
+          | T_BAR T_EXP_START T_ID T_EXP_END
+          | T_PIE T_EXP_START T_ID T_EXP_END
+    '''
+    op, structID = p[1], p[3]
+    struct = structManager.getArray(structID)
+    if struct is None:
+        raise CompileError('Semantic Error: variable "%s" must be a struct array in line #%d.' % (structID, lineNumber))
+
+    graphAttributes = list()
+    labels = None
+    for attrID in struct['attributes']:
+        attribute = struct['attributes'][attrID]
+        if attribute['type'] == 'BOOLEAN':
+            continue
+        nameMemID = constantTable.lookup(attrID, 'STRING')
+        if nameMemID is None:
+            nameMemID = constants.generateStringID()
+            constantTable.insert(attrID, 'STRING', nameMemID)
+            constantTable.insertValue(nameMemID, attrID)
+        attribute['nameMemID'] = nameMemID
+        if attribute['type'] == 'INT' or attribute['type'] == 'FLOAT':
+            graphAttributes.append(attribute)
+        elif attribute['type'] == 'STRING':
+            labels = attribute
+
+    quadList.insertQuad('GRAPH', struct['size'], len(graphAttributes))
+
+    if len(graphAttributes) == 0:
+        raise CompileError('Semantic Error: struct "%s" has no numeric attributes and cannot be graphed in line #%d.' % (structID, lineNumber))
+    elif not labels is None:
+        quadList.insertQuad('LABELS', labels['memID'], labels['nameMemID'])
+
+    for attribute in graphAttributes:
+        quadList.insertQuad('GATTR', attribute['memID'], attribute['nameMemID'])
+
+    graphNameID = constantTable.lookup(structID, 'STRING')
+    if graphNameID is None:
+        graphNameID = constants.generateStringID()
+        constantTable.insert(structID, 'STRING', graphNameID)
+        constantTable.insertValue(graphNameID, structID)
+
+    if op == 'line':
+        quadList.insertQuad('LINEGRAPH', graphNameID, None, None)
+    elif op == 'bar':
+        quadList.insertQuad('BARGRAPH', graphNameID, None, None)
+    elif op == 'pie':
+        quadList.insertQuad('PIEGRAPH', graphNameID, None, None)
+
+def p_load(p):
+    'load : T_LOAD T_EXP_START T_STRING_CONST T_COMMA T_ID T_EXP_END'
+    string_const, structID = p[3], p[5]
+    memID = constantTable.lookup(string_const, 'STRING')
+    if memID is None:
+        memID = constants.generateStringID()
+        constantTable.insert(string_const, 'STRING', memID)
+        constantTable.insertValue(memID, string_const[1:-1])
+    struct = structManager.getArray(structID)
+    if struct is None:
+        raise CompileError('Semantic Error: variable "%s" must be a struct array in line #%d.' % (structID, lineNumber))
+    quadList.insertQuad('LOAD', memID, struct['size'], len(struct['attributes']))
+    for attrID in struct['attributes']:
+        attribute = struct['attributes'][attrID]
+        quadList.insertQuad('LATTR', attribute['index'], None, attribute['memID'])
+
+# Abre un archivo CSV para leerlo por bloques del tamaño del arreglo de structs. Cada fetch(rows) carga las siguientes filas a partir de la posición 0 del arreglo y regresa cuántas se leyeron (0 al terminar el archivo).
+def p_stream(p):
+    'stream : T_STREAM T_EXP_START T_STRING_CONST T_COMMA T_ID T_EXP_END'
+    string_const, structID = p[3], p[5]
+    struct = structManager.getArray(structID)
+    if struct is None:
+        raise CompileError('Semantic Error: variable "%s" must be a struct array in line #%d.' % (structID, lineNumber))
+    quadList.insertQuad('STREAM', getConstantID(string_const[1:-1]), getConstantID(structID), len(struct['attributes']))
+    for attrID in struct['attributes']:
+        attribute = struct['attributes'][attrID]
+        quadList.insertQuad('LATTR', attribute['index'], None, attribute['memID'])
+
+def p_factor_fetch(p):
+    'factor : T_FETCH T_EXP_START T_ID T_EXP_END'
+    structID = p[3]
+    struct = structManager.getArray(structID)
+    if struct is None:
+        raise CompileError('Semantic Error: variable "%s" must be a struct array in line #%d.' % (structID, lineNumber))
+    tempID = temps.generateIntID()
+    quadList.insertQuad('FETCH', getConstantID(structID), struct['size'], tempID)
+    p[0] = { 'type': 'INT', 'id': tempID }
+
+def p_concat_const(p):
+    'concat : T_STRING_CONST'
+    type = 'STRING'
+    memID = constantTable.lookup(p[1], type)
+    if memID:
+        p[0] = { 'type': type, 'id': memID }
+    else:
+        memID = constants.generateStringID()
+        constantTable.insert(p[1], type, memID)
+        constantTable.insertValue(memID, p[1][1:-1])
+        p[0] = { 'type': type, 'id': memID }
+
+def p_concat_expr(p):
+    'concat : expression'
+    p[0] = p[1]
+
+def p_concat_op_const(p):
+    'concat : T_STRING_CONST T_CONCAT concat'
+    string_const, op, concat = p[1], p[2], p[3]
+    type = 'STRING'
+    memID = constantTable.lookup(string_const, type)
+    if not memID:
+        memID = constants.generateStringID()
+        constantTable.insert(string_const, type, memID)
+        constantTable.insertValue(memID, string_const[1:-1])
+    operationMemID = temps.generateStringID()
+    quadList.insertOperation(op, memID, concat['id'], operationMemID)
+    p[0] = { 'type': type, 'id': operationMemID }
+
+def p_concat_op_expr(p):
+    'concat : expression T_CONCAT concat'
+    expression, op, concat = p[1], p[2], p[3]
+    memID = temps.generateStringID()
+    quadList.insertOperation(op, expression['id'], concat['id'], memID)
+    p[0] = { 'type': 'STRING', 'id': memID }
+
+def p_expression_op(p):
+    # Expresiones && y ||
+    'expression : exp T_OPREL expression'
+    exp, op, expression = p[1], p[2], p[3]
+    if exp['type'] != 'BOOLEAN' or expression['type'] != 'BOOLEAN':
+        raise CompileError('Semantic Error: logic operands must be boolean type in line #%d.' % (lineNumber))
+    memID = temps.generateBooleanID()
+    quadList.insertOperation(op, exp['id'], expression['id'], memID)
+    p[0] = { 'type': 'BOOLEAN', 'id': memID }
+
+def p_expresion(p):
+    'expression : exp'
+    p[0] = p[1]
+
+def p_exp_op(p):
+    # Expresiones de comparacion (<, >, !=, ==, <=, >=)
+    'exp : e T_OPCOMP exp'
+    e, op, exp = p[1], p[2], p[3]
+    if e['type'] != exp['type'] and ((e['type'] != 'INT' and e['type'] != 'FLOAT') or (exp['type'] != 'INT' and exp['type'] != 'FLOAT')):
+        raise CompileError('Semantic Error: relational operands must be the same type in line #%d.' % (lineNumber))
+    memID = temps.generateBooleanID()
+    quadList.insertOperation(op, e['id'], exp['id'], memID)
+    p[0] = { 'type': 'BOOLEAN', 'id': memID }
+
+def p_exp(p):
+    'exp : e'
+    p[0] = p[1]
+
+# Un operando es un arreglo completo cuando se usa el nombre de un arreglo o matriz sin índices, o el resultado de otra operación sobre arreglos.
+def isVector(operand):
+    return 'size' in operand and not isinstance(operand['id'], str)
+
+def vectorLength(shape):
+    if type(shape) is list:
+        return shape[0] * shape[1]
+    return shape
+
+# Genera una operación aritmética elemento por elemento entre dos arreglos de la misma forma, o entre un arreglo y un escalar. El resultado se guarda en un arreglo temporal con la forma del operando arreglo.
+def vectorOperation(op, left, right):
+    if (left['type'] != 'INT' and left['type'] != 'FLOAT') or (right['type'] != 'INT' and right['type'] != 'FLOAT'):
+        raise CompileError('Semantic Error: arithmetic operands must be of numeric type (int or float) in line #%d.' % (lineNumber))
+    if isVector(left) and isVector(right) and left['size'] != right['size']:
+        raise CompileError('Semantic Error: arrays of different shapes cannot be operated element by element in line #%d.' % (lineNumber))
+    shape = left['size'] if isVector(left) else right['size']
+    if left['type'] == 'FLOAT' or right['type'] == 'FLOAT':
+        type = 'FLOAT'
+    else:
+        type = 'INT'
+    memID = temps.generateArrayID(type, vectorLength(shape))
+    flags = (1 if isVector(left) else 0) | (2 if isVector(right) else 0)
+    quadList.insertQuad('VDIM', vectorLength(shape), flags)
+    quadList.insertOperation('V' + op, left['id'], right['id'], memID)
+    return { 'type': type, 'id': memID, 'size': shape }
+
+def p_e_op(p):
+    'e : term T_OPARIT e'
+    term, op, e = p[1], p[2], p[3]
+    if isVector(term) or isVector(e):
+        p[0] = vectorOperation(op, term, e)
+        return
+    if (term['type'] != 'INT' and term['type'] != 'FLOAT') or (e['type'] != 'INT' and e['type'] != 'FLOAT'):
+        raise CompileError('Semantic Error: arithmetic operands must be of numeric type (int or float) in line #%d.' % (lineNumber))
+    elif term['type'] == 'FLOAT' or e['type'] == 'FLOAT':
+        type = 'FLOAT'
+    else:
+        type = e['type']
+    memID = temps.generateID(type)
+    quadList.insertOperation(op, term['id'], e['id'], memID)
+    p[0] = { 'type': type, 'id': memID }
+
+def p_e(p):
+    'e : term'
+    p[0] = p[1]
+
+def p_term_op(p):
+    'term : factor T_OPFACT term'
+    factor, op, term = p[1], p[2], p[3]
+    if isVector(factor) or isVector(term):
+        p[0] = vectorOperation(op, factor, term)
+        return
+    if (factor['type'] != 'INT' and factor['type'] != 'FLOAT') or (term['type'] != 'INT' and term['type'] != 'FLOAT'):
+        raise CompileError('Semantic Error: arithmetic operands must be of numeric type (int or float) in line #%d.' % (lineNumber))
+    elif factor['type'] == 'FLOAT' or term['type'] == 'FLOAT':
+        type = 'FLOAT'
+    else:
+        type = term['type']
+    memID = temps.generateID(type)
+    quadList.insertOperation(op, factor['id'], term['id'], memID)
+    p[0] = { 'type': type, 'id': memID }
+
+def p_term(p):
+    'term : factor'
+    p[0] = p[1]
+
+def p_factor(p):
+    'factor : T_EXP_START expression T_EXP_END'
+    p[0] = p[2]
+
+def p_factor_int(p):
+    'factor : T_INT_CONST'
+    int_const = p[1]
+    type = 'INT'
+    memID = constantTable.lookup(int_const, type)
+    if not memID:
+        memID = constants.generateIntID()
+        constantTable.insert(int_const, type, memID)
+        constantTable.insertValue(memID, int(int_const))
+    p[0] = { 'type': type, 'id': memID }
+
+def p_factor_float(p):
+    'factor : T_FLOAT_CONST'
+    float_const = p[1]
+    type = 'FLOAT'
+    memID = constantTable.lookup(float_const, type)
+    if not memID:
+        memID = constants.generateFloatID()
+        constantTable.insert(float_const, type, memID)
+        constantTable.insertValue(memID, float(float_const))
+    p[0] = { 'type': type, 'id': memID }
+
+def p_factor_boolean(p):
+    '''
+    factor : T_TRUE
+           | T_FALSE
+    '''
+    bool_const = p[1]
+    type = 'BOOLEAN'
+    memID = constantTable.lookup(bool_const, type)
+    if not memID:
+        memID = constants.generateBooleanID()
+        constantTable.insert(bool_const, type, memID)
+        constantTable.insertValue(memID, bool_const == 'true')
+    p[0] = { 'type': type, 'id': memID }
+
+def p_factor_struct(p):
+    '''
+    factor : T_ID T_COLON T_ID
+    '''
+    instance_id, attribute_id = p[1], p[3]
+    attribute = structManager.getInstanceAttribute(instance_id, attribute_id)
+    p[0] = { 'type': attribute['type'], 'id': attribute['memID'] }
+
+def p_factor_id(p):
+    'factor : id'
+    id = p[1]
+    if id['type'].endswith('[]'):
+        p[0] = { 'type': id['type'][:-2], 'id': id['id'] }
+    else:
+        p[0] = id
+
+# Genera la operación de una función sobre arreglos completos con los argumentos de su llamada y regresa el operando con su resultado.
+def vectorFunctionCall(name, args):
+    op = vectorFunctions[name]
+    if op == 'VDOT' or op == 'MATMUL':
+        if len(args) != 2:
+            raise CompileError('Semantic Error: "%s" requires two arrays in line #%d.' % (name, lineNumber))
+        return vectorPairFunction(name, op, args[0], args[1])
+    if len(args) != 1:
+        raise CompileError('Semantic Error: "%s" requires a single array in line #%d.' % (name, lineNumber))
+    e = args[0]
+    if not isVector(e) or (e['type'] != 'INT' and e['type'] != 'FLOAT'):
+        raise CompileError('Semantic Error: "%s" requires a numeric array in line #%d.' % (name, lineNumber))
+    type = 'FLOAT' if op == 'VMEAN' else e['type']
+    memID = temps.generateID(type)
+    quadList.insertQuad(op, e['id'], vectorLength(e['size']), memID)
+    return { 'type': type, 'id': memID }
+
+def vectorPairFunction(name, op, left, right):
+    if not isVector(left) or not isVector(right) or not left['type'] in ('INT', 'FLOAT') or not right['type'] in ('INT', 'FLOAT'):
+        raise CompileError('Semantic Error: "%s" requires two numeric arrays in line #%d.' % (name, lineNumber))
+    type = 'FLOAT' if left['type'] == 'FLOAT' or right['type'] == 'FLOAT' else 'INT'
+    if op == 'VDOT':
+        if vectorLength(left['size']) != vectorLength(right['size']):
+            raise CompileError('Semantic Error: "dot" requires arrays of the same size in line #%d.' % (lineNumber))
+        memID = temps.generateID(type)
+        quadList.insertQuad('VDIM', vectorLength(left['size']))
+        quadList.insertQuad('VDOT', left['id'], right['id'], memID)
+        return { 'type': type, 'id': memID }
+    else:
+        if not isinstance(left['size'], list) or not isinstance(right['size'], list) or left['size'][1] != right['size'][0]:
+            raise CompileError('Semantic Error: "matmul" requires matrices with matching inner dimensions in line #%d.' % (lineNumber))
+        shape = [ left['size'][0], right['size'][1] ]
+        memID = temps.generateArrayID(type, vectorLength(shape))
+        quadList.insertQuad('VDIM', left['size'][0], left['size'][1], right['size'][1])
+        quadList.insertQuad('MATMUL', left['id'], right['id'], memID)
+        return { 'type': type, 'id': memID, 'size': shape }
+
+def p_factor_func(p):
+    'factor : call_func'
+    symbol = p[1]
+    if symbol['type'] == 'VECFUNC':
+        p[0] = symbol['value']
+        return
+    if symbol is None or not 'returnType' in symbol:
+        raise CompileError("Semantic Error: '%s' is not a function in line #%d." % (id, lineNumber))
+    tempID = temps.generateID(symbol['returnType'])
+    quadList.insertQuad('COPYRET', symbol['memID'], None, tempID)
+    p[0] = { 'type': symbol['returnType'], 'id': tempID }
+
+def p_error(p):
+    if p:
+        raise CompileError('Syntax error at token "%s" in line #%d.' % (p.value, lineNumber))
+    raise CompileError('Syntax error at EOF.')
+
+parser = None
+
+# Directorio de las tablas del analizador léxico y sintáctico, generadas una sola vez con "python compilador.py [DIR]" (por ejemplo, al construir el contenedor). Puede estar en un sistema de archivos de solo lectura. La variable de ambiente BINEDU_TABLES permite usar otro directorio.
+tablesDirectory = os.environ.get('BINEDU_TABLES') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tablas')
+
+# Versión de las tablas: el hash del código fuente de este módulo (que contiene la gramática y las reglas léxicas) y de la versión de PLY. Un cambio en la gramática produce tablas con otro nombre, de modo que nunca se cargan tablas desactualizadas.
+def getTablesVersion():
+    sourcePath = os.path.splitext(os.path.abspath(__file__))[0] + '.py'
+    try:
+        with open(sourcePath, 'rb') as file_obj:
+            source = file_obj.read()
+    except IOError:
+        return None
+    return hashlib.sha1(source + yacc.__version__).hexdigest()[:16]
+
+def getTablePaths(directory, version):
+    return os.path.join(directory, 'lextab_%s.py' % version), os.path.join(directory, 'parsetab_%s.pickle' % version)
+
+# Carga las tablas ya generadas sin volver a inspeccionar la gramática: las expresiones regulares del analizador léxico y la tabla LALR se leen del directorio y solo se enlazan con las funciones de este módulo. Regresa None si las tablas no existen o son de otra versión de PLY.
+def loadTables(directory, version):
+    lextabPath, parsetabPath = getTablePaths(directory, version)
+    if not os.path.exists(lextabPath) or not os.path.exists(parsetabPath):
+        return None
+    try:
+        lextab = imp.load_source('lextab_%s' % version, lextabPath)
+        newLexer = lex.Lexer()
+        newLexer.lexoptimize = 1
+        newLexer.readtab(lextab, globals())
+        tables = yacc.LRTable()
+        tables.read_pickle(parsetabPath)
+        tables.bind_callables(globals())
+    except (ImportError, IOError, yacc.YaccError):
+        return None
+    return newLexer, yacc.LRParser(tables, p_error)
+
+# Genera las tablas a partir de la gramática y las guarda en el directorio indicado.
+def writeTables(directory, version):
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    module = sys.modules[__name__]
+    lextabPath, parsetabPath = getTablePaths(directory, version)
+    newLexer = lex.lex(module=module, optimize=1, lextab='lextab_%s' % version, outputdir=directory)
+    newParser = yacc.yacc(module=module, picklefile=parsetabPath, debug=False)
+    return newLexer, newParser
+
+def canWriteTables(directory):
+    if os.path.isdir(directory):
+        return os.access(directory, os.W_OK)
+    return os.access(os.path.dirname(directory), os.W_OK)
+
+# Construye el analizador léxico y el sintáctico solo cuando se necesita compilar un programa fuente; los archivos objeto se ejecutan sin construirlos. Usa las tablas guardadas cuando existen; si no, las genera y las guarda si el directorio permite escribir, o las conserva solo en memoria.
+def getParser():
+    global lexer, parser
+    if parser is None:
+        version = getTablesVersion()
+        loaded = None
+        if not version is None:
+            loaded = loadTables(tablesDirectory, version)
+            if loaded is None and canWriteTables(tablesDirectory):
+                loaded = writeTables(tablesDirectory, version)
+        if loaded is None:
+            module = sys.modules[__name__]
+            loaded = (lex.lex(module=module), yacc.yacc(module=module, write_tables=False, debug=False))
+        lexer, parser = loaded
+    return parser
+
+# Regresa el programa compilado en el formato que recibe la máquina virtual y que se guarda en los archivos objeto.
+def getProgram():
+    return {
+        'quadruples': quadList.quadruples,
+        'lines': quadList.lines,
+        'constants': constantTable.values,
+        'functions': compiledFunctions,
+        'mainFrame': mainFrame,
+        'globalFrame': globalFrame,
+        'structs': structManager.structs,
+        'arrays': structManager.arrays,
+    }
+
+# Las reglas de la gramática trabajan sobre el estado de este módulo, por lo que solo se compila un programa a la vez en el proceso.
+compileLock = threading.Lock()
+
+# Compilador reutilizable para compilar muchos programas en el mismo proceso. Cada llamada a compile parte de un estado nuevo y regresa el programa compilado, que no comparte estructuras con las compilaciones anteriores; los errores del programa fuente se reportan con CompileError en lugar de terminar el proceso.
+class Compiler:
+    def __init__(self, optimize=True, report=False, listing=False):
+        self.optimize = optimize
+        self.report = report
+        self.listing = listing
+
+    def compile(self, source):
+        global printListing
+        with compileLock:
+            getParser()
+            resetState()
+            printListing = self.listing
+            parser.parse(source, lexer=lexer)
+            if self.optimize:
+                optimizeProgram(self.report)
+            return getProgram()
+
+def compileProgram(source, optimize=True, report=False, listing=True):
+    return Compiler(optimize, report, listing).compile(source)
+
+def isTemp(address):
+    return type(address) is int and address > 150000 and address < 200000
+
+def isConstant(address):
+    return type(address) is int and address > 100000 and address < 150000
+
+def isGlobal(address):
+    return type(address) is int and address > 250000
+
+# Tipo de una variable a partir del rango de su dirección.
+def getAddressType(address):
+    return (None, 'INT', 'FLOAT', 'BOOLEAN', 'STRING')[(address % 50000) // 10000]
+
+# Regresa la dirección de una constante con el valor indicado, registrándola si todavía no existe.
+def getConstantID(value):
+    if isinstance(value, bool):
+        type, token = 'BOOLEAN', ('true' if value else 'false')
+    elif isinstance(value, float):
+        type, token = 'FLOAT', repr(value)
+    elif isinstance(value, str):
+        type, token = 'STRING', '"%s"' % value
+    else:
+        type, token = 'INT', str(value)
+    memID = constantTable.lookup(token, type)
+    if not memID:
+        memID = constants.generateID(type)
+        constantTable.insert(token, type, memID)
+        constantTable.insertValue(memID, value)
+    return memID
+
+# Optimizador de cuádruplos. Se ejecuta entre la compilación y la ejecución, y aplica plegado de constantes, propagación de copias, eliminación de temporales muertos, encadenamiento de saltos, eliminación de verificaciones de rango redundantes y extracción de las verificaciones de rango de los ciclos contados.
+# Aprovecha que cada temporal se escribe en un solo cuádruplo. Los cuádruplos eliminados se marcan con None y al final de cada ronda se compacta la lista, corrigiendo los destinos de los saltos, el inicio de cada función y las líneas del programa fuente; los cuádruplos insertados toman la línea del cuádruplo junto al que se insertan.
+class Optimizer:
+    def __init__(self, quadruples, lines, functions):
+        self.quadruples = list(quadruples)
+        self.lines = array('i', lines)
+        self.functions = functions
+
+    def optimize(self):
+        for _ in range(10):
+            previous = list(self.quadruples)
+            self.foldConstants()
+            self.propagateCopies()
+            self.removeDeadTemps()
+            self.removeRedundantChecks()
+            self.threadJumps()
+            self.compact()
+            self.hoistLoopChecks()
+            self.compact()
+            if self.quadruples == previous:
+                break
+        self.fuseArrayAccess()
+        self.compact()
+        self.reuseTemps()
+        return self.quadruples
+
+    def readFields(self, quad):
+        modes = operandModes.get(opNames[quad[0]], (None, None, None))
+        return [ index + 1 for index, mode in enumerate(modes) if mode == 'r' ]
+
+    def writeField(self, quad):
+        modes = operandModes.get(opNames[quad[0]], (None, None, None))
+        for index, mode in enumerate(modes):
+            if mode == 'w':
+                return index + 1
+        return None
+
+    # Cuenta cuántas veces se lee cada temporal, ya sea directamente o como apuntador.
+    def countTempUses(self):
+        uses = dict()
+        for quad in self.quadruples:
+            if quad is None:
+                continue
+            fields = self.readFields(quad)
+            write = self.writeField(quad)
+            if not write is None:
+                fields.append(write)
+            for index in fields:
+                field = quad[index]
+                if type(field) is str:
+                    field = int(field[1:])
+                elif index == write:
+                    continue
+                if isTemp(field):
+                    uses[field] = uses.get(field, 0) + 1
+        return uses
+
+    def jumpTargets(self):
+        targets = set(funcData['start'] for funcData in self.functions.values())
+        for quad in self.quadruples:
+            if not quad is None and quad[0] in jumpOps:
+                targets.add(quad[3])
+        return targets
+
+    # Sustituye los operandos de lectura (y los apuntadores de escritura) según los reemplazos encontrados.
+    def substitute(self, quad, replacements, pointers):
+        fields = list(quad)
+        for index in self.readFields(quad):
+            field = fields[index]
+            if type(field) is str and int(field[1:]) in pointers:
+                fields[index] = pointers[int(field[1:])]
+            elif field in replacements:
+                fields[index] = replacements[field]
+        write = self.writeField(quad)
+        if not write is None and type(fields[write]) is str and int(fields[write][1:]) in pointers:
+            fields[write] = pointers[int(fields[write][1:])]
+        return tuple(fields)
+
+    # Calcula en compilación las operaciones cuyos operandos son constantes, y sustituye el temporal que producen por la constante resultante. Las verificaciones de rango con índice constante que se cumplen se eliminan, y los apuntadores a posiciones constantes de un arreglo se convierten en direcciones directas.
+    def foldConstants(self):
+        replacements = dict()
+        pointers = dict()
+        constants = constantTable.values
+        for index, quad in enumerate(self.quadruples):
+            if quad is None:
+                continue
+            quad = self.substitute(quad, replacements, pointers)
+            self.quadruples[index] = quad
+            op = quad[0]
+            if op in binaryOpNames and isConstant(quad[1]) and isConstant(quad[2]) and isTemp(quad[3]):
+                try:
+                    value = binaryOperations[binaryOpNames[op]](constants[quad[1]], constants[quad[2]])
+                except (ArithmeticError, TypeError, ValueError):
+                    continue
+                replacements[quad[3]] = getConstantID(value)
+                self.quadruples[index] = None
+            elif op == ops['VER'] and isConstant(quad[1]):
+                value = constants[quad[1]]
+                if value >= 0 and value < quad[2]:
+                    self.quadruples[index] = None
+            elif op == ops['ARRMULT'] and isConstant(quad[2]) and isTemp(quad[3]):
+                replacements[quad[3]] = getConstantID(quad[1] * constants[quad[2]])
+                self.quadruples[index] = None
+            elif op == ops['ARRSUM'] and isConstant(quad[2]) and quad[1] in arraySizes:
+                value = constants[quad[2]]
+                if value >= 0 and value < arraySizes[quad[1]]:
+                    pointers[quad[3]] = quad[1] + value
+                    self.quadruples[index] = None
+            elif (op == ops['GOTOF'] or op == ops['GOTOV']) and isConstant(quad[1]):
+                if bool(constants[quad[1]]) == (op == ops['GOTOV']):
+                    self.quadruples[index] = (ops['GOTO'], None, None, quad[3])
+                else:
+                    self.quadruples[index] = None
+        if replacements or pointers:
+            for index, quad in enumerate(self.quadruples):
+                if not quad is None:
+                    self.quadruples[index] = self.substitute(quad, replacements, pointers)
+
+    # Cuando el resultado de una operación se guarda en un temporal que solo se usa en la asignación siguiente, la operación escribe directamente en el destino de la asignación.
+    def propagateCopies(self):
+        uses = self.countTempUses()
+        targets = self.jumpTargets()
+        quads = self.quadruples
+        for index in range(len(quads) - 1):
+            quad, nextQuad = quads[index], quads[index + 1]
+            if quad is None or nextQuad is None or not quad[0] in binaryOpNames:
+                continue
+            if nextQuad[0] == ops['='] and nextQuad[1] == quad[3] and isTemp(quad[3]) and uses.get(quad[3]) == 1 and not index + 1 in targets:
+                quads[index] = (quad[0], quad[1], quad[2], nextQuad[3])
+                quads[index + 1] = None
+
+    # Elimina las operaciones sin efectos secundarios cuyo temporal nunca se lee. La división se conserva porque puede fallar en ejecución.
+    def removeDeadTemps(self):
+        uses = self.countTempUses()
+        for index, quad in enumerate(self.quadruples):
+            if quad is None or not quad[0] in pureOps:
+                continue
+            if isTemp(quad[3]) and not quad[3] in uses:
+                self.quadruples[index] = None
+
+    # Dentro de un bloque básico, elimina las verificaciones de rango repetidas sobre el mismo índice y tamaño, mientras el índice no se modifique entre ellas.
+    def removeRedundantChecks(self):
+        targets = self.jumpTargets()
+        checked = set()
+        for index, quad in enumerate(self.quadruples):
+            if index in targets:
+                checked = set()
+            if quad is None:
+                continue
+            op = quad[0]
+            if op == ops['VER']:
+                key = (quad[1], quad[2])
+                if key in checked:
+                    self.quadruples[index] = None
+                else:
+                    checked.add(key)
+            elif op in jumpOps or op in callOps:
+                checked = set()
+            else:
+                write = self.writeField(quad)
+                if write is None:
+                    continue
+                dest = quad[write]
+                if type(dest) is str:
+                    checked = set(key for key in checked if isTemp(key[0]))
+                else:
+                    checked = set(key for key in checked if key[0] != dest)
+
+    # Redirige los saltos cuyo destino es otro GOTO al destino final de la cadena, y elimina los GOTO que saltan al cuádruplo siguiente.
+    def threadJumps(self):
+        quads = self.quadruples
+        for index, quad in enumerate(quads):
+            if quad is None or not quad[0] in jumpOps:
+                continue
+            dest = quad[3]
+            steps = 0
+            while dest < len(quads) and steps < len(quads):
+                target = quads[dest]
+                if target is None:
+                    dest += 1
+                elif target[0] == ops['GOTO'] and target[3] != dest:
+                    dest = target[3]
+                else:
+                    break
+                steps += 1
+            if dest != quad[3]:
+                quads[index] = (quad[0], quad[1], quad[2], dest)
+        for index, quad in enumerate(quads):
+            if index > 0 and not quad is None and quad[0] == ops['GOTO'] and quad[3] > index:
+                if all(between is None for between in quads[index + 1:quad[3]]):
+                    quads[index] = None
+
+    # Reconoce los ciclos contados que genera p_for: una asignación al contador i justo antes de la condición "i < b" (o "i <= b"), el GOTOF que sale del ciclo, el incremento "i = i + c" con c constante positiva y el GOTO de regreso a la condición.
+    # Si el cuerpo no modifica i ni b, y el valor inicial de i y el límite b son constantes, las verificaciones de rango sobre i (o sobre un temporal i + d) se eliminan cuando todo el recorrido cae dentro del tamaño. Con límites que solo se conocen en ejecución se conservan, para que el error se reporte en la misma iteración y con el mismo índice que sin optimizar.
+    def hoistLoopChecks(self):
+        quads = self.quadruples
+        constants = constantTable.values
+        defs = dict()
+        for index, quad in enumerate(quads):
+            if not quad is None and isTemp(quad[3]):
+                defs[quad[3]] = index
+        # Cuádruplos que saltan a cada destino. Este paso no modifica los saltos, así que se calculan una sola vez.
+        jumpSources = dict()
+        for index, quad in self.expanded(0, len(quads)):
+            if quad[0] in jumpOps:
+                jumpSources.setdefault(quad[3], list()).append(index)
+        for end, quad in enumerate(quads):
+            if quad is None or isinstance(quad, list) or quad[0] != ops['GOTO'] or quad[3] >= end or quad[3] < 1:
+                continue
+            loop = self.matchCountedLoop(quad[3], end, jumpSources)
+            if loop is None:
+                continue
+            counter, bound, strict, step, bodyStart, bodyEnd = loop
+            start = quad[3]
+            init = quads[start - 1]
+            low = None
+            if init[0] == ops['='] and isConstant(init[1]) and type(constants[init[1]]) is int:
+                low = constants[init[1]]
+            if low is None or not isConstant(bound):
+                continue
+            high = constants[bound] - (1 if strict else 0)
+            for index in range(bodyStart, bodyEnd):
+                check = quads[index]
+                if check is None or isinstance(check, list) or check[0] != ops['VER']:
+                    continue
+                offset = self.counterOffset(check[1], counter, defs, bodyStart, bodyEnd)
+                if offset is None:
+                    continue
+                if low > high:
+                    quads[index] = None
+                    continue
+                last = low + step * ((high - low) // step)
+                if low + offset >= 0 and last + offset < check[2]:
+                    quads[index] = None
+
+    # Regresa (i, b, estricto, incremento, inicio del cuerpo, fin del cuerpo) si los cuádruplos entre start y end forman un ciclo contado, o None si no.
+    def matchCountedLoop(self, start, end, jumpSources):
+        quads = self.quadruples
+        compare, branch, init = quads[start], quads[start + 1], quads[start - 1]
+        if compare is None or branch is None or init is None or isinstance(init, list):
+            return None
+        if not compare[0] in (ops['<'], ops['<=']) or branch[0] != ops['GOTOF'] or branch[1] != compare[3] or branch[3] != end + 1:
+            return None
+        counter, bound = compare[1], compare[2]
+        if type(counter) is not int or isTemp(counter) or isConstant(counter) or getAddressType(counter) != 'INT':
+            return None
+        if type(bound) is not int or isTemp(bound) or bound == counter:
+            return None
+        if isConstant(bound) and type(constantTable.values[bound]) is not int:
+            return None
+        if self.writeField(init) is None or init[self.writeField(init)] != counter:
+            return None
+        increment, bodyEnd = quads[end - 1], end - 1
+        if not increment is None and increment[0] == ops['='] and isTemp(increment[1]) and increment[3] == counter:
+            increment, bodyEnd = quads[end - 2], end - 2
+            if increment is None or increment[3] != quads[end - 1][1]:
+                return None
+        elif increment is None or increment[3] != counter:
+            return None
+        if increment[0] != ops['+'] or increment[1] != counter or not isConstant(increment[2]):
+            return None
+        step = constantTable.values[increment[2]]
+        if type(step) is not int or step <= 0:
+            return None
+        bodyStart = start + 2
+        calls = False
+        for index, quad in self.expanded(bodyStart, bodyEnd):
+            write = self.writeField(quad)
+            if not write is None and quad[write] in (counter, bound):
+                return None
+            if quad[0] in jumpOps and (quad[3] < start or quad[3] > end + 1):
+                return None
+            calls = calls or quad[0] in (ops['GOSUB'], ops['TAILCALL'])
+        if calls and (isGlobal(counter) or isGlobal(bound)):
+            return None
+        for target in range(start, end + 1):
+            if any(index < start or index > end for index in jumpSources.get(target, ())):
+                return None
+        return (counter, bound, compare[0] == ops['<'], step, bodyStart, bodyEnd)
+
+    # Recorre los cuádruplos entre first y last, incluyendo los que se agregaron antes de una condición, con el índice de la posición que ocupan.
+    def expanded(self, first, last):
+        for index in range(first, last):
+            quad = self.quadruples[index]
+            if isinstance(quad, list):
+                for inserted in quad:
+                    yield index, inserted
+            elif not quad is None:
+                yield index, quad
+
+    # Regresa d si el índice verificado es el contador (d = 0) o un temporal calculado dentro del cuerpo como i + d o i - d con d constante.
+    def counterOffset(self, operand, counter, defs, bodyStart, bodyEnd):
+        if operand == counter:
+            return 0
+        if not isTemp(operand) or not operand in defs:
+            return None
+        index = defs[operand]
+        quad = self.quadruples[index]
+        if index < bodyStart or index >= bodyEnd or quad is None:
+            return None
+        constants = constantTable.values
+        if quad[0] == ops['+'] and quad[1] == counter and isConstant(quad[2]):
+            offset = constants[quad[2]]
+        elif quad[0] == ops['+'] and quad[2] == counter and isConstant(quad[1]):
+            offset = constants[quad[1]]
+        elif quad[0] == ops['-'] and quad[1] == counter and isConstant(quad[2]):
+            offset = -constants[quad[2]]
+        else:
+            return None
+        return offset if type(offset) is int else None
+
+    # Sustituye el cálculo de la dirección de un elemento (VER y ARRSUM, y en las matrices también ARRMULT y +) junto con el acceso a través del apuntador por un solo cuádruplo que lee o escribe el elemento directamente. Las lecturas (ALOAD, MLOAD) ocupan el lugar del cálculo y dejan el valor en el temporal del apuntador; las escrituras (ASTORE, MSTORE) ocupan el lugar de la asignación. Se aplica después de las demás optimizaciones, ya que estas no conocen los nuevos códigos.
+    def fuseArrayAccess(self):
+        tempUses = self.countTempUses()
+        for store in (False, True):
+            targets = self.jumpTargets()
+            uses = self.pointerUses()
+            for index, quad in enumerate(self.quadruples):
+                if quad is None or isinstance(quad, list) or quad[0] != ops['ARRSUM'] or not quad[3] in uses:
+                    continue
+                reads, writes = uses[quad[3]]
+                if store and not reads and len(writes) == 1:
+                    self.fuseStore(index, writes[0], targets, tempUses)
+                elif not store and reads and not writes:
+                    self.fuseLoad(index, reads, targets, tempUses)
+
+    # Regresa, para cada temporal usado como apuntador, las posiciones de los cuádruplos que leen y que escriben a través de él.
+    def pointerUses(self):
+        uses = dict()
+        for index, quad in enumerate(self.quadruples):
+            if quad is None:
+                continue
+            write = self.writeField(quad)
+            for field in range(1, 4):
+                values = quad[field] if type(quad[field]) is tuple else (quad[field],)
+                for value in values:
+                    if type(value) is str:
+                        reads, writes = uses.setdefault(int(value[1:]), (list(), list()))
+                        (writes if field == write else reads).append(index)
+        return uses
+
+    def fuseLoad(self, index, reads, targets, tempUses):
+        quads = self.quadruples
+        last = max(reads)
+        if any(position in targets for position in range(index + 1, last + 1)):
+            return
+        if not self.canMoveAcross(index, last, None, False):
+            return
+        start, descriptor, operand = self.matchAddress(index, targets, tempUses)
+        pointer = quads[index][3]
+        op = ops['MLOAD'] if type(operand) is tuple else ops['ALOAD']
+        for position in range(start, index + 1):
+            quads[position] = None
+        quads[start] = (op, descriptor, operand, pointer)
+        for position in set(reads):
+            quads[position] = self.replacePointer(quads[position], '*' + str(pointer), pointer)
+
+    # La escritura se mueve hasta la asignación, por lo que los índices no deben cambiar entre el cálculo de la dirección y la asignación. Si el valor lo produce una operación binaria, la operación lo deja en el temporal del apuntador y la escritura va después.
+    def fuseStore(self, index, write, targets, tempUses):
+        quads = self.quadruples
+        consumer = quads[write]
+        if isinstance(consumer, list) or not (consumer[0] == ops['='] or consumer[0] in binaryOpNames):
+            return
+        start, descriptor, operand = self.matchAddress(index, targets, tempUses)
+        if any(position in targets for position in range(start + 1, write + 1)):
+            return
+        keep = set(value for value in (operand if type(operand) is tuple else (operand,)) if not isConstant(value))
+        if not self.canMoveAcross(index, write, keep, not any(type(value) is str for value in keep)):
+            return
+        pointer = quads[index][3]
+        op = ops['MSTORE'] if type(operand) is tuple else ops['ASTORE']
+        if consumer[0] == ops['=']:
+            quads[write] = (op, consumer[1], operand, descriptor)
+        else:
+            quads[write] = [ self.replacePointer(consumer, '*' + str(pointer), pointer), (op, pointer, operand, descriptor) ]
+        for position in range(start, index + 1):
+            quads[position] = None
+
+    # Reconoce el cálculo de la dirección que termina en el ARRSUM indicado. Regresa la posición donde inicia, la descripción del arreglo y el índice (o el par renglón, columna). Solo incluye las verificaciones que están justo antes del cálculo; las que el optimizador ya eliminó o movió fuera de un ciclo quedan con límite None.
+    def matchAddress(self, index, targets, tempUses):
+        quads = self.quadruples
+        base, offset = quads[index][1], quads[index][2]
+        add = quads[index - 1] if index >= 2 and not index in targets else None
+        if isinstance(add, tuple) and add[0] == ops['+'] and add[3] == offset and isTemp(offset) and tempUses.get(offset) == 1:
+            mult = quads[index - 2] if not index - 1 in targets else None
+            if isinstance(mult, tuple) and mult[0] == ops['ARRMULT'] and mult[3] == add[1] and tempUses.get(add[1]) == 1:
+                columns, row, column = mult[1], mult[2], add[2]
+                start = index - 2
+                rowLimit, columnLimit = None, None
+                check = self.adjacentCheck(start, targets)
+                if not check is None and check[1] == column:
+                    columnLimit = check[2]
+                    start -= 1
+                    check = self.adjacentCheck(start, targets)
+                if not check is None and check[1] == row:
+                    rowLimit = check[2]
+                    start -= 1
+                return start, (base, columns, rowLimit, columnLimit), (row, column)
+        check = self.adjacentCheck(index, targets)
+        if not check is None and check[1] == offset:
+            return index - 1, (base, check[2]), offset
+        return index, (base, None), offset
+
+    # Regresa el VER que está justo antes de la posición indicada, si ningún salto llega entre ambos.
+    def adjacentCheck(self, position, targets):
+        if position < 1 or position in targets:
+            return None
+        check = self.quadruples[position - 1]
+        if isinstance(check, tuple) and check[0] == ops['VER']:
+            return check
+        return None
+
+    # Indica si un cuádruplo se puede mover por encima de los cuádruplos entre first y last: todos deben ser operaciones sin efectos fuera de la memoria, que no escriban los operandos de keep (o, si keep es None, nada más que temporales) ni, si no se permite, a través de un apuntador.
+    def canMoveAcross(self, first, last, keep, pointerWrites):
+        for position, quad in self.expanded(first + 1, last):
+            if not quad[0] in fusableOps:
+                return False
+            if not pointerWrites and (quad[0] == ops['ASTORE'] or quad[0] == ops['MSTORE']):
+                return False
+            write = self.writeField(quad)
+            if write is None:
+                continue
+            dest = quad[write]
+            if type(dest) is str and not pointerWrites:
+                return False
+            if keep is None and not isTemp(dest) or not keep is None and dest in keep:
+                return False
+        return True
+
+    def replacePointer(self, quad, pointer, temp):
+        fields = [ quad[0] ]
+        for field in quad[1:]:
+            if field == pointer:
+                field = temp
+            elif type(field) is tuple:
+                field = tuple(temp if value == pointer else value for value in field)
+            fields.append(field)
+        return tuple(fields)
+
+    # Regresa los temporales que lee (directamente o como apuntador) y el que escribe un cuádruplo. Si el cuádruplo usa un arreglo temporal, cuyas direcciones no se pueden separar, regresa None.
+    def tempOperands(self, quad):
+        reads = list()
+        write = None
+        modes = operandModes.get(opNames[quad[0]], (None, None, None))
+        for field, mode in zip(quad[1:], modes):
+            if mode == 'd':
+                if isTemp(field[0]):
+                    return None
+                continue
+            if mode is None:
+                continue
+            for value in field if mode == 'p' else (field,):
+                if type(value) is str:
+                    reads.append(int(value[1:]))
+                elif isTemp(value):
+                    if mode == 'a':
+                        return None
+                    if mode == 'w':
+                        write = value
+                    else:
+                        reads.append(value)
+        return reads, write
+
+    # Reasigna los temporales de cada función (y del main) para que los que nunca están vivos al mismo tiempo compartan la misma dirección, y reduce su registro de activación a las direcciones que quedan en uso.
+    # Cada temporal ocupa el intervalo de cuádruplos entre el primero y el último en que está vivo, según el análisis de vida sobre los bloques básicos; los intervalos de cada tipo se asignan en orden a la dirección libre más baja. Las funciones que usan arreglos temporales se dejan sin cambios.
+    def reuseTemps(self):
+        quads = self.quadruples
+        regions = [ (funcData['start'], funcData) for funcData in self.functions.values() ]
+        regions.append((quads[0][3], mainFrame))
+        regions.sort(key=lambda region: region[0])
+        for position, (begin, layout) in enumerate(regions):
+            end = regions[position + 1][0] if position + 1 < len(regions) else len(quads)
+            operands = list()
+            for index in range(begin, end):
+                operands.append(self.tempOperands(quads[index]))
+                if operands[-1] is None:
+                    break
+            else:
+                renames = self.assignTemps(self.tempIntervals(begin, end, operands))
+                for index in range(begin, end):
+                    quads[index] = self.renameTemps(quads[index], renames)
+                self.shrinkLayout(layout, renames)
+
+    # Calcula el intervalo (primero, último) de cuádruplos en que está vivo cada temporal de los cuádruplos entre begin y end.
+    def tempIntervals(self, begin, end, operands):
+        quads = self.quadruples
+        leaders = set([ begin ])
+        for index in range(begin, end):
+            op = quads[index][0]
+            if op in jumpOps or op in exitOps:
+                leaders.add(index + 1)
+                if op in jumpOps:
+                    leaders.add(quads[index][3])
+        starts = sorted(leader for leader in leaders if leader >= begin and leader < end)
+        blockOf = dict((start, block) for block, start in enumerate(starts))
+        bits = dict()
+        intervals = dict()
+        blocks = list()
+        for block, start in enumerate(starts):
+            last = starts[block + 1] if block + 1 < len(starts) else end
+            used = defined = 0
+            for index in range(start, last):
+                reads, write = operands[index - begin]
+                for temp in reads + ([ write ] if not write is None else []):
+                    bits.setdefault(temp, len(bits))
+                    first, final = intervals.get(temp, (index, index))
+                    intervals[temp] = (first, index)
+                for temp in reads:
+                    if not (1 << bits[temp]) & defined:
+                        used |= 1 << bits[temp]
+                if not write is None:
+                    defined |= 1 << bits[write]
+            quad = quads[last - 1]
+            successors = list()
+            if quad[0] in jumpOps and quad[3] in blockOf:
+                successors.append(blockOf[quad[3]])
+            if quad[0] != ops['GOTO'] and not quad[0] in exitOps and block + 1 < len(starts):
+                successors.append(block + 1)
+            blocks.append((start, last - 1, used, defined, successors))
+        liveIn = [ 0 ] * len(blocks)
+        liveOut = [ 0 ] * len(blocks)
+        changed = True
+        while changed:
+            changed = False
+            for block in range(len(blocks) - 1, -1, -1):
+                start, last, used, defined, successors = blocks[block]
+                live = 0
+                for successor in successors:
+                    live |= liveIn[successor]
+                liveOut[block] = live
+                live = used | (live & ~defined)
+                if live != liveIn[block]:
+                    liveIn[block] = live
+                    changed = True
+        temps = dict((bit, temp) for temp, bit in bits.items())
+        for block, (start, last, used, defined, successors) in enumerate(blocks):
+            live = liveIn[block] | liveOut[block]
+            while live:
+                lowest = live & -live
+                live ^= lowest
+                temp = temps[lowest.bit_length() - 1]
+                first, final = intervals[temp]
+                intervals[temp] = (min(first, start), max(final, last))
+        return intervals
+
+    # Asigna a cada temporal la dirección más baja de su tipo que no ocupa otro temporal vivo en su intervalo. Las direcciones de cada tipo empiezan en la menor de las que ya tenían sus temporales.
+    def assignTemps(self, intervals):
+        bases = dict()
+        for temp in intervals:
+            kind = temp // 10000
+            bases[kind] = min(bases.get(kind, temp), temp)
+        free = dict((kind, list()) for kind in bases)
+        active = dict((kind, list()) for kind in bases)
+        counts = dict((kind, 0) for kind in bases)
+        renames = dict()
+        for first, final, temp in sorted((first, final, temp) for temp, (first, final) in intervals.items()):
+            kind = temp // 10000
+            while active[kind] and active[kind][0][0] < first:
+                heapq.heappush(free[kind], heapq.heappop(active[kind])[1])
+            if free[kind]:
+                slot = heapq.heappop(free[kind])
+            else:
+                slot = counts[kind]
+                counts[kind] += 1
+            heapq.heappush(active[kind], (final, slot))
+            renames[temp] = bases[kind] + slot
+        return renames
+
+    # Cambia los temporales de los operandos de un cuádruplo. Los descriptores de los arreglos y los destinos de los saltos no contienen temporales.
+    def renameTemps(self, quad, renames):
+        fields = [ quad[0] ]
+        modes = operandModes.get(opNames[quad[0]], (None, None, None))
+        for field, mode in zip(quad[1:], modes):
+            if mode == 'p':
+                field = tuple(self.renameTemp(value, renames) for value in field)
+            elif not mode is None and mode != 'd':
+                field = self.renameTemp(field, renames)
+            fields.append(field)
+        return tuple(fields)
+
+    def renameTemp(self, value, renames):
+        if type(value) is str and value[:1] == '*':
+            return '*' + str(renames.get(int(value[1:]), int(value[1:])))
+        if isTemp(value):
+            return renames.get(value, value)
+        return value
+
+    # Sustituye los segmentos de temporales de un registro de activación por uno por tipo con las direcciones asignadas. Los segmentos de las variables van primero, así que sus posiciones (y las de los parámetros) no cambian.
+    def shrinkLayout(self, layout, renames):
+        segments = [ (first, count) for first, count, offset in layout['segments'] if not isTemp(first) ]
+        kinds = dict()
+        for temp in renames.values():
+            first, last = kinds.get(temp // 10000, (temp, temp))
+            kinds[temp // 10000] = (min(first, temp), max(last, temp))
+        for kind, (first, last) in sorted(kinds.items()):
+            segments.append((first, last - first + 1))
+        layout.update(createFrameLayout(segments))
+
+    # Quita los cuádruplos eliminados y corrige los saltos y el inicio de las funciones con el nuevo índice de cada cuádruplo.
+    def compact(self):
+        newIndex = list()
+        count = 0
+        for quad in self.quadruples:
+            newIndex.append(count)
+            if isinstance(quad, list):
+                count += len(quad)
+            elif not quad is None:
+                count += 1
+        newIndex.append(count)
+        compacted = list()
+        lines = array('i')
+        for index, quad in self.expanded(0, len(self.quadruples)):
+            if quad[0] in jumpOps:
+                quad = (quad[0], quad[1], quad[2], newIndex[quad[3]])
+            compacted.append(quad)
+            lines.append(self.lines[index])
+        for funcData in self.functions.values():
+            funcData['start'] = newIndex[funcData['start']]
+        self.quadruples = compacted
+        self.lines = lines
+
+opNames = dict((code, name) for name, code in ops.items())
+jumpOps = set([ ops['GOTO'], ops['GOTOF'], ops['GOTOV'] ])
+exitOps = set([ ops['RET'], ops['TAILCALL'], ops['END'] ])
+callOps = set([ ops['ERA'], ops['PARAM'], ops['GOSUB'], ops['TAILCALL'], ops['RET'], ops['INPUT'], ops['LOAD'], ops['LATTR'], ops['STREAM'], ops['FETCH'] ])
+pureOps = set(code for code in binaryOpNames if code != ops['/']) | set([ ops['ARRSUM'], ops['ARRMULT'] ])
+fusableOps = set(binaryOpNames) | set(ops[name] for name in ('=', 'VER', 'ARRSUM', 'ARRMULT', 'ALOAD', 'ASTORE', 'MLOAD', 'MSTORE'))
+
+# Optimiza los cuádruplos del programa compilado. Opcionalmente imprime los cuádruplos resultantes y cuántos se eliminaron.
+def optimizeProgram(report=False):
+    before = quadList.getListSize()
+    optimizer = Optimizer(quadList.quadruples, quadList.lines, compiledFunctions)
+    quadList.quadruples = QuadrupleArray(optimizer.optimize())
+    quadList.lines = optimizer.lines
+    if report:
+        print('Optimized quadruples:')
+        quadList.printQuadruples()
+        print('Quadruples: %d -> %d' % (before, quadList.getListSize()))
+
+if __name__ == '__main__':
+    import argparse
+    argParser = argparse.ArgumentParser(description='Genera las tablas del analizador léxico y sintáctico.')
+    argParser.add_argument('directory', nargs='?', default=tablesDirectory, help='directorio donde se guardan las tablas')
+    args = argParser.parse_args()
+    writeTables(args.directory, getTablesVersion())
+    print('Tables written to %s' % args.directory)
@@ -1,3 +1,5 @@
+# -*- coding: utf-8 -*-
+
 ops = {
     'GOTO': 1,
     'GOTOF': 2,
@@ -37,4 +39,91 @@ ops = {
     'BARGRAPH': 36,
     'PIEGRAPH': 37,
     'PRINTLN': 38,
+    'VDIM': 39,
+    'V+': 40,
+    'V-': 41,
+    'V/': 42,
+    'V*': 43,
+    'VSUM': 44,
+    'VMIN': 45,
+    'VMAX': 46,
+    'VMEAN': 47,
+    'VDOT': 48,
+    'MATMUL': 49,
+    'VCOPY': 50,
+    'STREAM': 51,
+    'FETCH': 52,
+    'ALOAD': 53,
+    'ASTORE': 54,
+    'MLOAD': 55,
+    'MSTORE': 56,
+    'TAILCALL': 57,
 }
+
+# Modo de cada campo de los cuádruplos, usado por el enlazador y el optimizador: 'r' para un operando que se lee, 'w' para un operando que se escribe, 'a' para la dirección base de un arreglo, y None para valores literales (saltos, tamaños, índices, funciones).
+operandModes = {
+    'GOTO': (None, None, None),
+    'GOTOF': ('r', None, None),
+    'GOTOV': ('r', None, None),
+    'ERA': (None, None, None),
+    'GOSUB': (None, None, None),
+    'PARAM': ('r', None, None),
+    'RET': (None, None, None),
+    'RETURN': ('r', None, None),
+    'TAILCALL': (None, None, None),
+    'PRINT': ('r', None, None),
+    'INPUT': ('w', None, None),
+    'LINEGRAPH': ('r', None, None),
+    'GATTR': ('a', 'r', None),
+    'END': (None, None, None),
+    '=': ('r', None, 'w'),
+    'LOAD': ('r', None, None),
+    'VER': ('r', None, None),
+    'ARRSUM': ('a', 'r', 'w'),
+    'ARRMULT': (None, 'r', 'w'),
+    'COPYRET': (None, None, 'w'),
+    'LATTR': (None, None, 'a'),
+    'LABELS': ('a', 'r', None),
+    'GRAPH': (None, None, None),
+    'BARGRAPH': ('r', None, None),
+    'PIEGRAPH': ('r', None, None),
+    'PRINTLN': ('r', None, None),
+    'VDIM': (None, None, None),
+    'VCOPY': ('r', None, 'a'),
+    'STREAM': ('r', 'r', None),
+    'FETCH': ('r', None, 'w'),
+}
+for op in ['+', '-', '/', '*', '.', '&&', '||', '<', '>', '==', '!=', '<=', '>=']:
+    operandModes[op] = ('r', 'r', 'w')
+# Las operaciones sobre arreglos completos leen la dirección base de cada arreglo (o un escalar) y escriben el resultado a partir de la dirección base del destino. Las reducciones escriben un escalar.
+for op in ['V+', 'V-', 'V/', 'V*', 'MATMUL']:
+    operandModes[op] = ('r', 'r', 'a')
+for op in ['VSUM', 'VMIN', 'VMAX', 'VMEAN']:
+    operandModes[op] = ('r', None, 'w')
+operandModes['VDOT'] = ('r', 'r', 'w')
+# Accesos a un elemento de un arreglo o de una matriz, generados por el optimizador a partir de VER, ARRMULT, + y ARRSUM. El campo 'd' describe el arreglo: (dirección base, límite del índice) en un arreglo, o (dirección base, columnas, límite del renglón, límite de la columna) en una matriz, donde un límite None indica que ese índice ya se verificó. El campo 'p' es el par (renglón, columna) de operandos que se leen.
+operandModes['ALOAD'] = ('d', 'r', 'w')
+operandModes['ASTORE'] = ('r', 'r', 'd')
+operandModes['MLOAD'] = ('d', 'p', 'w')
+operandModes['MSTORE'] = ('r', 'p', 'd')
+
+# Tipos de valor en el orden de sus rangos de direcciones (int en 10000, float en 20000, ...). INPUT lleva en su segundo campo la posición del tipo de la variable que lee.
+valueTypes = (None, 'INT', 'FLOAT', 'BOOLEAN', 'STRING')
+
+# Funciones que calculan el resultado de cada operación binaria. Las comparte la máquina virtual con el optimizador, para que el plegado de constantes produzca exactamente el mismo valor que la ejecución.
+binaryOperations = {
+    '+': lambda a, b: a + b,
+    '-': lambda a, b: a - b,
+    '/': lambda a, b: a / b,
+    '*': lambda a, b: a * b,
+    '.': lambda a, b: str(a) + str(b),
+    '&&': lambda a, b: a and b,
+    '||': lambda a, b: a or b,
+    '<': lambda a, b: a < b,
+    '>': lambda a, b: a > b,
+    '==': lambda a, b: a == b,
+    '!=': lambda a, b: a != b,
+    '<=': lambda a, b: a <= b,
+    '>=': lambda a, b: a >= b,
+}
+binaryOpNames = dict((ops[name], name) for name in binaryOperations)
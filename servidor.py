@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+
+# Servidor que ejecuta muchos programas en paralelo con un grupo de procesos que ya tienen construido el analizador sintáctico.
+# Recibe trabajos en formato JSON, uno por línea, por la entrada estándar o por un socket de Unix (--socket), y responde también con una línea JSON por evento:
+#   {"id": 1, "source": "program p; main { ... }", "input": "5\n", "timeout": 10}
+#   {"id": 2, "file": "testFactorial.txt"}          (código fuente o archivo objeto .bdo)
+# Mientras el programa se ejecuta, lo que imprime con print y println se envía en eventos {"id": 1, "event": "output", "text": "..."}.
+# Cada trabajo termina con {"id": 1, "event": "done", "quads": 8090, "seconds": 0.01}, o con "error" y "timeout" y su mensaje. Un trabajo que excede su tiempo límite se detiene terminando su proceso, que se reemplaza por uno nuevo.
+
+from __future__ import print_function
+import json
+import multiprocessing
+import os
+import Queue
+import signal
+import sys
+import threading
+import time
+from StringIO import StringIO
+
+import analizador
+import compilador
+
+# Tiempo mínimo entre dos eventos de salida de un mismo trabajo, para no enviar un mensaje por cada println cuando un programa imprime mucho.
+OUTPUT_INTERVAL = 0.05
+OUTPUT_BUFFER_SIZE = 8192
+
+# Salida de un programa en ejecución: acumula lo que imprime y lo envía al proceso principal por líneas completas, agrupadas en bloques.
+class JobOutput:
+    def __init__(self, connection, jobID):
+        self.connection = connection
+        self.jobID = jobID
+        self.buffer = list()
+        self.size = 0
+        self.lastSend = time.time()
+
+    def write(self, text):
+        self.buffer.append(text)
+        self.size += len(text)
+        if self.size >= OUTPUT_BUFFER_SIZE or ('\n' in text and time.time() - self.lastSend >= OUTPUT_INTERVAL):
+            self.flush()
+
+    def flush(self):
+        if self.size == 0:
+            return
+        text = ''.join(self.buffer)
+        self.buffer = list()
+        self.size = 0
+        self.lastSend = time.time()
+        self.connection.send({ 'id': self.jobID, 'event': 'output', 'text': text })
+
+# Obtiene el programa compilado de un trabajo: compila su código fuente, o lee el archivo indicado, que puede ser un archivo objeto o un código fuente.
+def getJobProgram(job, options):
+    source = job.get('source')
+    if source is None:
+        fileName = job.get('file')
+        if fileName is None:
+            raise ValueError('job has no "source" or "file"')
+        program = analizador.readObjectFile(fileName)
+        if not program is None:
+            return program
+        with open(fileName) as file_obj:
+            source = file_obj.read()
+    elif isinstance(source, unicode):
+        source = source.encode('utf-8')
+    return analizador.compileSource(source, options['cache'], options['optimize'], listing=False)
+
+def runJob(connection, job, options):
+    jobID = job.get('id')
+    output = JobOutput(connection, jobID)
+    text = job.get('input') or ''
+    if isinstance(text, unicode):
+        text = text.encode('utf-8')
+    sys.stdin = StringIO(text)
+    start = time.time()
+    try:
+        program = getJobProgram(job, options)
+        vm = analizador.VM(output, options['backend'])
+        if options['graphDir']:
+            vm.setGraphOutput(options['graphDir'], options['graphFormat'])
+        else:
+            vm.virtualStack.graphBackend = 'Agg'
+        executed = vm.run(program)
+    except compilador.CompileError as error:
+        output.flush()
+        return { 'id': jobID, 'event': 'error', 'message': str(error) }
+    except analizador.ExecutionError as error:
+        output.flush()
+        return { 'id': jobID, 'event': 'error', 'message': 'Error: %s' % error }
+    except Exception as error:
+        output.flush()
+        return { 'id': jobID, 'event': 'error', 'message': '%s: %s' % (type(error).__name__, error) }
+    output.flush()
+    return { 'id': jobID, 'event': 'done', 'quads': executed, 'seconds': time.time() - start }
+
+# Ciclo de cada proceso del grupo: recibe un trabajo a la vez y responde con sus eventos. Lo que el compilador o las bibliotecas impriman en la salida estándar se manda al error estándar, para no mezclarlo con las respuestas del servidor. Ctrl-C solo lo atiende el proceso principal, que detiene a los demás.
+def workerLoop(connection, options):
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    sys.stdout = sys.stderr
+    compilador.getParser()
+    while True:
+        try:
+            job = connection.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+        connection.send(runJob(connection, job, options))
+
+# Proceso del grupo, visto desde el proceso principal. Se reinicia cuando un trabajo excede su tiempo límite o cuando el proceso termina inesperadamente.
+class Worker:
+    def __init__(self, options):
+        self.options = options
+        self.start()
+
+    def start(self):
+        self.connection, childConnection = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=workerLoop, args=(childConnection, self.options))
+        self.process.daemon = True
+        self.process.start()
+        childConnection.close()
+
+    def restart(self):
+        self.process.terminate()
+        self.process.join()
+        self.connection.close()
+        self.start()
+
+    def stop(self):
+        try:
+            self.connection.send(None)
+        except IOError:
+            pass
+        self.process.join()
+
+    # Ejecuta un trabajo y pasa cada evento a send conforme llega. Regresa cuando el trabajo termina, falla o se le acaba el tiempo.
+    def run(self, job, send):
+        timeout = job.get('timeout', self.options['timeout'])
+        deadline = None if timeout is None else time.time() + timeout
+        self.connection.send(job)
+        while True:
+            remaining = None if deadline is None else max(deadline - time.time(), 0)
+            if not self.connection.poll(remaining):
+                self.restart()
+                send({ 'id': job.get('id'), 'event': 'timeout', 'message': 'Job exceeded its time limit of %g s.' % timeout })
+                return
+            try:
+                message = self.connection.recv()
+            except EOFError:
+                self.restart()
+                send({ 'id': job.get('id'), 'event': 'error', 'message': 'Worker process exited unexpectedly.' })
+                return
+            send(message)
+            if message['event'] != 'output':
+                return
+
+# Cliente del servidor: la entrada estándar o una conexión del socket. Escribe los eventos de sus trabajos y lleva la cuenta de los que siguen pendientes.
+class Client:
+    def __init__(self, stream):
+        self.stream = stream
+        self.lock = threading.Lock()
+        self.finished = threading.Condition(self.lock)
+        self.pending = 0
+
+    def send(self, message):
+        line = json.dumps(message) + '\n'
+        with self.lock:
+            self.stream.write(line)
+            self.stream.flush()
+            if message['event'] != 'output':
+                self.pending -= 1
+                self.finished.notify_all()
+
+    def wait(self):
+        with self.lock:
+            while self.pending > 0:
+                self.finished.wait()
+
+# Lee los trabajos de un cliente, uno por línea, y los reparte entre los procesos del grupo. Regresa cuando el cliente cierra su entrada y terminaron todos sus trabajos.
+def serveClient(server, inputStream, outputStream):
+    client = Client(outputStream)
+    for line in iter(inputStream.readline, ''):
+        if not line.strip():
+            continue
+        try:
+            job = json.loads(line)
+            if not isinstance(job, dict):
+                raise ValueError('a job must be a JSON object')
+        except ValueError as error:
+            with client.lock:
+                client.pending += 1
+            client.send({ 'id': None, 'event': 'error', 'message': 'Invalid job: %s' % error })
+            continue
+        with client.lock:
+            client.pending += 1
+        server.submit(job, client.send)
+    client.wait()
+
+class Server:
+    def __init__(self, workers=None, timeout=None, cache=None, optimize=True, graphDir=None, graphFormat='png', backend='loop'):
+        self.options = { 'timeout': timeout, 'cache': cache, 'optimize': optimize, 'graphDir': graphDir, 'graphFormat': graphFormat, 'backend': backend }
+        # Los procesos se crean a partir de este, por lo que heredan el analizador ya construido.
+        compilador.getParser()
+        self.jobs = Queue.Queue()
+        self.workers = [ Worker(self.options) for _ in range(workers or multiprocessing.cpu_count()) ]
+        self.threads = list()
+        for worker in self.workers:
+            thread = threading.Thread(target=self.dispatch, args=(worker,))
+            thread.daemon = True
+            thread.start()
+            self.threads.append(thread)
+
+    def submit(self, job, send):
+        self.jobs.put((job, send))
+
+    def dispatch(self, worker):
+        while True:
+            item = self.jobs.get()
+            if item is None:
+                break
+            job, send = item
+            worker.run(job, send)
+
+    def stop(self):
+        for _ in self.threads:
+            self.jobs.put(None)
+        for thread in self.threads:
+            thread.join()
+        for worker in self.workers:
+            worker.stop()
+
+def serveSocket(server, path):
+    import SocketServer
+
+    class Handler(SocketServer.StreamRequestHandler):
+        def handle(self):
+            serveClient(server, self.rfile, self.wfile)
+
+    class UnixServer(SocketServer.ThreadingMixIn, SocketServer.UnixStreamServer):
+        daemon_threads = True
+
+    if os.path.exists(path):
+        os.remove(path)
+    socketServer = UnixServer(path, Handler)
+    try:
+        socketServer.serve_forever()
+    finally:
+        socketServer.server_close()
+        os.remove(path)
+
+if __name__ == '__main__':
+    import argparse
+    argParser = argparse.ArgumentParser(description='Ejecuta programas en paralelo con un grupo de procesos.')
+    argParser.add_argument('--workers', metavar='N', type=int, help='número de procesos (por omisión, uno por núcleo)')
+    argParser.add_argument('--timeout', metavar='S', type=float, help='tiempo límite por trabajo en segundos, si el trabajo no indica otro')
+    argParser.add_argument('--socket', metavar='PATH', help='atender conexiones en un socket de Unix en lugar de la entrada estándar')
+    argParser.add_argument('--cache', metavar='DIR', help='reutilizar los programas compilados guardados en DIR')
+    argParser.add_argument('--no-opt', action='store_true', help='no optimizar los cuádruplos')
+    argParser.add_argument('--graph-dir', metavar='DIR', help='guardar las gráficas como archivos en DIR')
+    argParser.add_argument('--graph-format', choices=['png', 'svg'], default='png', help='formato de los archivos de las gráficas')
+    argParser.add_argument('--backend', choices=analizador.BACKENDS, default='loop', help='forma de ejecutar los cuádruplos')
+    args = argParser.parse_args()
+
+    server = Server(args.workers, args.timeout, args.cache, not args.no_opt, args.graph_dir, args.graph_format, args.backend)
+    try:
+        if args.socket:
+            serveSocket(server, args.socket)
+        else:
+            serveClient(server, sys.stdin, sys.stdout)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()